@@ -0,0 +1,135 @@
+"""
+预计算资源缓存模块
+将渐变背景、圆角遮罩、撕裂边缘等数组以 .npy 文件保存在工作流缓存目录中，
+之后的进程通过内存映射直接读取，无需重新计算
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .config import config
+from .utils import get_workflow_cachedir
+
+# 缓存文件所在的子目录
+ASSET_DIRNAME = "assets"
+
+
+class AssetCache:
+    """基于 .npy 文件和内存映射的资源缓存，总大小超过上限时按最近使用时间淘汰"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> Optional[str]:
+        """缓存目录，未指定时使用 Workflow.cachedir 下的子目录；无法确定时返回 None"""
+        if self._directory is None:
+            try:
+                self._directory = os.path.join(get_workflow_cachedir(), ASSET_DIRNAME)
+                os.makedirs(self._directory, exist_ok=True)
+            except Exception as e:
+                print(f"资源缓存不可用: {e}", file=sys.stderr)
+                self._directory = ""
+        return self._directory or None
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            return config.pipeline.asset_cache_max_bytes
+        return self._max_bytes
+
+    @staticmethod
+    def make_key(kind: str, params: Dict[str, Any]) -> str:
+        """根据资源类型和生成参数计算内容相关的缓存键"""
+        payload = json.dumps(params, sort_keys=True, default=list)
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+        return f"{kind}-{digest}"
+
+    def get_or_create(
+        self, kind: str, params: Dict[str, Any], factory: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """读取缓存的数组（只读内存映射），不存在时调用 factory 生成并写入缓存
+
+        Args:
+            kind: 资源类型，作为文件名前缀
+            params: 决定资源内容的全部参数（配置与尺寸），需可 JSON 序列化
+            factory: 生成资源数组的函数
+        """
+        directory = self.directory
+        if not config.pipeline.asset_cache_enabled or directory is None:
+            return factory()
+
+        path = os.path.join(directory, self.make_key(kind, params) + ".npy")
+        try:
+            array = np.load(path, mmap_mode="r")
+            # 用修改时间记录最近一次使用，供 LRU 淘汰
+            os.utime(path)
+            self.hits += 1
+            return array
+        except (OSError, ValueError):
+            pass
+
+        self.misses += 1
+        array = np.ascontiguousarray(factory())
+        try:
+            self._write(path, array)
+            self._evict()
+        except OSError as e:
+            print(f"写入资源缓存失败: {e}", file=sys.stderr)
+        return array
+
+    def _write(self, path: str, array: np.ndarray) -> None:
+        """先写临时文件再原子替换，避免并发进程读到写了一半的文件"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _evict(self) -> None:
+        """缓存总大小超过上限时，从最久未使用的文件开始删除"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".npy"):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        """删除全部缓存文件"""
+        directory = self.directory
+        if directory is None:
+            return
+        for name in os.listdir(directory):
+            if name.endswith(".npy"):
+                os.unlink(os.path.join(directory, name))
+
+
+# 全局资源缓存实例
+asset_cache = AssetCache()
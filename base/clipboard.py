@@ -0,0 +1,231 @@
+"""
+剪贴板后端模块
+统一剪贴板图像的读写接口，直接读写编码后的图像字节，避免临时文件和多余的编解码
+
+- MacClipboardBackend: 通过 NSPasteboard 直接读写 PNG/TIFF 数据
+- LinuxClipboardBackend: 通过 wl-clipboard（Wayland）或 xclip（X11）读写
+- MemoryClipboardBackend: 内存中的替身，用于测试和在无界面环境下做基准测试
+
+通过环境变量 CLIPBOARD_BACKEND（macos / linux / memory）可强制指定后端，
+通过环境变量 clipboard_encoding 选择写入剪贴板时的编码方式（见 CLIPBOARD_ENCODINGS）
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from PIL import Image, UnidentifiedImageError
+
+from . import metrics
+from .config import config
+
+# 剪贴板图像格式与 MIME 类型的对应关系
+MIME_TYPES = {"PNG": "image/png", "TIFF": "image/tiff"}
+
+# 剪贴板内容会被立即粘贴，无需追求体积，默认使用最便宜的编码
+CLIPBOARD_ENCODINGS = {
+    "png": ("PNG", {}),  # Pillow 默认压缩级别
+    "png-fast": ("PNG", {"compress_level": 1}),  # zlib 最快级别
+    "png-store": ("PNG", {"compress_level": 0}),  # 只存储不压缩
+    "tiff": ("TIFF", {"compression": "raw"}),  # 不压缩的TIFF
+}
+
+
+class ClipboardConfigError(ValueError):
+    """剪贴板配置错误（与剪贴板内容无关）"""
+
+
+class ClipboardEncodingError(ClipboardConfigError):
+    """未知的剪贴板编码方式"""
+
+
+class ClipboardBackendError(ClipboardConfigError):
+    """未知的剪贴板后端，或后端依赖的命令不可用"""
+
+
+def get_clipboard_encoding(encoding: Optional[str] = None) -> str:
+    """按参数、环境变量 clipboard_encoding、配置的顺序确定剪贴板编码方式"""
+    encoding = encoding or os.environ.get("clipboard_encoding") or config.pipeline.clipboard_encoding
+    if encoding not in CLIPBOARD_ENCODINGS:
+        raise ClipboardEncodingError(
+            f"未知的剪贴板编码方式: {encoding}，可选 {', '.join(CLIPBOARD_ENCODINGS)}"
+        )
+    return encoding
+
+
+def encode_image(image: Image.Image, encoding: Optional[str] = None) -> Tuple[bytes, str]:
+    """按剪贴板编码方式编码图像，返回 (字节, 格式名)"""
+    fmt, save_kwargs = CLIPBOARD_ENCODINGS[get_clipboard_encoding(encoding)]
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **save_kwargs)
+    return buffer.getvalue(), fmt
+
+# 可以直接从文件读取字节的图像扩展名
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".tif", ".tiff", ".bmp", ".webp")
+
+
+class ClipboardBackend(ABC):
+    """剪贴板后端基类"""
+
+    name = "base"
+
+    @abstractmethod
+    def read_bytes(self) -> Optional[Tuple[bytes, str]]:
+        """读取剪贴板上的图像字节
+
+        Returns:
+            (编码后的图像字节, 格式名如 "PNG"/"TIFF")；剪贴板上没有图像时返回 None
+        """
+
+    @abstractmethod
+    def write_bytes(self, data: bytes, fmt: str = "PNG") -> None:
+        """将已编码的图像字节写入剪贴板"""
+
+    def read_image(self) -> Optional[Image.Image]:
+        """读取剪贴板图像并直接从内存解码"""
+        result = self.read_bytes()
+        if result is None:
+            return None
+        image = Image.open(io.BytesIO(result[0]))
+        image.load()
+        return image
+
+    def write_image(self, image: Image.Image, encoding: Optional[str] = None) -> None:
+        """按剪贴板编码方式编码图像并写入剪贴板"""
+        data, fmt = encode_image(image, encoding)
+        self.write_bytes(data, fmt)
+        metrics.record_output(len(data))
+
+
+class MacClipboardBackend(ClipboardBackend):
+    """macOS 原生剪贴板，直接读写 NSPasteboard 中的数据"""
+
+    name = "macos"
+
+    def __init__(self):
+        # 只在真正使用 macOS 剪贴板时才导入 PyObjC
+        import Cocoa
+
+        self._appkit = Cocoa
+
+    def _read_file_url(self, pb) -> Optional[Tuple[bytes, str]]:
+        """在 Finder 中复制的图像文件以文件 URL 的形式出现在剪贴板上，直接读取文件字节"""
+        url = pb.stringForType_(self._appkit.NSPasteboardTypeFileURL)
+        if not url:
+            return None
+        path = unquote(urlparse(str(url)).path)
+        if not path.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            # 只解析文件头；Pillow 无法识别时（如缺少对应解码器）改用剪贴板上系统提供的 PNG/TIFF
+            Image.open(io.BytesIO(data))
+        except (UnidentifiedImageError, OSError):
+            return None
+        return data, os.path.splitext(path)[1][1:].upper()
+
+    def read_bytes(self) -> Optional[Tuple[bytes, str]]:
+        pb = self._appkit.NSPasteboard.generalPasteboard()
+        # Finder 复制文件时剪贴板上还会有文件图标的 TIFF，因此优先读取文件本身
+        result = self._read_file_url(pb)
+        if result is not None:
+            return result
+        for pb_type, fmt in (
+            (self._appkit.NSPasteboardTypePNG, "PNG"),
+            (self._appkit.NSPasteboardTypeTIFF, "TIFF"),
+        ):
+            data = pb.dataForType_(pb_type)
+            if data is not None and data.length() > 0:
+                return bytes(data), fmt
+        return None
+
+    def write_bytes(self, data: bytes, fmt: str = "PNG") -> None:
+        pb_type = {
+            "PNG": self._appkit.NSPasteboardTypePNG,
+            "TIFF": self._appkit.NSPasteboardTypeTIFF,
+        }[fmt]
+        ns_data = self._appkit.NSData.dataWithBytes_length_(data, len(data))
+        pb = self._appkit.NSPasteboard.generalPasteboard()
+        pb.clearContents()
+        pb.setData_forType_(ns_data, pb_type)
+
+
+class LinuxClipboardBackend(ClipboardBackend):
+    """Linux 剪贴板，Wayland 下使用 wl-paste/wl-copy，X11 下使用 xclip"""
+
+    name = "linux"
+
+    def __init__(self):
+        self.wayland = bool(os.environ.get("WAYLAND_DISPLAY")) and shutil.which("wl-paste") is not None
+        if not self.wayland and shutil.which("xclip") is None:
+            raise ClipboardBackendError("需要安装 wl-clipboard 或 xclip 才能访问剪贴板")
+
+    def _read_command(self, mime: str):
+        if self.wayland:
+            return ["wl-paste", "--no-newline", "--type", mime]
+        return ["xclip", "-selection", "clipboard", "-target", mime, "-out"]
+
+    def _write_command(self, mime: str):
+        if self.wayland:
+            return ["wl-copy", "--type", mime]
+        return ["xclip", "-selection", "clipboard", "-target", mime, "-in"]
+
+    def read_bytes(self) -> Optional[Tuple[bytes, str]]:
+        for fmt, mime in MIME_TYPES.items():
+            proc = subprocess.run(self._read_command(mime), capture_output=True)
+            if proc.returncode == 0 and proc.stdout:
+                return proc.stdout, fmt
+        return None
+
+    def write_bytes(self, data: bytes, fmt: str = "PNG") -> None:
+        # xclip/wl-copy 会留在后台持有剪贴板内容，不能等待其退出
+        proc = subprocess.Popen(
+            self._write_command(MIME_TYPES[fmt]),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        proc.stdin.write(data)
+        proc.stdin.close()
+
+
+class MemoryClipboardBackend(ClipboardBackend):
+    """内存中的剪贴板替身，只保存最近一次写入的数据"""
+
+    name = "memory"
+
+    def __init__(self, data: Optional[bytes] = None, fmt: str = "PNG"):
+        self.data = data
+        self.format = fmt
+
+    def read_bytes(self) -> Optional[Tuple[bytes, str]]:
+        if not self.data:
+            return None
+        return self.data, self.format
+
+    def write_bytes(self, data: bytes, fmt: str = "PNG") -> None:
+        self.data = data
+        self.format = fmt
+
+
+BACKENDS = {
+    MacClipboardBackend.name: MacClipboardBackend,
+    LinuxClipboardBackend.name: LinuxClipboardBackend,
+    MemoryClipboardBackend.name: MemoryClipboardBackend,
+}
+
+
+def get_clipboard_backend(name: Optional[str] = None) -> ClipboardBackend:
+    """按名称或环境变量 CLIPBOARD_BACKEND 创建剪贴板后端，未指定时根据平台选择"""
+    name = name or os.environ.get("CLIPBOARD_BACKEND")
+    if not name:
+        name = "macos" if sys.platform == "darwin" else "linux"
+    if name not in BACKENDS:
+        raise ClipboardBackendError(f"未知的剪贴板后端: {name}，可选 {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -47,6 +47,61 @@ class PadTextConfig:
     pad_color: Tuple[int, int, int] = (255, 255, 255)  # 填充颜色
     max_width_ratio: float = 0.9  # 最大宽度比例
 
+@dataclass
+class PipelineConfig:
+    """处理流水线配置"""
+
+    # GIF 批量处理时每个帧块可占用的内存上限（字节）
+    batch_memory_budget: int = 32 * 1024 * 1024
+
+    # 预计算资源（遮罩、渐变等）的磁盘缓存
+    asset_cache_enabled: bool = True
+    asset_cache_max_bytes: int = 256 * 1024 * 1024  # 缓存总大小上限，超出后按最近使用时间淘汰
+
+    # 写入剪贴板时的编码方式，可通过工作流环境变量 clipboard_encoding 覆盖
+    # 'png'（默认压缩）、'png-fast'（zlib 1级）、'png-store'（不压缩）、'tiff'（不压缩的TIFF）
+    clipboard_encoding: str = "png-fast"
+
+    # 输出像素数超过该值时，文件输出改用多线程 PNG 编码
+    parallel_png_min_pixels: int = 4_000_000
+    png_threads: int = 0  # 多线程 PNG 编码使用的线程数，0 表示使用全部 CPU 核心
+
+    # 文件输出前的位深优化：'off'、'lossless'（调色板/灰度/去alpha）、'lossy'（颜色过多时量化）
+    png_reduce: str = "lossless"
+    png_lossy_colors: int = 256
+
+    # 文件模式下多个文件的 解码/计算/编码 分阶段并行，阶段之间最多缓存的图像数
+    overlap_file_io: bool = True
+    file_queue_size: int = 2
+
+    # 增量处理：输出目录清单中记录的输入、配置和输出都未变化时跳过该文件，可用 --incremental 开启
+    incremental: bool = False
+
+    # 并行批处理时同时运行的任务预计峰值内存之和的上限（字节），0 表示物理内存的一半
+    memory_budget: int = 0
+    # 超过 Pillow 解压炸弹阈值的输入单独运行；像素数超过该值时直接拒绝
+    max_input_pixels: int = 1_000_000_000
+
+    # 每次运行向缓存目录中的指标日志追加一条记录，供 main.py stats 汇总
+    metrics_enabled: bool = True
+    metrics_max_bytes: int = 4 * 1024 * 1024  # 日志大小上限，超出后丢弃较旧的一半记录
+
+    # --profile 保存的文本汇总中按累计耗时列出的函数数
+    profile_top_n: int = 40
+
+
+@dataclass
+class ServerConfig:
+    """本地 HTTP 服务配置"""
+
+    host: str = "127.0.0.1"  # 默认只监听本机
+    port: int = 8765
+    workers: int = 0  # 处理图像的线程数，0 表示使用全部 CPU 核心
+    max_queue: int = 16  # 等待处理的请求数上限，超出时返回 503
+    max_request_bytes: int = 64 * 1024 * 1024  # 请求体大小上限，超出时返回 413
+    latency_window: int = 1024  # 健康检查统计延迟分位数时保留的最近请求数
+
+
 @dataclass
 class WorkflowConfig:
     """工作流配置"""
@@ -54,6 +109,8 @@ class WorkflowConfig:
     beautify: BeautifyConfig = field(default_factory=BeautifyConfig)
     torn_edge: TornEdgeConfig = field(default_factory=TornEdgeConfig)
     pad_text: PadTextConfig = field(default_factory=PadTextConfig)
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
 
 
     # 工作流名称
@@ -0,0 +1,171 @@
+"""
+任务成本估算与内存准入模块
+只读取文件头得到尺寸和帧数，按处理器的成本模型（ImageProcessor.still_cost / gif_cost）
+预测峰值内存和CPU时间；并行批处理时据此只在内存预算内放行任务。
+
+超过 Pillow 解压炸弹阈值的输入（Image.MAX_IMAGE_PIXELS）不会与其他任务并行：
+调度器等待正在运行的任务全部结束后单独运行它，并只在此期间解除 Pillow 的像素数检查，
+输出则由多线程分块 PNG 编码写出（见 png_writer）
+"""
+
+import base64
+import io
+import os
+import threading
+import warnings
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Type, Union
+
+from PIL import Image
+
+from .config import config
+from .image_processor import ImageProcessor
+
+# 导入时记录 Pillow 的解压炸弹阈值，单独运行超大任务期间会临时解除该检查
+BOMB_PIXELS = Image.MAX_IMAGE_PIXELS
+
+# 无法获取物理内存大小时使用的默认内存预算
+DEFAULT_MEMORY_BUDGET = 2 * 1024 * 1024 * 1024
+
+
+@dataclass
+class CostEstimate:
+    """单个输入的成本估算"""
+
+    format: str
+    width: int
+    height: int
+    frames: int
+    peak_bytes: int  # 预计峰值内存
+    cpu_seconds: float  # 预计单核CPU时间
+    large: bool  # 超过解压炸弹阈值，需要单独运行
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["peak_mb"] = round(self.peak_bytes / 1024 / 1024, 1)
+        result["cpu_seconds"] = round(self.cpu_seconds, 3)
+        return result
+
+
+def default_memory_budget() -> int:
+    """配置的内存预算，未配置时取物理内存的一半"""
+    if config.pipeline.memory_budget:
+        return config.pipeline.memory_budget
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (AttributeError, ValueError, OSError):
+        return DEFAULT_MEMORY_BUDGET
+
+
+def open_header(fp: BinaryIO) -> Image.Image:
+    """打开图像但不解码像素；超大图像绕过 Image.open 的像素数检查，直接由格式插件解析文件头"""
+    try:
+        # 成本估算会如实标记超大输入，这里不需要 Pillow 的警告
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            return Image.open(fp)
+    except Image.DecompressionBombError:
+        pass
+    fp.seek(0)
+    prefix = fp.read(16)
+    Image.init()
+    for format_id in Image.ID:
+        factory, accept = Image.OPEN[format_id]
+        if accept and not accept(prefix):
+            continue
+        try:
+            fp.seek(0)
+            return factory(fp, "")
+        except Exception:
+            continue
+    raise Image.UnidentifiedImageError("无法识别的图像文件")
+
+
+def estimate(processor: Type[ImageProcessor], source: Union[str, bytes, BinaryIO]) -> CostEstimate:
+    """估算用 processor 处理 source（路径、编码字节或文件对象）的成本，只读取文件头
+
+    Raises:
+        ValueError: 像素数超过 config.pipeline.max_input_pixels
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return estimate(processor, f)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    image = open_header(source)
+    is_gif = image.format == "GIF"
+    frames = getattr(image, "n_frames", 1) if is_gif else 1
+    width, height = image.size
+    if width * height > config.pipeline.max_input_pixels:
+        raise ValueError(f"图像尺寸 {width}x{height} 超过上限 {config.pipeline.max_input_pixels} 像素")
+    peak_bytes, cpu_seconds = processor.estimate_cost((width, height), frames, is_gif)
+    return CostEstimate(
+        format=image.format or "",
+        width=width,
+        height=height,
+        frames=frames,
+        peak_bytes=peak_bytes,
+        cpu_seconds=cpu_seconds,
+        large=BOMB_PIXELS is not None and width * height > BOMB_PIXELS,
+    )
+
+
+def estimate_job(processor: Type[ImageProcessor], job: Dict[str, Any]) -> CostEstimate:
+    """估算一个批处理任务（见 base/jobs.py）的成本"""
+    if job.get("input"):
+        return estimate(processor, job["input"])
+    if job.get("input_b64"):
+        return estimate(processor, base64.b64decode(job["input_b64"]))
+    raise ValueError("任务缺少 input 或 input_b64")
+
+
+@contextmanager
+def allow_large_images() -> Iterator[None]:
+    """临时解除 Pillow 的像素数检查，只应在没有其他任务并行时使用"""
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        yield
+    finally:
+        Image.MAX_IMAGE_PIXELS = BOMB_PIXELS
+
+
+class MemoryScheduler:
+    """按预计峰值内存放行任务：正在运行的任务之和不超过预算
+
+    超过预算或超过解压炸弹阈值的任务独占运行。任务由单个线程按顺序放行，
+    等待中的大任务会阻塞后续任务的放行，因此不会被小任务饿死
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget or default_memory_budget()
+        self.used = 0
+        self.running = 0
+        self.exclusive = False
+        self._condition = threading.Condition()
+
+    def is_exclusive(self, estimate: CostEstimate) -> bool:
+        return estimate.large or estimate.peak_bytes >= self.budget
+
+    def acquire(self, estimate: CostEstimate) -> None:
+        """阻塞直到任务可以在预算内运行"""
+        exclusive = self.is_exclusive(estimate)
+        with self._condition:
+            if exclusive:
+                self._condition.wait_for(lambda: self.running == 0)
+                self.exclusive = True
+            else:
+                self._condition.wait_for(
+                    lambda: not self.exclusive and self.used + estimate.peak_bytes <= self.budget
+                )
+            self.used += estimate.peak_bytes
+            self.running += 1
+
+    def release(self, estimate: CostEstimate) -> None:
+        with self._condition:
+            self.used -= estimate.peak_bytes
+            self.running -= 1
+            if self.is_exclusive(estimate):
+                self.exclusive = False
+            self._condition.notify_all()
@@ -6,30 +6,90 @@
 import io
 import os
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 import numpy as np
-from Cocoa import NSData, NSImage, NSPasteboard, NSPasteboardTypePNG
-from PIL import Image, ImageDraw, ImageGrab, ImageOps
+from PIL import Image, ImageDraw, ImageOps
 import sys
+from . import metrics
+from .clipboard import (
+    ClipboardBackend,
+    ClipboardConfigError,
+    get_clipboard_backend,
+    get_clipboard_encoding,
+)
+from .config import config
+from .png_optimizer import reduce_image
+from .png_writer import save_png
+from .tracing import span
 from .utils import show_macos_notification
 from .workflow.notify import notify
 
 
+def _output_position(output: Union[str, BinaryIO]) -> int:
+    return 0 if isinstance(output, str) else output.tell()
+
+
+def _written_bytes(output: Union[str, BinaryIO], start: int) -> int:
+    """保存结束后写入的字节数，用于运行指标"""
+    if isinstance(output, str):
+        return os.path.getsize(output)
+    return output.tell() - start
+
+
 class ImageProcessor(ABC):
     """图像处理基类"""
 
+    # 处理器能力声明：子类按实际行为覆盖，基类据此跳过流水线中不必要的阶段
+    output_opaque: bool = False  # 输出始终不透明，可跳过透明度处理
+    preserves_geometry: bool = False  # 输出尺寸与输入一致，apply_batch 原地改写帧栈，不另外分配输出
+    alpha_only: bool = False  # 只修改alpha通道，RGB数据保持不变，输出alpha只取决于输入alpha
+    frame_invariant: bool = False  # 处理参数不随帧变化，同尺寸帧可共享预计算结果
+
+    # 每个处理器实例最多缓存的预计算结果数量（按尺寸区分）
+    plan_cache_size: int = 8
+
+    # 成本模型：(每像素峰值内存字节, 每像素CPU纳秒)，包含解码、处理和编码，按实测取偏保守的值
+    still_cost: Tuple[float, float] = (40.0, 60.0)
+    gif_cost: Tuple[float, float] = (18.0, 190.0)  # GIF 按 宽x高x帧数 计算像素
+
     def __init__(self, workflow_name: str):
         self.workflow_name = workflow_name
+        self._plans: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._clipboard: Optional[ClipboardBackend] = None
+
+    @property
+    def clipboard(self) -> ClipboardBackend:
+        """剪贴板后端，首次使用时按平台或 CLIPBOARD_BACKEND 环境变量创建"""
+        if self._clipboard is None:
+            self._clipboard = get_clipboard_backend()
+        return self._clipboard
+
+    @clipboard.setter
+    def clipboard(self, backend: ClipboardBackend) -> None:
+        self._clipboard = backend
+
+    def notify(self, message: str) -> None:
+        """发送系统通知；非 macOS 环境（如无界面的 Linux 服务器）下只输出到 stderr"""
+        if sys.platform != "darwin":
+            print(f"{self.workflow_name}: {message}", file=sys.stderr)
+            return
+        with span("notify"):
+            notify(self.workflow_name, message)
 
     def get_image_from_clipboard(self) -> Image.Image:
         """从剪贴板获取图像"""
-        img = ImageGrab.grabclipboard()
+        with span("clipboard.read", backend=self.clipboard.name):
+            img = self.clipboard.read_image()
         if isinstance(img, Image.Image):
+            metrics.record_image(img.size)
             # 强制转换为RGBA，保证透明通道
             if img.mode != "RGBA":
-                img = img.convert("RGBA")
-            notify(self.workflow_name, "✅成功读取剪贴板上的图像")
+                with span("convert", mode=img.mode):
+                    img = img.convert("RGBA")
+            self.notify("✅成功读取剪贴板上的图像")
             return img
         else:
             raise ValueError("No image found in clipboard")
@@ -37,31 +97,116 @@ class ImageProcessor(ABC):
     def image_to_clipboard(self, image: Union[Image.Image, str]) -> None:
         """将图像复制到剪贴板"""
         if isinstance(image, str):
+            if image.lower().endswith(".png"):
+                # 已经是PNG文件，直接写入文件字节，无需解码再编码
+                with span("clipboard.write", backend=self.clipboard.name), open(image, "rb") as f:
+                    data = f.read()
+                    self.clipboard.write_bytes(data, "PNG")
+                metrics.record_output(len(data))
+                self.notify("✅成功复制处理后的图像到剪贴板")
+                return
             image = Image.open(image)
 
-        # 保存图像到字节缓冲区
         # 强制转换为RGBA，保证透明通道
         if image.mode != "RGBA":
-            image = image.convert("RGBA")
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        image_data = buffer.getvalue()
-
-        # 转换为NSData
-        data = NSData.dataWithBytes_length_(image_data, len(image_data))
-
-        # 创建NSImage并复制到剪贴板
-        ns_image = NSImage.alloc().initWithData_(data)
-        pb = NSPasteboard.generalPasteboard()
-        pb.clearContents()
-        pb.setData_forType_(data, NSPasteboardTypePNG)
-        notify(self.workflow_name, "✅成功复制处理后的图像到剪贴板")
+            with span("convert", mode=image.mode):
+                image = image.convert("RGBA")
+        with span("clipboard.write", backend=self.clipboard.name):
+            self.clipboard.write_image(image)
+        self.notify("✅成功复制处理后的图像到剪贴板")
 
     @abstractmethod
     def process_image(self, image: Image.Image) -> Image.Image:
         """处理图像的核心方法，子类必须实现"""
         pass
 
+    def plan(self, size: Tuple[int, int], mode: str = "RGBA") -> Any:
+        """预计算只与尺寸相关、与帧内容无关的数据（渐变、遮罩、排版等）
+
+        默认没有可预计算的内容，子类可覆盖并配合 apply 使用
+        """
+        return None
+
+    def apply(self, plan: Any, image: Image.Image) -> Image.Image:
+        """使用 plan 返回的预计算结果处理单帧，默认直接调用 process_image"""
+        return self.process_image(image)
+
+    def apply_batch(self, plan: Any, frames: np.ndarray) -> np.ndarray:
+        """对形状为 (N, H, W, 4) 的同尺寸RGBA帧栈批量处理
+
+        默认逐帧调用 apply，子类可用 ImageUtils 中的批量内核覆盖为一次广播运算。
+        frames 由调用方独占，preserves_geometry 的处理器应直接原地修改并返回 frames，
+        batch_chunk_size 按此不为输出帧栈预留内存。
+        """
+        return np.stack([
+            np.asarray(self.apply(plan, Image.fromarray(frame, "RGBA")).convert("RGBA"))
+            for frame in frames
+        ])
+
+    def apply_alpha(self, plan: Any, alpha: np.ndarray) -> np.ndarray:
+        """alpha_only 的处理器由形状为 (H, W) 的输入alpha计算输出alpha
+
+        默认把alpha放进一帧RGB全为0的帧栈调用 apply_batch，子类可覆盖为直接的遮罩运算
+        """
+        frames = np.zeros((1,) + alpha.shape + (4,), dtype=np.uint8)
+        frames[0, ..., 3] = alpha
+        return self.apply_batch(plan, frames)[0, ..., 3]
+
+    def batch_chunk_size(self, size: Tuple[int, int]) -> int:
+        """根据内存预算计算每批处理的帧数"""
+        # 输入帧栈、输出帧栈和混合运算的中间结果，按单帧RGBA字节数的4倍估算；
+        # 尺寸不变的处理器原地改写输入帧栈，没有输出帧栈，按2倍估算
+        frame_bytes = size[0] * size[1] * 4 * (2 if self.preserves_geometry else 4)
+        return max(1, config.pipeline.batch_memory_budget // max(frame_bytes, 1))
+
+    def plan_key(self, size: Tuple[int, int], mode: str = "RGBA") -> Tuple:
+        """预计算结果的缓存键；plan 还依赖尺寸以外的参数时，子类需把这些参数加入键中"""
+        return (tuple(size), mode)
+
+    def get_plan(self, size: Tuple[int, int], mode: str = "RGBA") -> Any:
+        """获取指定尺寸的预计算结果
+
+        frame_invariant 的处理器按 (size, mode) 缓存最近使用的结果，
+        GIF 的所有帧以及批处理中尺寸相同的文件共用同一份
+        """
+        if not self.frame_invariant:
+            return self.plan(size, mode)
+        key = self.plan_key(size, mode)
+        if key in self._plans:
+            self._plans.move_to_end(key)
+            metrics.record_plan(True)
+            return self._plans[key]
+        metrics.record_plan(False)
+        with span("plan", size=list(size)):
+            plan = self.plan(size, mode)
+        self._plans[key] = plan
+        if len(self._plans) > self.plan_cache_size:
+            self._plans.popitem(last=False)
+        return plan
+
+    def config_fingerprint(self) -> Dict[str, Any]:
+        """决定输出内容的全部配置，用于判断已有的输出是否过期
+
+        默认包含处理器类型、PNG 输出设置和实例上的配置 dataclass；
+        输出还依赖其他输入（文字、素材文件）时子类需覆盖并补充
+        """
+        fingerprint: Dict[str, Any] = {
+            "processor": type(self).__name__,
+            "png_reduce": config.pipeline.png_reduce,
+            "png_lossy_colors": config.pipeline.png_lossy_colors,
+        }
+        for name, value in vars(self).items():
+            if is_dataclass(value) and not isinstance(value, type):
+                fingerprint[name] = asdict(value)
+        return fingerprint
+
+    @classmethod
+    def estimate_cost(cls, size: Tuple[int, int], frames: int = 1, is_gif: bool = False) -> Tuple[int, float]:
+        """按成本模型估算处理一个输入的峰值内存（字节）和CPU时间（秒），无需创建实例"""
+        bytes_per_pixel, ns_per_pixel = cls.gif_cost if is_gif else cls.still_cost
+        pixels = size[0] * size[1] * max(1, frames)
+        return int(pixels * bytes_per_pixel), pixels * ns_per_pixel / 1e9
+
     @abstractmethod
     def rename_file(self, input_path: str) -> str:
         """根据输入路径生成新的文件名，子类必须实现"""
@@ -77,113 +222,356 @@ class ImageProcessor(ABC):
         if input_path.lower().endswith('.gif'):
             return self.process_gif_file(input_path, output_path)
         
-        image = Image.open(input_path).convert("RGBA")
-        result = self.process_image(image)
+        with span("decode", path=input_path):
+            image = Image.open(input_path)
+            image.load()
+        metrics.record_image(image.size)
+        with span("convert", mode=image.mode):
+            image = image.convert("RGBA")
+        with span("effect", size=list(image.size)):
+            result = self.process_image(image)
         if output_path is None:
             output_path = self.rename_file(input_path)
-        result.save(output_path, format="PNG")
+        self.save_result(result, output_path)
         return output_path
+
+    def process_bytes(self, data: bytes, output_format: Optional[str] = None, **save_options) -> bytes:
+        """处理编码后的图像字节并返回编码后的结果，全程在内存中完成，不经过临时文件
+
+        Args:
+            data: 输入图像的编码字节（PNG/JPEG/GIF 等 Pillow 支持的格式）
+            output_format: 输出格式，默认 GIF 输入输出 GIF，其余输出 PNG
+            save_options: 传给 Image.save 的编码参数，例如 quality
+        Returns:
+            输出图像的编码字节
+        """
+        image = Image.open(io.BytesIO(data))
+        input_format = image.format
+        output_format = (output_format or ("GIF" if input_format == "GIF" else "PNG")).upper()
+
+        buffer = io.BytesIO()
+        if input_format == "GIF" and output_format == "GIF":
+            self.process_gif_file(data, buffer)
+        else:
+            with span("decode", bytes=len(data)):
+                image.load()
+            metrics.record_image(image.size)
+            with span("convert", mode=image.mode):
+                image = image.convert("RGBA")
+            with span("effect", size=list(image.size)):
+                result = self.process_image(image)
+            self.save_result(result, buffer, output_format, **save_options)
+        return buffer.getvalue()
+
+    def save_result(
+        self,
+        result: Image.Image,
+        output: Union[str, BinaryIO],
+        output_format: str = "PNG",
+        **save_options,
+    ) -> None:
+        """按输出格式保存处理结果，PNG 走优化后的编码路径"""
+        start = _output_position(output)
+        if (self.output_opaque or output_format == "JPEG") and result.mode != "RGB":
+            # 输出不透明（或格式不支持alpha）时无需编码alpha通道
+            with span("convert", mode="RGB"):
+                result = result.convert("RGB")
+        if output_format == "PNG":
+            self.save_png(result, output)
+        else:
+            with span("encode", format=output_format):
+                result.save(output, format=output_format, **save_options)
+        metrics.record_output(_written_bytes(output, start))
+
+    @staticmethod
+    def save_png(image: Image.Image, output_path: Union[str, BinaryIO]) -> None:
+        """保存为PNG：先按颜色特征降低位深，大图使用多线程编码"""
+        with span("png.reduce", mode=config.pipeline.png_reduce):
+            image = reduce_image(
+                image, config.pipeline.png_reduce, config.pipeline.png_lossy_colors
+            )
+        with span("encode", format="PNG", mode=image.mode):
+            if image.width * image.height >= config.pipeline.parallel_png_min_pixels:
+                save_png(image, output_path, threads=config.pipeline.png_threads or None)
+            else:
+                image.save(output_path, format="PNG")
         
 
-    def process_gif_file(self, input_path: str, output_path: Optional[str] = None) -> str:
-        """处理 GIF 文件并保存结果，保证生成的 GIF 能动且支持透明（最终确定版）"""
+    def process_gif_file(
+        self,
+        input_path: Union[str, bytes],
+        output_path: Union[str, BinaryIO, None] = None,
+    ) -> Union[str, BinaryIO]:
+        """处理 GIF 文件并保存结果，保证生成的 GIF 能动且支持透明（最终确定版）
+
+        input_path 也可以是 GIF 的编码字节，此时必须指定 output_path（路径或文件对象）
+        """
         
-        print("Processing GIF with direct index pasting control:", input_path, file=sys.stderr)
+        if isinstance(input_path, str):
+            print("Processing GIF with direct index pasting control:", input_path, file=sys.stderr)
         
-        im = Image.open(input_path)
-
-        # 1. 设定透明色在调色板中的固定索引
-        transparency_index = 255
+        im = self._open_image(input_path)
 
         # 提取原始GIF信息
         duration = im.info.get('duration', 100)
         loop = im.info.get('loop', 0)
 
-        # 2. 第一遍：处理所有帧，得到最终效果的RGBA图像列表
-        rgba_frames = []
+        # 只修改alpha的处理器：调色板GIF直接复用原调色板和帧索引，完全跳过量化
+        reused = None
+        if self.alpha_only:
+            with span("gif.reuse_palette"):
+                reused = self._process_gif_reuse_palette(im)
+        if reused is not None:
+            paletted_frames, transparency_index = reused
+        else:
+            if im.tell():
+                # 复用调色板的路径已解码过部分帧，从第一帧重新开始
+                im.seek(0)
+            # 设定透明色在调色板中的固定索引；输出不透明时整个透明度处理阶段都可跳过
+            transparency_index = None if self.output_opaque else 255
+            with span("gif.requantize"):
+                paletted_frames = self._process_gif_requantize(im, transparency_index)
+
+        # 设置输出路径
+        if output_path is None:
+            output_path = self.rename_file(input_path)
+
+        # 保存GIF，需要透明时明确指定透明色的索引
+        save_kwargs = {}
+        if transparency_index is not None:
+            save_kwargs["transparency"] = transparency_index
+        metrics.record_image(im.size, len(paletted_frames))
+        start = _output_position(output_path)
+        with span("encode", format="GIF", frames=len(paletted_frames)):
+            paletted_frames[0].save(
+                output_path,
+                format="GIF",
+                save_all=True,
+                append_images=paletted_frames[1:],
+                duration=duration,
+                loop=loop,
+                optimize=False,
+                **save_kwargs
+            )
+        metrics.record_output(_written_bytes(output_path, start))
+        return output_path
+
+    def _process_gif_requantize(
+        self, im: Image.Image, transparency_index: Optional[int]
+    ) -> List[Image.Image]:
+        """通用路径：逐帧处理为RGBA，再用全局调色板重新量化"""
+        # 1. 第一遍：按内存预算分块，把同尺寸帧堆叠成 (N, H, W, 4) 批量处理，得到最终效果的RGBA数组列表
+        chunk_size = self.batch_chunk_size(im.size) if self.frame_invariant else 1
+        rgba_frames: List[np.ndarray] = []
+        chunk: List[np.ndarray] = []
+
+        def flush_chunk():
+            # 同尺寸帧共用预计算结果
+            plan = self.get_plan(im.size, "RGBA")
+            with span("effect", frames=len(chunk)):
+                rgba_frames.extend(self.apply_batch(plan, np.stack(chunk)))
+            chunk.clear()
+
         try:
             while True:
-                rgba_frame = self.process_image(im.copy().convert("RGBA"))
-                rgba_frames.append(rgba_frame)
+                with span("decode", frame=im.tell()):
+                    chunk.append(np.asarray(im.convert("RGBA")))
+                if len(chunk) >= chunk_size:
+                    flush_chunk()
                 im.seek(im.tell() + 1)
         except EOFError:
             pass
+        if chunk:
+            flush_chunk()
 
         if not rgba_frames:
             raise ValueError("Could not process any frames from the GIF.")
 
-        # 3. 创建一个能代表所有帧颜色的全局统一调色板
+        # 2. 创建一个能代表所有帧颜色的全局统一调色板
         
         # 为了创建一个好的全局调色板，我们将所有帧的RGB数据拼接起来
-        all_frames_rgb_data = np.vstack(
-            [np.array(frame.convert("RGB")) for frame in rgba_frames]
-        )
-        all_frames_image = Image.fromarray(all_frames_rgb_data, 'RGB')
+        all_frames_image = Image.fromarray(self._stack_frames_rgb(rgba_frames), 'RGB')
         
-        # 从这个拼接的图像中生成一个255色的最优调色板，为透明色留出1个位置
-        temp_palette_image = all_frames_image.quantize(colors=255, dither=Image.Dither.NONE)
+        # 从这个拼接的图像中生成最优调色板；需要透明时只取255色，为透明色留出1个位置
+        palette_colors = 256 if transparency_index is None else 255
+        with span("gif.palette", frames=len(rgba_frames)):
+            temp_palette_image = all_frames_image.quantize(colors=palette_colors, dither=Image.Dither.NONE)
         
         # 创建最终的调色板：前255色来自图像内容，最后1色是我们自己加的
         final_palette = Image.new("P", (1, 1))
-        palette_data = temp_palette_image.getpalette()
-        if not palette_data: # 以防万一
-            palette_data = [0] * (255 * 3)
-        # 添加一个任意的颜色（比如黑色）作为透明色的占位符，它将被透明，所以具体颜色不重要
-        palette_data.extend([0, 0, 0]) 
+        palette_data = temp_palette_image.getpalette() or []
+        if transparency_index is not None:
+            # 补齐到透明索引之前，保证占位色正好落在 transparency_index 上
+            palette_data = palette_data[:transparency_index * 3]
+            palette_data.extend([0] * (transparency_index * 3 - len(palette_data)))
+            # 添加一个任意的颜色（比如黑色）作为透明色的占位符，它将被透明，所以具体颜色不重要
+            palette_data.extend([0, 0, 0])
         final_palette.putpalette(palette_data)
 
-        # 4. 第二遍：将每一帧转换为调色板模式，并手动应用透明度
+        # 3. 第二遍：将每一帧转换为调色板模式，并手动应用透明度
         paletted_frames = []
         for frame in rgba_frames:
-            # 提取原始的Alpha通道作为遮罩
-            alpha_mask = Image.eval(frame.getchannel('A'), lambda a: 255 if a < 128 else 0)
-
             # 将RGBA帧的颜色信息转换为使用我们的最终调色板的'P'模式图像
-            p_frame = frame.convert("RGB").quantize(palette=final_palette, dither=Image.Dither.NONE)
-
-            # 关键步骤：使用paste方法将透明索引“刷”到需要透明的区域
-            # 在'P'模式下，paste的第一个参数如果是整数，会被当作调色板索引
-            # 我们将索引255（透明色）粘贴到由alpha_mask定义的区域上
-            p_frame.paste(transparency_index, mask=alpha_mask)
+            rgb_frame = Image.fromarray(np.ascontiguousarray(frame[..., :3]), "RGB")
+            with span("gif.quantize"):
+                p_frame = rgb_frame.quantize(palette=final_palette, dither=Image.Dither.NONE)
+
+            if transparency_index is not None:
+                # 提取原始的Alpha通道作为遮罩
+                alpha_mask = Image.fromarray(np.where(frame[..., 3] < 128, 255, 0).astype(np.uint8), "L")
+
+                # 关键步骤：使用paste方法将透明索引“刷”到需要透明的区域
+                # 在'P'模式下，paste的第一个参数如果是整数，会被当作调色板索引
+                # 我们将索引255（透明色）粘贴到由alpha_mask定义的区域上
+                p_frame.paste(transparency_index, mask=alpha_mask)
             
             paletted_frames.append(p_frame)
+        return paletted_frames
 
-        # 设置输出路径
-        if output_path is None:
-            output_path = self.rename_file(input_path)
+    @staticmethod
+    def _open_image(source: Union[str, bytes]) -> Image.Image:
+        """打开文件路径或内存中的编码字节"""
+        if isinstance(source, bytes):
+            return Image.open(io.BytesIO(source))
+        return Image.open(source)
+
+    def _process_gif_reuse_palette(
+        self, im: Image.Image
+    ) -> Optional[Tuple[List[Image.Image], int]]:
+        """alpha-only 路径：保留原调色板，只把被遮罩的像素改写为透明索引
+
+        处理器不改变RGB，因此每个不透明像素的颜色都能在原调色板中精确找回索引，
+        只需一次线性查表，无需量化，也没有颜色损失。处理器只对alpha通道运算（apply_alpha），
+        调色板模式的帧直接使用解码出的索引，不转换为RGBA。
+        im 可能停在任意帧，回退时由调用方 seek(0)
 
-        # 5. 保存GIF，明确指定透明色的索引
-        paletted_frames[0].save(
-            output_path,
-            save_all=True,
-            append_images=paletted_frames[1:],
-            duration=duration,
-            loop=loop,
-            optimize=False,
-            transparency=transparency_index
-        )
-        return output_path
+        Returns:
+            (调色板帧列表, 透明索引)；输入不是调色板GIF、帧使用了局部调色板或调色板已满时返回 None，
+            由调用方回退到重新量化的通用路径
+        """
+        if im.mode != "P":
+            return None
+        palette_data = (im.getpalette() or [])[:256 * 3]
+        transparency = im.info.get("transparency")
+        if not isinstance(transparency, int):
+            transparency = None
+
+        # 以 0xRRGGBB 为键建立 颜色->索引 的有序查找表，透明色不参与查找
+        palette = np.array(palette_data, dtype=np.uint32).reshape(-1, 3)
+        keys = (palette[:, 0] << 16) | (palette[:, 1] << 8) | palette[:, 2]
+        candidates = np.arange(len(keys))
+        if transparency is not None:
+            candidates = candidates[candidates != transparency]
+        order = candidates[np.argsort(keys[candidates], kind="stable")]
+        sorted_keys = keys[order]
+        if sorted_keys.size == 0:
+            return None
+
+        index_frames = []
+        masks = []
+        try:
+            while True:
+                plan = self.get_plan(im.size, "RGBA")
+                if im.mode == "P":
+                    # 调色板帧（第一帧）：索引即结果，透明色以外的像素alpha为255
+                    indices = np.array(im)
+                    alpha = np.full(indices.shape, 255, dtype=np.uint8)
+                    if transparency is not None:
+                        alpha[indices == transparency] = 0
+                    mask = self.apply_alpha(plan, alpha) < 128
+                    if transparency is None or not np.any((indices == transparency) & ~mask):
+                        index_frames.append(indices)
+                        masks.append(mask)
+                        im.seek(im.tell() + 1)
+                        continue
+                    # 原本透明的像素变得可见，需要按颜色找回不透明的索引
+                    rgba = np.asarray(im.convert("RGBA"))
+                else:
+                    # 后续帧由 Pillow 合成为 RGB/RGBA，按颜色找回索引
+                    rgba = np.asarray(im if im.mode == "RGBA" else im.convert("RGBA"))
+                    mask = self.apply_alpha(plan, rgba[..., 3]) < 128
+
+                pixels = rgba.astype(np.uint32)
+                pixel_keys = (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+                positions = np.minimum(np.searchsorted(sorted_keys, pixel_keys), sorted_keys.size - 1)
+                if not np.all((sorted_keys[positions] == pixel_keys) | mask):
+                    # 有颜色不在全局调色板中（局部调色板），无法直接复用
+                    return None
+                index_frames.append(order[positions].astype(np.uint8))
+                masks.append(mask)
+                im.seek(im.tell() + 1)
+        except EOFError:
+            pass
+
+        if not index_frames:
+            raise ValueError("Could not process any frames from the GIF.")
+
+        # 选择透明索引：优先沿用原GIF的透明色，其次是调色板中的空位，最后是未被使用的索引
+        if transparency is not None:
+            transparency_index = transparency
+        elif len(palette_data) < 256 * 3:
+            transparency_index = len(palette_data) // 3
+            palette_data = palette_data + [0, 0, 0]
+        else:
+            used = np.zeros(256, dtype=bool)
+            for indices, mask in zip(index_frames, masks):
+                used[np.unique(indices[~mask])] = True
+            unused = np.flatnonzero(~used)
+            if unused.size == 0:
+                return None
+            transparency_index = int(unused[0])
 
-    def run(self,) -> None:
-        """运行图像处理流程"""
+        paletted_frames = []
+        for indices, mask in zip(index_frames, masks):
+            indices[mask] = transparency_index
+            p_frame = Image.fromarray(indices, "P")
+            p_frame.putpalette(palette_data)
+            paletted_frames.append(p_frame)
+        return paletted_frames, transparency_index
+
+    @staticmethod
+    def _stack_frames_rgb(frames: List[np.ndarray]) -> np.ndarray:
+        """将所有帧的RGB数据纵向拼接，用于生成全局调色板"""
+        # 所有帧尺寸一致，直接写入预分配的缓冲区，省去逐帧复制和 vstack 的再次复制
+        height, width = frames[0].shape[:2]
+        stacked = np.empty((len(frames) * height, width, 3), dtype=np.uint8)
+        for i, frame in enumerate(frames):
+            stacked[i * height:(i + 1) * height] = frame[..., :3]
+        return stacked
+
+    def run(self,) -> bool:
+        """运行图像处理流程，成功时返回 True"""
         
         
         try:
+            # 先检查配置（剪贴板后端和编码方式），避免处理完才失败或被误报为剪贴板为空
+            self.clipboard
+            get_clipboard_encoding()
+
             # 从剪贴板获取图像
             image = self.get_image_from_clipboard()
 
             # 处理图像
-            processed_image = self.process_image(image)
+            with span("effect", size=list(image.size)):
+                processed_image = self.process_image(image)
 
             # 复制到剪贴板
             self.image_to_clipboard(processed_image)
+            return True
 
+        except ClipboardConfigError as e:
+            metrics.record_failure()
+            print(f"配置错误: {e}")
+            self.notify(f"❌配置错误: {str(e)[:50]}")
         except ValueError as e:
+            metrics.record_failure()
             print(f"错误: {e}")
-            notify(self.workflow_name, "❌剪贴板上没有图像")
+            self.notify("❌剪贴板上没有图像")
         except Exception as e:
+            metrics.record_failure()
             print(f"发生错误: {e}")
-            notify(self.workflow_name, f"❌发生错误: {str(e)[:50]}")
+            self.notify(f"❌发生错误: {str(e)[:50]}")
+        return False
 
 
 class ImageUtils:
@@ -192,16 +580,107 @@ class ImageUtils:
     @staticmethod
     def add_rounded_corners(image: Image.Image, radius: int) -> Image.Image:
         """为图像添加圆角，保留原图透明信息"""
-        image = image.convert("RGBA")
-        mask = Image.new("L", image.size, 0)
+        mask = ImageUtils.create_corner_mask(image.size, radius)
+        return ImageUtils.apply_corner_mask(image, mask)
+
+    @staticmethod
+    def create_corner_mask(size: Tuple[int, int], radius: int) -> Image.Image:
+        """创建圆角遮罩，圆角矩形内为255，其余为0"""
+        mask = Image.new("L", size, 0)
         draw = ImageDraw.Draw(mask)
-        draw.rounded_rectangle((0, 0, *image.size), radius, fill=255)
+        draw.rounded_rectangle((0, 0, *size), radius, fill=255)
+        return mask
+
+    @staticmethod
+    def apply_corner_mask(image: Image.Image, mask: Image.Image) -> Image.Image:
+        """用预先生成的圆角遮罩处理图像的alpha通道"""
+        image = image.convert("RGBA")
         r, g, b, a = image.split()
         # 只处理alpha通道，圆角区域为原alpha，其他为0
         new_alpha = Image.composite(a, mask, mask)
         rounded_image = Image.merge("RGBA", (r, g, b, new_alpha))
         return rounded_image
 
+    @staticmethod
+    def blend_batch(dst: np.ndarray, src: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """按 mask 将 src 原地混合到 dst 上，结果与逐帧 Image.paste(src, mask=mask) 逐字节一致
+
+        GIF 解码出的帧alpha只有0和255，因此先按整像素直接复制，只对半透明像素做取整混合
+
+        Args:
+            dst: 底图帧栈，形状 (N, H, W, 4)，可以是可写视图
+            src: 粘贴的帧栈，形状与 dst 相同
+            mask: 遮罩，形状 (N, H, W)
+        """
+        opaque = mask == 255
+        # 把每个RGBA像素看作一个 uint32，整像素复制只需一次按元素的掩码拷贝
+        np.copyto(dst.view(np.uint32)[..., 0], src.view(np.uint32)[..., 0], where=opaque)
+        partial = (mask != 0) & ~opaque
+        if partial.any():
+            # 与 Pillow 的 DIV255 取整方式一致
+            m = mask[partial][:, None].astype(np.uint16)
+            tmp = dst[partial].astype(np.uint16) * (255 - m) + src[partial].astype(np.uint16) * m + 128
+            dst[partial] = (((tmp >> 8) + tmp) >> 8).astype(np.uint8)
+        return dst
+
+    @staticmethod
+    def apply_corner_mask_batch(frames: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """批量为帧栈添加圆角，原地改写alpha通道
+
+        圆角遮罩只有0和255两种取值，composite 等价于逐像素取较小值
+        """
+        np.minimum(frames[..., 3], mask, out=frames[..., 3])
+        return frames
+
+    @staticmethod
+    def composite_batch(
+        background: np.ndarray,
+        frames: np.ndarray,
+        position: Tuple[int, int],
+        use_alpha: bool = True,
+    ) -> np.ndarray:
+        """将帧栈粘贴到同一张背景的 position 处，返回形状 (N, BH, BW, 4)
+
+        use_alpha 为 True 时以帧自身的alpha作为遮罩，否则直接覆盖
+        """
+        n, height, width = frames.shape[:3]
+        x, y = position
+        result = np.empty((n,) + background.shape, dtype=np.uint8)
+        result[:] = background
+        region = result[:, y:y + height, x:x + width]
+        if use_alpha:
+            ImageUtils.blend_batch(region, frames, frames[..., 3])
+        else:
+            region[:] = frames
+        return result
+
+    @staticmethod
+    def flatten_batch(
+        frames: np.ndarray, color: Tuple[int, int, int], inplace: bool = False
+    ) -> np.ndarray:
+        """将帧栈按自身alpha铺到纯色背景上
+
+        inplace 为 True 时直接改写并返回 frames，不分配新的帧栈，结果与默认方式逐字节一致
+        """
+        fill = np.frombuffer(bytes(tuple(color) + (255,)), dtype=np.uint32)[0]
+        if not inplace:
+            result = np.empty_like(frames)
+            result.view(np.uint32).fill(fill)
+            return ImageUtils.blend_batch(result, frames, frames[..., 3])
+
+        alpha = frames[..., 3].copy()
+        partial = (alpha != 0) & (alpha != 255)
+        # 半透明像素在被背景色覆盖前取出原值
+        m = alpha[partial][:, None].astype(np.uint16)
+        src = frames[partial].astype(np.uint16)
+        np.copyto(frames.view(np.uint32)[..., 0], fill, where=alpha != 255)
+        if len(m):
+            # 与 blend_batch 相同的 DIV255 取整
+            background = np.array(tuple(color) + (255,), dtype=np.uint16)
+            tmp = background * (255 - m) + src * m + 128
+            frames[partial] = (((tmp >> 8) + tmp) >> 8).astype(np.uint8)
+        return frames
+
     @staticmethod
     def create_gradient_background(
         size: Tuple[int, int],
@@ -228,13 +707,19 @@ class ImageUtils:
         return Image.fromarray(gradient_rgba, mode="RGBA")
 
     @staticmethod
-    def calculate_radius(image: Image.Image, max_radius: int = 15) -> int:
-        """计算合适的圆角半径"""
-        radius = int(image.width * 0.05)
+    def calculate_radius(
+        image: Union[Image.Image, Tuple[int, int]], max_radius: int = 15
+    ) -> int:
+        """计算合适的圆角半径，可传入图像或 (width, height)"""
+        width = image.width if isinstance(image, Image.Image) else image[0]
+        radius = int(width * 0.05)
         return min(radius, max_radius)
 
     @staticmethod
-    def calculate_padding(image: Image.Image, max_padding: int = 10) -> int:
-        """计算合适的内边距"""
-        padding = int(image.width * 0.05)
+    def calculate_padding(
+        image: Union[Image.Image, Tuple[int, int]], max_padding: int = 10
+    ) -> int:
+        """计算合适的内边距，可传入图像或 (width, height)"""
+        width = image.width if isinstance(image, Image.Image) else image[0]
+        padding = int(width * 0.05)
         return min(padding, max_padding)
@@ -0,0 +1,180 @@
+"""
+批处理任务模块
+从输入流逐行读取 JSON 任务（NDJSON），在同一个已预热的解释器中处理，每完成一个任务输出一行 JSON 结果，
+省去每张图片都重新启动解释器、导入模块和预热缓存的开销
+
+任务格式（每行一个 JSON 对象）：
+    {"id": "a", "action": "beautify", "input": "/path/a.png", "output": "/path/b.png",
+     "options": {"format": "png", "quality": 90, "text": "..."}}
+
+- input / input_b64: 输入文件路径，或 base64 编码的图像字节，二者取其一
+- output: 输出文件路径；省略时文件输入按处理器的默认规则命名，base64 输入则以 output_b64 返回结果
+- options.format / options.quality: 同 stream 模式的 --format / --quality
+- options.text: pad_text 要添加的文字，省略时读取环境变量 text
+
+任务按只读文件头得到的成本估算放行（见 base/cost.py），同时运行的任务预计峰值内存之和不超过预算；
+dry_run 时不处理，只为每个任务输出估算结果（estimate 字段）
+
+结果格式：
+    {"id": "a", "ok": true, "output": "/path/b.png", "ms": 12.3}
+    {"id": "b", "ok": false, "error": "...", "ms": 0.4}
+"""
+
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, Optional, TextIO, Type
+
+from .cost import CostEstimate, MemoryScheduler, allow_large_images, estimate_job
+from .image_processor import ImageProcessor
+
+
+class JobRunner:
+    """在线程池中执行任务，每个线程持有自己的处理器实例，预计算缓存在同一线程的任务间共享"""
+
+    def __init__(
+        self,
+        factories: Dict[str, Type[ImageProcessor]],
+        workers: int = 1,
+        memory_budget: Optional[int] = None,
+    ):
+        self.factories = factories
+        self.workers = max(1, workers)
+        self.scheduler = MemoryScheduler(memory_budget)
+        self._local = threading.local()
+
+    def estimate(self, job: Dict[str, Any]) -> CostEstimate:
+        """只读取文件头估算任务的峰值内存和CPU时间"""
+        action = job.get("action", "")
+        if action not in self.factories:
+            raise ValueError(f"未知的处理类型: {action}")
+        return estimate_job(self.factories[action], job)
+
+    def get_processor(self, action: str) -> ImageProcessor:
+        """获取当前线程中指定类型的处理器，首次使用时创建"""
+        processors = getattr(self._local, "processors", None)
+        if processors is None:
+            processors = self._local.processors = {}
+        if action not in processors:
+            if action not in self.factories:
+                raise ValueError(f"未知的处理类型: {action}")
+            processors[action] = self.factories[action]()
+        return processors[action]
+
+    def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """执行单个任务并返回结果（不抛出异常，错误写入结果的 error 字段）"""
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"id": job.get("id"), "ok": True}
+        try:
+            result.update(self._process(job))
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def process(self, action: str, data: bytes, options: Optional[Dict[str, Any]] = None) -> bytes:
+        """用当前线程的处理器处理编码后的图像字节，options 支持 format、quality、text"""
+        processor = self.get_processor(action)
+        options = options or {}
+        if hasattr(processor, "text"):
+            processor.text = options.get("text")
+        save_options = {}
+        if options.get("quality") is not None:
+            save_options["quality"] = int(options["quality"])
+        return processor.process_bytes(data, options.get("format"), **save_options)
+
+    def _process(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        action = job.get("action", "")
+        input_path = job.get("input")
+        if input_path:
+            with open(input_path, "rb") as f:
+                data = f.read()
+        elif job.get("input_b64"):
+            data = base64.b64decode(job["input_b64"])
+        else:
+            raise ValueError("任务缺少 input 或 input_b64")
+
+        output = self.process(action, data, job.get("options"))
+
+        output_path = job.get("output")
+        if output_path is None and input_path:
+            output_path = self.get_processor(action).rename_file(input_path)
+        if output_path is None:
+            return {"output_b64": base64.b64encode(output).decode("ascii")}
+        with open(output_path, "wb") as f:
+            f.write(output)
+        return {"output": output_path}
+
+    def run(self, lines: Iterable[str], out: TextIO, dry_run: bool = False) -> int:
+        """逐行读取任务并输出结果，结果按完成顺序输出；返回失败的任务数"""
+        lock = threading.Lock()
+        # 限制同时读入内存的任务数，避免输入很长时一次性读完
+        slots = threading.Semaphore(self.workers * 2)
+        failed = 0
+
+        def emit(result: Dict[str, Any]) -> None:
+            nonlocal failed
+            with lock:
+                if not result["ok"]:
+                    failed += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+
+        def execute(job: Dict[str, Any], cost: CostEstimate) -> None:
+            try:
+                # 超大输入此时独占运行，可以安全地解除 Pillow 的像素数检查
+                with allow_large_images() if cost.large else nullcontext():
+                    emit(self.run_job(job))
+            finally:
+                self.scheduler.release(cost)
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                job = {"id": number}
+                try:
+                    job = self._parse(line, number)
+                    cost = self.estimate(job)
+                except (ValueError, TypeError, AttributeError, OSError) as e:
+                    # 格式错误的任务只让这一个任务失败，不中断整批
+                    emit({"id": job["id"], "ok": False, "error": f"{type(e).__name__}: {e}", "ms": 0.0})
+                    continue
+                if dry_run:
+                    emit({"id": job["id"], "ok": True, "estimate": cost.to_dict()})
+                    continue
+                slots.acquire()
+                self.scheduler.acquire(cost)
+                executor.submit(execute, job, cost)
+        return failed
+
+    @staticmethod
+    def _parse(line: str, number: int) -> Dict[str, Any]:
+        """解析一行任务，未指定 id 时使用行号"""
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("任务必须是 JSON 对象")
+        job.setdefault("id", number)
+        for key in ("action", "input", "input_b64", "output"):
+            if job.get(key) is not None and not isinstance(job[key], str):
+                raise ValueError(f"任务的 {key} 必须是字符串")
+        if job.get("options") is not None and not isinstance(job["options"], dict):
+            raise ValueError("任务的 options 必须是 JSON 对象")
+        return job
+
+
+def run_jobs(
+    factories: Dict[str, Type[ImageProcessor]],
+    lines: Iterable[str],
+    out: TextIO,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> int:
+    """执行 NDJSON 任务流，返回失败的任务数"""
+    return JobRunner(factories, workers or 1).run(lines, out, dry_run)
@@ -0,0 +1,124 @@
+"""
+增量处理清单模块
+在每个输出目录中保存一个小的 JSON 清单，记录每个输入文件的 mtime/size、处理器配置的哈希和输出文件的状态。
+再次处理同一个文件夹时，只用 stat 即可判断输出是否已是最新，无需打开或解码任何图像
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .image_processor import ImageProcessor
+
+# 清单文件名（位于输出目录中）
+MANIFEST_NAME = ".beautifier-manifest.json"
+
+MANIFEST_VERSION = 1
+
+
+def config_hash(processor: ImageProcessor) -> str:
+    """处理器配置指纹的哈希"""
+    payload = json.dumps(processor.config_fingerprint(), sort_keys=True, default=list)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class OutputManifest:
+    """单个输出目录的清单"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, input_path: str) -> str:
+        return os.path.relpath(os.path.abspath(input_path), self.directory)
+
+    @staticmethod
+    def _stat(path: str) -> List[int]:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def is_up_to_date(self, input_path: str, output_path: str, digest: str) -> bool:
+        """输入、配置和输出都与上次记录一致时返回 True"""
+        entry = self.entries.get(self._key(input_path))
+        if entry is None or entry.get("config") != digest:
+            return False
+        try:
+            return (
+                entry.get("input") == self._stat(input_path)
+                and entry.get("output") == self._stat(output_path)
+                and entry.get("output_name") == os.path.basename(output_path)
+            )
+        except OSError:
+            return False
+
+    def record(self, input_path: str, output_path: str, digest: str) -> None:
+        self.entries[self._key(input_path)] = {
+            "input": self._stat(input_path),
+            "output": self._stat(output_path),
+            "output_name": os.path.basename(output_path),
+            "config": digest,
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        """原子地写回清单，没有变化时不写"""
+        if not self.dirty:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+class IncrementalIndex:
+    """跨多个输出目录的清单集合，每个目录只读取一次"""
+
+    def __init__(self, processor: ImageProcessor):
+        self.processor = processor
+        self.digest = config_hash(processor)
+        self._manifests: Dict[str, OutputManifest] = {}
+
+    def manifest(self, output_path: str) -> OutputManifest:
+        directory = os.path.dirname(os.path.abspath(output_path))
+        if directory not in self._manifests:
+            self._manifests[directory] = OutputManifest(directory)
+        return self._manifests[directory]
+
+    def split(self, paths: Sequence[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """把输入分为需要处理的文件和已是最新的 (输入, 输出)"""
+        pending, skipped = [], []
+        for path in paths:
+            output_path = self.processor.rename_file(path)
+            if self.manifest(output_path).is_up_to_date(path, output_path, self.digest):
+                skipped.append((path, output_path))
+            else:
+                pending.append(path)
+        return pending, skipped
+
+    def record(self, input_path: str, output_path: str) -> None:
+        self.manifest(output_path).record(input_path, output_path, self.digest)
+
+    def save(self) -> None:
+        for manifest in self._manifests.values():
+            try:
+                manifest.save()
+            except OSError as e:
+                print(f"写入增量清单失败 {manifest.path}: {e}", file=sys.stderr)
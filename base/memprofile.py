@@ -0,0 +1,268 @@
+"""
+内存分析模块
+为 tracing.span 标记的每个阶段（解码、转换、效果子步骤、量化、编码等）记录
+tracemalloc 峰值、RSS 变化和峰值 RSS 的增长，并在每个阶段出现最大峰值时记录阶段结束时仍占用内存最多的代码位置。
+tracemalloc 只统计 Python 和 numpy 的分配，Pillow 图像缓冲区由 C 代码分配，体现在 RSS 的变化中。
+当前 RSS 在 Linux 上读 /proc/self/statm，在 macOS 上调用 task_info；都不可用时（报告中 rss_source 为 null）
+只记录按阶段的峰值 RSS 增长（getrusage 的 ru_maxrss）。
+
+通过环境变量 BEAUTIFIER_MEMPROFILE 开启，进程退出时把报告写到工作流缓存目录：
+    memprofile/memory-<时间戳>.json 以及固定路径 memprofile/memory-latest.json（供基准测试断言）
+
+tracemalloc 统计的是整个进程，多线程同时运行的阶段会互相计入，分析时应使用串行模式
+（例如 config.pipeline.overlap_file_io = False）。开启后 Python 分配会明显变慢，只用于诊断
+"""
+
+import atexit
+import ctypes
+import ctypes.util
+import json
+import os
+import resource
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# 开启内存分析的环境变量
+MEMPROFILE_ENV = "BEAUTIFIER_MEMPROFILE"
+
+# 报告中每个阶段保留的内存占用最多的代码位置数
+TOP_SITES = 5
+
+# 固定路径的报告文件名
+LATEST_NAME = "memory-latest.json"
+
+
+class _MachTaskBasicInfo(ctypes.Structure):
+    """mach_task_basic_info，见 <mach/task_info.h>"""
+
+    _fields_ = [
+        ("virtual_size", ctypes.c_uint64),
+        ("resident_size", ctypes.c_uint64),
+        ("resident_size_max", ctypes.c_uint64),
+        ("user_time", ctypes.c_int32 * 2),
+        ("system_time", ctypes.c_int32 * 2),
+        ("policy", ctypes.c_int32),
+        ("suspend_count", ctypes.c_int32),
+    ]
+
+
+# task_info 的 flavor，以及以 natural_t 为单位的结构体长度
+_MACH_TASK_BASIC_INFO = 20
+_MACH_TASK_BASIC_INFO_COUNT = ctypes.sizeof(_MachTaskBasicInfo) // ctypes.sizeof(ctypes.c_uint32)
+
+
+def _statm_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _mach_rss_reader():
+    """macOS 上通过 task_info(MACH_TASK_BASIC_INFO) 读取常驻内存，不可用时返回 None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        task = libc.mach_task_self()
+        task_info = libc.task_info
+    except (OSError, AttributeError):
+        return None
+    task_info.argtypes = [
+        ctypes.c_uint32, ctypes.c_int, ctypes.POINTER(_MachTaskBasicInfo), ctypes.POINTER(ctypes.c_uint32),
+    ]
+    task_info.restype = ctypes.c_int
+
+    def read() -> Optional[int]:
+        info = _MachTaskBasicInfo()
+        count = ctypes.c_uint32(_MACH_TASK_BASIC_INFO_COUNT)
+        if task_info(task, _MACH_TASK_BASIC_INFO, ctypes.byref(info), ctypes.byref(count)) != 0:
+            return None
+        return info.resident_size
+
+    return read
+
+
+def _rss_reader():
+    """选择读取当前常驻内存的方式：Linux 读 /proc/self/statm，macOS 调用 task_info"""
+    if sys.platform == "darwin":
+        read = _mach_rss_reader()
+        if read is not None and read() is not None:
+            return "task_info", read
+    elif _statm_rss() is not None:
+        return "statm", _statm_rss
+    return None, lambda: None
+
+
+# 当前常驻内存的来源（"statm"、"task_info"，都不可用时为 None）
+RSS_SOURCE, _read_rss = _rss_reader()
+
+
+def current_rss() -> Optional[int]:
+    """当前常驻内存（字节）
+
+    Linux 上读 /proc/self/statm，macOS 上调用 task_info；都不可用时返回 None，
+    此时报告中各阶段的 rss_delta_max 为 null，只能用按阶段的峰值 RSS 增长（maxrss_growth）估计 C 代码的分配
+    """
+    return _read_rss()
+
+
+def max_rss() -> int:
+    """进程的峰值常驻内存（字节）"""
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 返回字节，Linux 返回 KB
+    return value if sys.platform == "darwin" else value * 1024
+
+
+class _Frame:
+    __slots__ = ("start_traced", "start_rss", "start_maxrss", "max_seen")
+
+    def __init__(self):
+        self.start_traced = tracemalloc.get_traced_memory()[0]
+        self.start_rss = current_rss()
+        self.start_maxrss = max_rss()
+        self.max_seen = 0
+
+
+class MemoryProfiler:
+    """按阶段名汇总内存数据
+
+    嵌套阶段共用 tracemalloc 的全局峰值：进入子阶段前把当前峰值记入父阶段再重置，
+    子阶段结束后父阶段的峰值取两者较大值，因此每一层的峰值都是准确的
+    """
+
+    def __init__(self, output_dir: Optional[str] = None):
+        self.output_dir = output_dir
+        self.stages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self) -> None:
+        stack = self._stack()
+        if stack:
+            stack[-1].max_seen = max(stack[-1].max_seen, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        stack.append(_Frame())
+
+    def exit(self, name: str) -> None:
+        stack = self._stack()
+        frame = stack.pop()
+        peak_abs = max(frame.max_seen, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1].max_seen = max(stack[-1].max_seen, peak_abs)
+        peak = peak_abs - frame.start_traced
+        rss = current_rss()
+        rss_delta = rss - frame.start_rss if rss is not None and frame.start_rss is not None else None
+        maxrss_growth = max_rss() - frame.start_maxrss
+
+        with self._lock:
+            stage = self.stages.setdefault(name, {
+                "count": 0,
+                "tracemalloc_peak": -1,
+                "rss_delta_max": None,
+                "maxrss_growth": 0,
+                "top_sites": [],
+            })
+            stage["count"] += 1
+            stage["maxrss_growth"] = max(stage["maxrss_growth"], maxrss_growth)
+            if rss_delta is not None:
+                previous = stage["rss_delta_max"]
+                stage["rss_delta_max"] = rss_delta if previous is None else max(previous, rss_delta)
+            record_sites = peak > stage["tracemalloc_peak"]
+            if record_sites:
+                stage["tracemalloc_peak"] = peak
+        if record_sites:
+            sites = self._top_sites()
+            with self._lock:
+                if stage["tracemalloc_peak"] == peak:
+                    stage["top_sites"] = sites
+
+    @staticmethod
+    def _top_sites() -> List[Dict[str, Any]]:
+        """当前仍占用内存最多的代码位置（忽略导入模块和分析器自身的分配）"""
+        statistics = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )).statistics("lineno")
+        return [
+            {
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size": stat.size,
+                "count": stat.count,
+            }
+            for stat in statistics[:TOP_SITES]
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "argv": sys.argv,
+                "process_maxrss": max_rss(),
+                "rss_source": RSS_SOURCE,
+                "stages": dict(self.stages),
+            }
+
+    def finish(self) -> None:
+        """写出报告并在 stderr 输出峰值最高的阶段"""
+        if not self.stages:
+            return
+        try:
+            directory = self.output_dir
+            if directory is None:
+                from .utils import get_workflow_cachedir
+
+                directory = os.path.join(get_workflow_cachedir(), "memprofile")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, time.strftime("memory-%Y%m%d-%H%M%S.json"))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            shutil.copyfile(path, os.path.join(directory, LATEST_NAME))
+        except Exception as e:
+            print(f"写入内存分析报告失败: {e}", file=sys.stderr)
+            return
+        name, stage = max(self.stages.items(), key=lambda item: item[1]["tracemalloc_peak"])
+        print(
+            f"memory: peak stage {name} {stage['tracemalloc_peak'] / 1024 / 1024:.1f}MB, "
+            f"maxrss {max_rss() / 1024 / 1024:.0f}MB -> {path}",
+            file=sys.stderr,
+        )
+
+
+_profiler: Optional[MemoryProfiler] = None
+
+
+def enable(output_dir: Optional[str] = None) -> MemoryProfiler:
+    """开启内存分析，进程退出时自动写出报告"""
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(output_dir)
+        atexit.register(_profiler.finish)
+    return _profiler
+
+
+def get_profiler() -> Optional[MemoryProfiler]:
+    return _profiler
+
+
+def _enable_from_env() -> None:
+    value = os.environ.get(MEMPROFILE_ENV, "")
+    if value and value.lower() not in ("0", "false", "no"):
+        enable(None if value.lower() in ("1", "true", "yes") else value)
+
+
+_enable_from_env()
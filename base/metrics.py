@@ -0,0 +1,340 @@
+"""
+运行指标模块
+每次运行（剪贴板、文件、stream 模式）结束时向工作流缓存目录中的 metrics.bin 追加一条定长二进制记录：
+动作、来源、尺寸、帧数、各阶段耗时、输出字节数、计划缓存和资源缓存的命中次数。
+
+记录布局由 RECORD_DTYPE 描述，汇总时（main.py stats）以内存映射读取整个文件并直接视为 numpy 结构化数组，
+无需逐条解析。日志超过 config.pipeline.metrics_max_bytes 时在文件锁内丢弃较旧的一半记录
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .asset_cache import asset_cache
+from .config import config
+from .tracing import StageTimer, set_stage_timer
+
+# 指标日志文件名（位于工作流缓存目录中）
+METRICS_NAME = "metrics.bin"
+
+MAGIC = b"BTFYMETR"
+METRICS_VERSION = 1
+
+# 记录耗时的阶段，与 tracing.span 的名称对应
+STAGES = (
+    "clipboard.read",
+    "decode",
+    "convert",
+    "plan",
+    "effect",
+    "gif.palette",
+    "gif.quantize",
+    "png.reduce",
+    "encode",
+    "clipboard.write",
+    "notify",
+)
+
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("action", "S12"),
+    ("source", "S10"),
+    ("ok", "u1"),
+    ("images", "<u4"),
+    ("width", "<u4"),  # 单次运行处理多张图像时记录像素最多的一张
+    ("height", "<u4"),
+    ("frames", "<u4"),
+    ("pixels", "<u8"),  # 所有图像所有帧的像素数之和
+    ("bytes_out", "<u8"),
+    ("total_ms", "<f4"),
+    ("stage_ms", "<f4", (len(STAGES),)),
+    ("plan_hits", "<u2"),
+    ("plan_misses", "<u2"),
+    ("asset_hits", "<u2"),
+    ("asset_misses", "<u2"),
+])
+
+# 文件头：魔数、版本、单条记录字节数、阶段数；任一项不符时清空重写
+HEADER = struct.Struct("<8sHHI")
+
+# 延迟直方图的分桶上界（毫秒）
+LATENCY_BUCKETS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+def _header() -> bytes:
+    return HEADER.pack(MAGIC, METRICS_VERSION, RECORD_DTYPE.itemsize, len(STAGES))
+
+
+class MetricsLog:
+    """定长记录的只追加日志，多个进程同时写入时由文件锁串行化"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self._path = path
+        self._max_bytes = max_bytes
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            from .utils import get_workflow_cachedir
+
+            self._path = os.path.join(get_workflow_cachedir(), METRICS_NAME)
+        return self._path
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is None:
+            return config.pipeline.metrics_max_bytes
+        return self._max_bytes
+
+    def append(self, records: np.ndarray) -> None:
+        """追加记录；文件头不符时清空，超过大小上限时只保留较新的记录"""
+        data = np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            size = os.fstat(fd).st_size
+            if size < HEADER.size or os.pread(fd, HEADER.size, 0) != _header():
+                os.ftruncate(fd, 0)
+                os.write(fd, _header())
+                size = HEADER.size
+            if size + len(data) > self.max_bytes:
+                self._compact(fd, size)
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _compact(self, fd: int, size: int) -> None:
+        """原地保留最新的、合计不超过上限一半的记录"""
+        itemsize = RECORD_DTYPE.itemsize
+        count = (size - HEADER.size) // itemsize
+        keep = min(count, max(0, (self.max_bytes // 2 - HEADER.size) // itemsize))
+        tail = os.pread(fd, keep * itemsize, HEADER.size + (count - keep) * itemsize) if keep else b""
+        os.ftruncate(fd, 0)
+        os.write(fd, _header() + tail)
+
+    def read(self) -> np.ndarray:
+        """以内存映射读取全部记录，返回结构化数组的副本（持有共享锁期间复制，不受并发压缩影响）"""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            size = os.fstat(fd).st_size
+            count = (size - HEADER.size) // RECORD_DTYPE.itemsize
+            if count <= 0 or os.pread(fd, HEADER.size, 0) != _header():
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                view = np.frombuffer(mapped, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+                records = view.copy()
+                del view
+            return records
+        finally:
+            os.close(fd)
+
+
+class RunMetrics:
+    """单次运行的指标，作为上下文管理器包住整个处理过程，退出时写入日志"""
+
+    def __init__(self, action: str, source: str, log: Optional[MetricsLog] = None):
+        self.action = action
+        self.source = source
+        self.log = log or MetricsLog()
+        self.timer = StageTimer()
+        self.images = 0
+        self.width = 0
+        self.height = 0
+        self.frames = 0
+        self.pixels = 0
+        self.bytes_out = 0
+        self.plan_hits = 0
+        self.plan_misses = 0
+        self.failed = False
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self._asset_counts = (0, 0)
+
+    def add_image(self, size: Tuple[int, int], frames: int = 1) -> None:
+        with self._lock:
+            self.images += 1
+            self.frames += frames
+            self.pixels += size[0] * size[1] * frames
+            if size[0] * size[1] > self.width * self.height:
+                self.width, self.height = size
+
+    def add_output(self, nbytes: int) -> None:
+        with self._lock:
+            self.bytes_out += nbytes
+
+    def add_plan(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.plan_hits += 1
+            else:
+                self.plan_misses += 1
+
+    def to_record(self, ok: bool, total_ms: float) -> np.ndarray:
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        record["time"] = time.time()
+        record["action"] = self.action.encode("utf-8")[:12]
+        record["source"] = self.source.encode("utf-8")[:10]
+        record["ok"] = ok and not self.failed
+        record["images"] = self.images
+        record["width"] = self.width
+        record["height"] = self.height
+        record["frames"] = self.frames
+        record["pixels"] = self.pixels
+        record["bytes_out"] = self.bytes_out
+        record["total_ms"] = total_ms
+        record["stage_ms"] = [self.timer.totals.get(name, 0.0) for name in STAGES]
+        record["plan_hits"] = min(self.plan_hits, 0xFFFF)
+        record["plan_misses"] = min(self.plan_misses, 0xFFFF)
+        record["asset_hits"] = min(asset_cache.hits - self._asset_counts[0], 0xFFFF)
+        record["asset_misses"] = min(asset_cache.misses - self._asset_counts[1], 0xFFFF)
+        return record
+
+    def __enter__(self) -> "RunMetrics":
+        global _current
+        _current = self
+        self._asset_counts = (asset_cache.hits, asset_cache.misses)
+        set_stage_timer(self.timer)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        global _current
+        total_ms = (time.perf_counter() - self._start) * 1000
+        set_stage_timer(None)
+        _current = None
+        # 文件模式以 sys.exit 结束，退出码为 0 时仍算成功
+        ok = exc_type is None or (exc_type is SystemExit and exc.code in (0, None))
+        try:
+            self.log.append(self.to_record(ok, total_ms))
+        except Exception as e:
+            print(f"写入运行指标失败: {e}", file=sys.stderr)
+        return False
+
+
+_current: Optional[RunMetrics] = None
+
+
+def start(action: str, source: str) -> Optional[RunMetrics]:
+    """创建单次运行的指标记录，关闭指标时返回 None"""
+    if not config.pipeline.metrics_enabled:
+        return None
+    return RunMetrics(action, source)
+
+
+def record_image(size: Tuple[int, int], frames: int = 1) -> None:
+    """记录一张输入图像的尺寸和帧数，没有正在记录的运行时不做任何事"""
+    run = _current
+    if run is not None:
+        run.add_image(size, frames)
+
+
+def record_output(nbytes: int) -> None:
+    run = _current
+    if run is not None:
+        run.add_output(nbytes)
+
+
+def record_plan(hit: bool) -> None:
+    run = _current
+    if run is not None:
+        run.add_plan(hit)
+
+
+def record_failure() -> None:
+    """处理失败但异常已被捕获时（如剪贴板模式）标记本次运行失败"""
+    run = _current
+    if run is not None:
+        run.failed = True
+
+
+def latency_histogram(total_ms: np.ndarray) -> List[Tuple[str, int]]:
+    """按 LATENCY_BUCKETS 分桶统计延迟"""
+    counts = np.bincount(np.searchsorted(LATENCY_BUCKETS, total_ms, side="right"),
+                         minlength=len(LATENCY_BUCKETS) + 1)
+    labels = [f"<{LATENCY_BUCKETS[0]}ms"]
+    labels += [f"{low}-{high}ms" for low, high in zip(LATENCY_BUCKETS, LATENCY_BUCKETS[1:])]
+    labels.append(f">={LATENCY_BUCKETS[-1]}ms")
+    return list(zip(labels, counts.tolist()))
+
+
+def summarize(records: np.ndarray) -> List[Dict]:
+    """按 (动作, 来源) 汇总：次数、成功率、延迟分位数、像素吞吐、各阶段平均耗时、缓存命中率、延迟直方图"""
+    summaries = []
+    actions, action_ids = np.unique(records["action"], return_inverse=True)
+    sources, source_ids = np.unique(records["source"], return_inverse=True)
+    group_ids = action_ids * len(sources) + source_ids
+    for group_id in np.unique(group_ids):
+        selected = records[group_ids == group_id]
+        total_ms = selected["total_ms"].astype(np.float64)
+        p50, p95, p99 = np.percentile(total_ms, [50, 95, 99])
+        plan_lookups = int(selected["plan_hits"].sum()) + int(selected["plan_misses"].sum())
+        asset_lookups = int(selected["asset_hits"].sum()) + int(selected["asset_misses"].sum())
+        stage_ms = selected["stage_ms"].mean(axis=0)
+        summaries.append({
+            "action": actions[group_id // len(sources)].decode("utf-8", "replace"),
+            "source": sources[group_id % len(sources)].decode("utf-8", "replace"),
+            "runs": len(selected),
+            "ok_rate": float(selected["ok"].mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "mpx_per_s": float(selected["pixels"].sum()) / max(float(total_ms.sum()), 1e-9) / 1000,
+            "mean_bytes_out": float(selected["bytes_out"].mean()),
+            "plan_hit_rate": int(selected["plan_hits"].sum()) / plan_lookups if plan_lookups else None,
+            "asset_hit_rate": int(selected["asset_hits"].sum()) / asset_lookups if asset_lookups else None,
+            "stage_ms": {name: float(ms) for name, ms in zip(STAGES, stage_ms) if ms > 0},
+            "histogram": latency_histogram(total_ms),
+        })
+    return summaries
+
+
+def print_stats(log: Optional[MetricsLog] = None, out=None) -> int:
+    """输出各动作的延迟直方图和汇总，返回记录条数"""
+    log = log or MetricsLog()
+    out = out or sys.stdout
+    records = log.read()
+    if not len(records):
+        print(f"没有运行记录: {log.path}", file=out)
+        return 0
+
+    first, last = (time.strftime("%Y-%m-%d %H:%M", time.localtime(t))
+                   for t in (records["time"].min(), records["time"].max()))
+    print(f"{len(records)} 次运行 ({first} ~ {last}) {log.path}", file=out)
+    for summary in summarize(records):
+        print(file=out)
+        print(
+            f"{summary['action']}/{summary['source']}: {summary['runs']} 次, "
+            f"成功 {summary['ok_rate']:.0%}, "
+            f"p50 {summary['p50_ms']:.0f}ms p95 {summary['p95_ms']:.0f}ms p99 {summary['p99_ms']:.0f}ms, "
+            f"{summary['mpx_per_s']:.1f} Mpx/s, 平均输出 {summary['mean_bytes_out'] / 1024:.0f}KB",
+            file=out,
+        )
+        rates = []
+        if summary["plan_hit_rate"] is not None:
+            rates.append(f"计划缓存命中 {summary['plan_hit_rate']:.0%}")
+        if summary["asset_hit_rate"] is not None:
+            rates.append(f"资源缓存命中 {summary['asset_hit_rate']:.0%}")
+        if rates:
+            print("  " + ", ".join(rates), file=out)
+        if summary["stage_ms"]:
+            stages = " | ".join(f"{name} {ms:.1f}" for name, ms in summary["stage_ms"].items())
+            print(f"  平均阶段耗时(ms): {stages}", file=out)
+        peak = max(count for _, count in summary["histogram"])
+        for label, count in summary["histogram"]:
+            if count:
+                bar = "#" * max(1, round(count * 40 / peak))
+                print(f"  {label:>12} {count:6d} {bar}", file=out)
+    return len(records)
@@ -0,0 +1,186 @@
+"""
+文件批处理流水线模块
+把多个文件的处理拆成 解码 -> 计算 -> 编码 三个阶段，分别在独立线程中运行。
+Pillow 在解码、编码和文件读写时会释放 GIL，因此一个文件的读写可以与另一个文件的效果计算重叠；
+阶段之间使用有界队列，解码过快时会阻塞等待，内存中同时存在的图像数量有上限
+"""
+
+import json
+import sys
+import threading
+from queue import Queue
+from typing import List, Optional, Sequence, Tuple, Union
+
+from PIL import Image
+
+from . import memprofile, metrics, profiling
+from .config import config
+from .cost import allow_large_images, estimate
+from .image_processor import ImageProcessor
+from .manifest import IncrementalIndex
+from .tracing import span
+
+# 通知下游阶段输入已结束
+_DONE = object()
+
+# 每个文件的处理结果：(输入路径, 输出路径或异常)
+FileResult = Tuple[str, Union[str, BaseException]]
+
+
+def _is_gif(path: str) -> bool:
+    return path.lower().endswith(".gif")
+
+
+def process_files(
+    processor: ImageProcessor,
+    paths: Sequence[str],
+    queue_size: Optional[int] = None,
+) -> List[FileResult]:
+    """用三阶段流水线处理多个文件，输出路径与 process_image_file 相同
+
+    GIF 的逐帧流程已在 process_gif_file 中完成，整体放在计算阶段处理。
+    单个文件出错不会中断其他文件，异常作为该文件的结果返回。
+
+    Args:
+        processor: 图像处理器
+        paths: 输入文件路径
+        queue_size: 相邻阶段之间最多缓存的图像数，默认见 config.pipeline.file_queue_size
+    Returns:
+        按输入顺序排列的 (输入路径, 输出路径或异常)
+    """
+    queue_size = queue_size or config.pipeline.file_queue_size
+    decoded: Queue = Queue(maxsize=queue_size)
+    processed: Queue = Queue(maxsize=queue_size)
+    results: List[Union[str, BaseException, None]] = [None] * len(paths)
+
+    def decode() -> None:
+        for index, path in enumerate(paths):
+            if _is_gif(path):
+                decoded.put((index, None))
+                continue
+            try:
+                with span("decode", path=path):
+                    image = Image.open(path)
+                    image.load()
+                metrics.record_image(image.size)
+                with span("convert", mode=image.mode):
+                    image = image.convert("RGBA")
+                decoded.put((index, image))
+            except Exception as e:
+                decoded.put((index, e))
+        decoded.put(_DONE)
+
+    def encode() -> None:
+        while True:
+            item = processed.get()
+            if item is _DONE:
+                return
+            index, result = item
+            if isinstance(result, Image.Image):
+                try:
+                    output_path = processor.rename_file(paths[index])
+                    processor.save_result(result, output_path)
+                    result = output_path
+                except Exception as e:
+                    result = e
+            results[index] = result
+
+    decoder = threading.Thread(target=decode, name="pipeline-decode", daemon=True)
+    encoder = threading.Thread(target=encode, name="pipeline-encode", daemon=True)
+    decoder.start()
+    encoder.start()
+
+    # 计算阶段在当前线程运行
+    try:
+        while True:
+            item = decoded.get()
+            if item is _DONE:
+                break
+            index, image = item
+            if isinstance(image, BaseException):
+                processed.put((index, image))
+                continue
+            try:
+                if image is None:
+                    processed.put((index, processor.process_gif_file(paths[index])))
+                else:
+                    with span("effect", size=list(image.size)):
+                        result = processor.process_image(image)
+                    processed.put((index, result))
+            except Exception as e:
+                processed.put((index, e))
+    finally:
+        processed.put(_DONE)
+        encoder.join()
+    return list(zip(paths, results))
+
+
+def process_files_serial(processor: ImageProcessor, paths: Sequence[str]) -> List[FileResult]:
+    """逐个文件依次处理，用于单个文件或关闭流水线时"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, processor.process_image_file(path)))
+        except Exception as e:
+            results.append((path, e))
+    return results
+
+
+def run_files(
+    processor: ImageProcessor,
+    paths: Sequence[str],
+    dry_run: bool = False,
+    incremental: Optional[bool] = None,
+) -> int:
+    """处理多个文件并把失败的文件输出到 stderr，返回失败的文件数
+
+    incremental 时（默认见 config.pipeline.incremental）先按输出目录中的清单跳过已是最新的文件，
+    只需 stat，不打开图像；其余文件先只读取文件头估算成本：超过解压炸弹阈值的文件不进入流水线，
+    最后逐个单独处理；dry_run 时只向标准输出打印每个文件的估算结果（每行一个 JSON）
+    """
+    if incremental is None:
+        incremental = config.pipeline.incremental
+    index = IncrementalIndex(processor) if incremental else None
+    if index is not None:
+        paths, skipped = index.split(paths)
+        if skipped:
+            print(f"跳过 {len(skipped)} 个已是最新的文件", file=sys.stderr)
+
+    results: List[FileResult] = []
+    regular, large = [], []
+    for path in paths:
+        try:
+            cost = estimate(type(processor), path)
+        except (ValueError, OSError) as e:
+            results.append((path, e))
+            continue
+        if dry_run:
+            print(json.dumps(dict(path=path, **cost.to_dict()), ensure_ascii=False))
+        else:
+            (large if cost.large else regular).append(path)
+
+    # 内存分析按进程统计、cProfile 只统计当前线程，分析或采样时串行处理
+    overlap = (
+        config.pipeline.overlap_file_io
+        and memprofile.get_profiler() is None
+        and not profiling.is_active()
+    )
+    if overlap and len(regular) > 1:
+        results += process_files(processor, regular)
+    else:
+        results += process_files_serial(processor, regular)
+    if large:
+        # 流水线中没有其他图像时才解除像素数检查，输出由多线程分块 PNG 编码写出
+        with allow_large_images():
+            results += process_files_serial(processor, large)
+
+    failed = 0
+    for path, result in results:
+        if isinstance(result, BaseException):
+            failed += 1
+            print(f"处理失败 {path}: {type(result).__name__}: {result}", file=sys.stderr)
+        elif index is not None:
+            index.record(path, result)
+    if index is not None:
+        index.save()
+    return failed
@@ -0,0 +1,107 @@
+"""
+PNG 输出优化模块
+截图（终端、流程图、界面稿）往往远少于256色，却总以32位RGBA保存。
+这里先在降采样视图上快速统计颜色数，再无损地转换为调色板（带 tRNS）、灰度或去掉alpha通道，
+也可选择有损量化以得到更小的文件。
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# 降采样统计颜色时最多取样的像素数
+MAX_SAMPLES = 1 << 16
+
+# 优化方式：'off' 不处理，'lossless' 无损降低位深，'lossy' 颜色过多时量化为调色板
+REDUCE_MODES = ("off", "lossless", "lossy")
+
+
+def _exact_palette(
+    pixels: np.ndarray, candidates: np.ndarray, max_colors: int = 256
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """在全部像素上确认颜色数不超过 max_colors
+
+    先用采样得到的颜色做一次有序查找，只对没找到的少量像素再统计，避免对整图排序
+
+    Returns:
+        (有序颜色表, 每个像素在颜色表中的索引)；颜色过多时返回 None
+    """
+    positions = np.minimum(np.searchsorted(candidates, pixels), candidates.size - 1)
+    missing = candidates[positions] != pixels
+    if missing.any():
+        extra = np.unique(pixels[missing])
+        if candidates.size + extra.size > max_colors:
+            return None
+        candidates = np.union1d(candidates, extra)
+        positions = np.searchsorted(candidates, pixels)
+    return candidates, positions.astype(np.uint8)
+
+
+def _to_palette(colors: np.ndarray, indices: np.ndarray, size: Tuple[int, int]) -> Image.Image:
+    """由颜色表和索引构造 'P' 模式图像，半透明颜色排在前面以缩短 tRNS 块"""
+    rgba = colors.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(rgba[:, 3] == 255, kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(order.size)
+    rgba = rgba[order]
+
+    image = Image.fromarray(remap.astype(np.uint8)[indices].reshape(size[1], size[0]), "P")
+    image.putpalette(rgba[:, :3].tobytes())
+    translucent = int(np.count_nonzero(rgba[:, 3] != 255))
+    if translucent:
+        image.info["transparency"] = rgba[:translucent, 3].tobytes()
+    return image
+
+
+def reduce_image(image: Image.Image, mode: str = "lossless", lossy_colors: int = 256) -> Image.Image:
+    """按颜色特征选择最小的无损像素格式
+
+    - 不超过256色：不透明灰度转为 'L'，其余转为 'P'（需要时带 tRNS）
+    - 超过256色：灰度转为 'L'/'LA'，不透明转为 'RGB'；lossy 模式下量化为 lossy_colors 色调色板
+
+    Args:
+        image: 待保存的图像
+        mode: 'off'、'lossless' 或 'lossy'
+        lossy_colors: 有损量化时的颜色数
+    """
+    if mode not in REDUCE_MODES:
+        raise ValueError(f"未知的PNG优化方式: {mode}")
+    if mode == "off" or image.mode not in ("RGBA", "RGB"):
+        return image
+
+    rgba = image if image.mode == "RGBA" else image.convert("RGBA")
+    channels = np.asarray(rgba)
+    # 每个像素看作一个 uint32 颜色值
+    pixels = channels.view(np.uint32).reshape(-1)
+    step = max(1, pixels.size // MAX_SAMPLES)
+    sample = channels.reshape(-1, 4)[::step]
+    sample_opaque = bool((sample[:, 3] == 255).all())
+    sample_gray = bool(((sample[:, 0] == sample[:, 1]) & (sample[:, 1] == sample[:, 2])).all())
+
+    candidates = np.unique(pixels[::step])
+    palette = _exact_palette(pixels, candidates) if candidates.size <= 256 else None
+    if palette is not None:
+        colors, indices = palette
+        rgba_colors = colors.view(np.uint8).reshape(-1, 4)
+        opaque = bool((rgba_colors[:, 3] == 255).all())
+        gray = bool(((rgba_colors[:, 0] == rgba_colors[:, 1]) & (rgba_colors[:, 1] == rgba_colors[:, 2])).all())
+        if opaque and gray:
+            return Image.fromarray(np.ascontiguousarray(channels[..., 0]), "L")
+        return _to_palette(colors, indices, image.size)
+
+    if mode == "lossy":
+        return rgba.quantize(colors=lossy_colors, method=Image.Quantize.FASTOCTREE)
+
+    # 颜色过多时仍可无损去掉多余的通道，先在采样上排除，再在整图上确认
+    opaque = sample_opaque and bool((channels[..., 3] == 255).all())
+    gray = sample_gray and bool(
+        ((channels[..., 0] == channels[..., 1]) & (channels[..., 1] == channels[..., 2])).all()
+    )
+    if gray:
+        if opaque:
+            return Image.fromarray(np.ascontiguousarray(channels[..., 0]), "L")
+        return Image.fromarray(np.ascontiguousarray(channels[..., [0, 3]]), "LA")
+    if opaque:
+        return rgba.convert("RGB")
+    return image
@@ -0,0 +1,220 @@
+"""
+并行 PNG 编码模块
+Pillow 的 PNG 编码在单线程中完成滤波和 zlib 压缩，大图（长截图、5K 截图）时成为瓶颈。
+这里按行把图像切成若干块，在线程池中并行完成行滤波和 deflate 压缩（zlib 会释放 GIL），
+块之间用 Z_SYNC_FLUSH 对齐到字节边界后直接拼接，最终得到一个合法的单一 zlib 数据流。
+"""
+
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Pillow 模式 -> (PNG 颜色类型, 每像素字节数)
+COLOR_TYPES = {
+    "L": (0, 1),
+    "RGB": (2, 3),
+    "P": (3, 1),
+    "LA": (4, 2),
+    "RGBA": (6, 4),
+}
+
+# deflate 的回溯窗口大小，每块用前一块末尾的这部分数据作为预设字典
+WINDOW_SIZE = 32 * 1024
+
+# 每个压缩块的目标大小（滤波后的字节数）
+CHUNK_BYTES = 512 * 1024
+
+# 单个 IDAT 块的最大长度
+IDAT_SIZE = 1024 * 1024
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    """组装一个 PNG 数据块：长度 + 类型 + 数据 + CRC"""
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def _zlib_header(level: int) -> bytes:
+    """与 zlib.compress 相同的两字节头，FLEVEL 按压缩级别设置"""
+    if level <= 1:
+        return b"\x78\x01"
+    if level <= 5:
+        return b"\x78\x5e"
+    if level == 6:
+        return b"\x78\x9c"
+    return b"\x78\xda"
+
+
+def adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    """合并两段数据的 Adler-32 校验和（移植自 zlib 的 adler32_combine）"""
+    base = 65521
+    rem = len2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % base
+    sum1 += (adler2 & 0xFFFF) + base - 1
+    sum2 += ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + base - rem
+    if sum1 >= base:
+        sum1 -= base
+    if sum1 >= base:
+        sum1 -= base
+    if sum2 >= (base << 1):
+        sum2 -= base << 1
+    if sum2 >= base:
+        sum2 -= base
+    return sum1 | (sum2 << 16)
+
+
+def filter_rows(rows: np.ndarray, prev_row: np.ndarray, bpp: int, adaptive: bool = True) -> np.ndarray:
+    """对若干扫描行做 PNG 行滤波，每行在 None/Sub/Up 中选择残差绝对值之和最小的一种
+
+    Args:
+        rows: 形状 (N, stride) 的原始扫描行
+        prev_row: rows 之前的一行，第一行时为全零
+        bpp: 每像素字节数
+        adaptive: 为 False 时所有行都不滤波（调色板图像按 PNG 规范建议不滤波）
+
+    Returns:
+        形状 (N, 1 + stride) 的滤波结果，每行第一个字节为滤波类型
+    """
+    if not adaptive:
+        filtered = np.zeros((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows
+        return filtered
+
+    above = np.empty_like(rows)
+    above[0] = prev_row
+    above[1:] = rows[:-1]
+
+    sub = rows.copy()
+    sub[:, bpp:] -= rows[:, :-bpp]
+    up = rows - above
+
+    candidates = (rows, sub, up)
+    # 与 libpng 相同的启发式：把残差视为有符号字节，取绝对值之和
+    costs = np.stack([
+        np.abs(candidate.view(np.int8).astype(np.int16)).sum(axis=1)
+        for candidate in candidates
+    ])
+    choice = costs.argmin(axis=0)
+
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = choice
+    for filter_type, candidate in enumerate(candidates):
+        selected = choice == filter_type
+        filtered[selected, 1:] = candidate[selected]
+    return filtered
+
+
+def _compress_block(
+    pixels: np.ndarray,
+    start: int,
+    stop: int,
+    dict_rows: int,
+    bpp: int,
+    level: int,
+    last: bool,
+    adaptive: bool,
+) -> Tuple[bytes, int, int]:
+    """滤波并压缩 [start, stop) 行，返回 (deflate 数据, Adler-32, 原始长度)
+
+    行滤波只依赖当前行和上一行，因此块之前的 dict_rows 行可以在这里独立重算，
+    作为预设字典使压缩率接近单线程编码
+    """
+    first = max(0, start - dict_rows)
+    prev_row = pixels[first - 1] if first > 0 else np.zeros_like(pixels[0])
+    filtered = filter_rows(pixels[first:stop], prev_row, bpp, adaptive)
+    history = filtered[: start - first].tobytes()[-WINDOW_SIZE:]
+    data = filtered[start - first:].tobytes()
+
+    if history:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=history)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    body = compressor.compress(data)
+    body += compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return body, zlib.adler32(data), len(data)
+
+
+def encode_png(
+    image: Image.Image,
+    level: int = 6,
+    threads: Optional[int] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> bytes:
+    """用多线程把图像编码为 PNG 字节
+
+    Args:
+        image: 模式为 L/LA/RGB/RGBA/P 的图像，其他模式会先转换为 RGBA
+        level: zlib 压缩级别 0-9
+        threads: 线程数，默认使用全部 CPU 核心
+        chunk_bytes: 每个并行压缩块的目标大小
+    """
+    if image.mode not in COLOR_TYPES:
+        image = image.convert("RGBA")
+    color_type, bpp = COLOR_TYPES[image.mode]
+    width, height = image.size
+    pixels = np.asarray(image).reshape(height, width * bpp)
+
+    stride = width * bpp + 1
+    rows_per_block = max(1, chunk_bytes // stride)
+    dict_rows = -(-WINDOW_SIZE // stride)
+    blocks = [(start, min(start + rows_per_block, height)) for start in range(0, height, rows_per_block)]
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count()) as executor:
+        results = list(executor.map(
+            lambda block: _compress_block(
+                pixels, block[0], block[1], dict_rows, bpp, level, block[1] == height,
+                image.mode != "P",
+            ),
+            blocks,
+        ))
+
+    adler = 1
+    for _, block_adler, length in results:
+        adler = adler32_combine(adler, block_adler, length)
+    stream = b"".join(
+        [_zlib_header(level)] + [body for body, _, _ in results] + [struct.pack(">I", adler)]
+    )
+
+    parts: List[bytes] = [
+        PNG_SIGNATURE,
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+    ]
+    if image.mode == "P":
+        palette = image.getpalette() or []
+        parts.append(_chunk(b"PLTE", bytes(palette)))
+        transparency = image.info.get("transparency")
+        if transparency is None and image.palette is not None and image.palette.mode == "RGBA":
+            # quantize() 等得到的 RGBA 调色板，透明度在调色板的 alpha 中而不在 info 里
+            alpha = bytes(image.getpalette("RGBA")[3::4]).rstrip(b"\xff")
+            if alpha:
+                parts.append(_chunk(b"tRNS", alpha))
+        elif isinstance(transparency, int):
+            parts.append(_chunk(b"tRNS", b"\xff" * transparency + b"\x00"))
+        elif isinstance(transparency, bytes):
+            parts.append(_chunk(b"tRNS", transparency))
+    for offset in range(0, len(stream), IDAT_SIZE):
+        parts.append(_chunk(b"IDAT", stream[offset:offset + IDAT_SIZE]))
+    parts.append(_chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+def save_png(
+    image: Image.Image,
+    fp: Union[str, BinaryIO],
+    level: int = 6,
+    threads: Optional[int] = None,
+) -> None:
+    """用多线程编码 PNG 并写入文件路径或文件对象"""
+    data = encode_png(image, level=level, threads=threads)
+    if isinstance(fp, str):
+        with open(fp, "wb") as f:
+            f.write(data)
+    else:
+        fp.write(data)
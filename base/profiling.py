@@ -0,0 +1,98 @@
+"""
+cProfile 采样模块
+在 cProfile 下运行一次处理（剪贴板、文件、stream 模式均可，含 GIF），耗时不低于阈值时
+把 .prof 文件和按累计耗时排序的前 N 个函数的文本汇总写到工作流缓存目录下的 profiles/ 中。
+
+通过 main.py --profile [最小毫秒数] 或环境变量 BEAUTIFIER_PROFILE（值为最小毫秒数，1 表示总是保存）开启，
+Alfred 中可直接在工作流变量里设置，无需修改代码。
+cProfile 只统计开启它的线程，因此采样期间文件模式串行处理
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+from typing import Optional
+
+from .config import config
+
+# 开启 cProfile 采样的环境变量
+PROFILE_ENV = "BEAUTIFIER_PROFILE"
+
+_active = False
+
+
+def is_active() -> bool:
+    """当前是否有正在进行的 cProfile 采样"""
+    return _active
+
+
+def threshold_from_env() -> Optional[float]:
+    """环境变量中的最小毫秒数，未开启时返回 None"""
+    value = os.environ.get(PROFILE_ENV, "")
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        print(f"无法解析 {PROFILE_ENV}={value}，按总是保存处理", file=sys.stderr)
+        return 0.0
+
+
+class ProfileRun:
+    """在 cProfile 下运行的上下文，退出时按阈值决定是否保存结果"""
+
+    def __init__(self, name: str, min_ms: float = 0.0, output_dir: Optional[str] = None):
+        self.name = name
+        self.min_ms = min_ms
+        self.output_dir = output_dir
+        self.profile = cProfile.Profile()
+        self._start = 0.0
+
+    def __enter__(self) -> "ProfileRun":
+        global _active
+        _active = True
+        self._start = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        global _active
+        self.profile.disable()
+        _active = False
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        if elapsed_ms < self.min_ms:
+            print(f"profile: {elapsed_ms:.0f}ms 低于阈值 {self.min_ms:.0f}ms，未保存", file=sys.stderr)
+            return False
+        try:
+            path = self.save(elapsed_ms)
+            print(f"profile: {elapsed_ms:.0f}ms -> {path}", file=sys.stderr)
+        except Exception as e:
+            print(f"写入 profile 失败: {e}", file=sys.stderr)
+        return False
+
+    def summary(self, elapsed_ms: float) -> str:
+        """按累计耗时排序的前 N 个函数"""
+        buffer = io.StringIO()
+        buffer.write(f"{self.name}: {elapsed_ms:.1f}ms\n")
+        stats = pstats.Stats(self.profile, stream=buffer)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(config.pipeline.profile_top_n)
+        return buffer.getvalue()
+
+    def save(self, elapsed_ms: float) -> str:
+        """写出 <名称>-<时间戳>.prof 和同名 .txt 汇总，返回 .prof 路径"""
+        directory = self.output_dir
+        if directory is None:
+            from .utils import get_workflow_cachedir
+
+            directory = os.path.join(get_workflow_cachedir(), "profiles")
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.profile.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.summary(elapsed_ms))
+        return base + ".prof"
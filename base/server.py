@@ -0,0 +1,225 @@
+"""
+本地 HTTP 处理服务模块
+只依赖标准库，每个处理器对应一个接口：POST 图像字节，返回处理后的图像字节
+
+    POST /beautify?format=png        请求体为编码后的图像，响应为处理结果
+    POST /pad_text?text=...          查询参数与 jobs 任务的 options 相同（format、quality、text）
+    GET  /health                     运行状态与最近请求的延迟分位数（JSON）
+
+图像在固定大小的线程池中处理；正在处理和排队的请求数达到上限时不读取请求体、直接返回 503，
+请求体超过大小上限时返回 413，避免请求堆积耗尽内存
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Type
+from urllib.parse import parse_qsl, urlparse
+
+from PIL import Image, UnidentifiedImageError
+
+from .config import config
+from .image_processor import ImageProcessor
+from .jobs import JobRunner
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """已排序序列的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class ProcessingServer(ThreadingHTTPServer):
+    """HTTP 连接由各自的线程接收，图像处理统一提交到有界线程池"""
+
+    daemon_threads = True
+    # 监听队列长度；过载时由 503 而不是被拒绝的连接来表达背压
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        factories: Dict[str, Type[ImageProcessor]],
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_request_bytes: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        server_config = config.server
+        self.workers = workers or server_config.workers or os.cpu_count() or 1
+        self.max_queue = server_config.max_queue if max_queue is None else max_queue
+        self.max_request_bytes = max_request_bytes or server_config.max_request_bytes
+        self.verbose = verbose
+        self.runner = JobRunner(factories, self.workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        self._lock = threading.Lock()
+        self.pending = 0  # 正在处理和排队的请求数
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=server_config.latency_window)
+        self.started = time.time()
+        super().__init__(
+            (host or server_config.host, server_config.port if port is None else port),
+            ProcessingRequestHandler,
+        )
+
+    @property
+    def actions(self):
+        return self.runner.factories
+
+    def reserve(self) -> bool:
+        """在读取请求体之前占用一个处理名额；线程池和等待队列都已满时返回 False"""
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                return False
+            self.pending += 1
+        return True
+
+    def submit(self, action: str, data: bytes, options: Dict[str, Any]) -> Future:
+        """提交已通过 reserve() 占用名额的处理任务，完成后释放名额"""
+        future = self.executor.submit(self.runner.process, action, data, options)
+        future.add_done_callback(self.release)
+        return future
+
+    def release(self, _future: Optional[Future] = None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.latencies.append(seconds * 1000)
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "status": "ok",
+                "uptime_s": round(time.time() - self.started, 1),
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self.pending, self.workers),
+                "queued": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "latency_ms": {
+                    "p50": round(percentile(latencies, 0.50), 3),
+                    "p90": round(percentile(latencies, 0.90), 3),
+                    "p99": round(percentile(latencies, 0.99), 3),
+                    "max": round(latencies[-1], 3) if latencies else 0.0,
+                },
+            }
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class ProcessingRequestHandler(BaseHTTPRequestHandler):
+    server: ProcessingServer
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8", headers)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, self.server.health())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        action = url.path.strip("/")
+        if action not in self.server.actions:
+            self.close_connection = True
+            self._send_json(404, {"error": f"未知的处理类型: {action}"})
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self.close_connection = True
+            self._send_json(411, {"error": "需要 Content-Length"})
+            return
+        if int(length) > self.server.max_request_bytes:
+            # 不读取过大的请求体，直接关闭连接
+            self.close_connection = True
+            self._send_json(413, {"error": f"请求体超过 {self.server.max_request_bytes} 字节"})
+            return
+        # 先占用名额再读取请求体，服务繁忙时被拒绝的请求不占用内存
+        if not self.server.reserve():
+            self.close_connection = True
+            self._send_json(503, {"error": "服务繁忙"}, {"Retry-After": "1"})
+            return
+        try:
+            data = self.rfile.read(int(length))
+        except BaseException:
+            self.server.release()
+            raise
+
+        start = time.perf_counter()
+        future = self.server.submit(action, data, dict(parse_qsl(url.query)))
+        try:
+            output = future.result()
+        except (UnidentifiedImageError, ValueError, KeyError) as e:
+            self.server.record(time.perf_counter() - start, False)
+            self._send_json(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+        except Exception as e:
+            self.server.record(time.perf_counter() - start, False)
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.server.record(time.perf_counter() - start, True)
+
+        # 只解析文件头即可得到输出格式
+        fmt = Image.open(io.BytesIO(output)).format
+        self._send(200, output, Image.MIME.get(fmt, "application/octet-stream"))
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(
+    factories: Dict[str, Type[ImageProcessor]],
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: Optional[int] = None,
+    verbose: bool = False,
+) -> None:
+    """启动服务并一直运行，直到收到 Ctrl-C"""
+    server = ProcessingServer(factories, host, port, workers, verbose=verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {', '.join(factories)} on http://{host}:{port} ({server.workers} workers)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,220 @@
+"""
+耗时追踪模块
+轻量的 span 接口，记录剪贴板读写、解码、转换、效果计算、编码、通知等各阶段的耗时。
+
+通过环境变量 BEAUTIFIER_TRACE 开启：
+- 设为文件路径时，把 Chrome trace-event JSON 写到该路径（可在 chrome://tracing 或 Perfetto 中打开）
+- 设为 1 时写到工作流缓存目录下的 traces/trace-<时间戳>.json
+进程退出时还会在 stderr 输出一行各阶段耗时汇总，便于在 Alfred 调试器中查看。
+只保留最近的 MAX_EVENTS 个事件，serve 等长时间运行的模式下内存占用有上限。
+未开启时 span() 直接返回共享的空上下文，开销只有一次函数调用和一次布尔判断。
+
+同一组 span 也是内存分析（见 memprofile，环境变量 BEAUTIFIER_MEMPROFILE）的阶段划分，
+安装 StageTimer 后还会累计各阶段耗时写入运行指标（见 metrics）
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from . import memprofile
+
+# 开启追踪的环境变量
+TRACE_ENV = "BEAUTIFIER_TRACE"
+
+# 保留的最近事件数，超出后丢弃最早的事件
+MAX_EVENTS = 100_000
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Tracer:
+    """收集 span 并导出为 Chrome trace-event 格式"""
+
+    def __init__(self, output: Optional[str] = None, max_events: int = MAX_EVENTS):
+        self.output = output
+        self.events: "deque[Dict[str, Any]]" = deque(maxlen=max_events)
+        self.dropped = 0  # 因超出 max_events 而丢弃的事件数
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[None]:
+        """记录一个阶段，args 作为附加参数写入 trace"""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._local.depth = depth
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": round((start - self._origin) * 1e6, 3),
+                "dur": round((end - start) * 1e6, 3),
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": dict(args, depth=depth),
+            }
+            with self._lock:
+                if len(self.events) == self.events.maxlen:
+                    self.dropped += 1
+                self.events.append(event)
+
+    def summary(self) -> str:
+        """一行汇总：从第一个阶段开始到最后一个阶段结束的耗时，以及最外两层阶段的累计耗时（毫秒）"""
+        totals: "OrderedDict[str, float]" = OrderedDict()
+        events = sorted(self.events, key=lambda e: e["ts"])
+        wall = (max(e["ts"] + e["dur"] for e in events) - events[0]["ts"]) / 1000
+        for event in events:
+            if event["args"]["depth"] <= 1:
+                totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1000
+        parts = " | ".join(f"{name} {ms:.1f}" for name, ms in totals.items())
+        dropped = f" | 丢弃较早的 {self.dropped} 个事件" if self.dropped else ""
+        return f"trace: {wall:.1f}ms | {parts}{dropped}"
+
+    def export(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+    def finish(self) -> None:
+        """导出 trace 文件并在 stderr 输出汇总"""
+        if not self.events:
+            return
+        path = self.output
+        try:
+            if path is None:
+                from .utils import get_workflow_cachedir
+
+                path = os.path.join(
+                    get_workflow_cachedir(), "traces", time.strftime("trace-%Y%m%d-%H%M%S.json")
+                )
+            self.export(path)
+        except Exception as e:
+            print(f"写入 trace 失败: {e}", file=sys.stderr)
+            path = None
+        print(self.summary() + (f" -> {path}" if path else ""), file=sys.stderr)
+
+
+class _TimedSpan:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class StageTimer:
+    """只按阶段名累计耗时（毫秒）和次数，不保存单个事件，开销远小于完整追踪"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str) -> _TimedSpan:
+        return _TimedSpan(self, name)
+
+    def add(self, name: str, ms: float) -> None:
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+_tracer: Optional[Tracer] = None
+_stage_timer: Optional[StageTimer] = None
+
+
+def enable(output: Optional[str] = None) -> Tracer:
+    """开启追踪，进程退出时自动导出"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(output)
+        atexit.register(_tracer.finish)
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def set_stage_timer(timer: Optional[StageTimer]) -> None:
+    """安装（或传入 None 移除）累计阶段耗时的 StageTimer"""
+    global _stage_timer
+    _stage_timer = timer
+
+
+def span(name: str, **args):
+    """记录一个阶段的耗时：with span("decode"): ...
+
+    追踪、内存分析和阶段计时都关闭时返回共享的空上下文
+    """
+    profiler = memprofile.get_profiler()
+    if profiler is None:
+        if _tracer is None:
+            return _NOOP if _stage_timer is None else _stage_timer.span(name)
+        if _stage_timer is None:
+            return _tracer.span(name, **args)
+    return _combined_span(profiler, name, args)
+
+
+@contextmanager
+def _combined_span(
+    profiler: Optional["memprofile.MemoryProfiler"], name: str, args: Dict[str, Any]
+) -> Iterator[None]:
+    if profiler is not None:
+        profiler.enter()
+    timed = _NOOP if _stage_timer is None else _stage_timer.span(name)
+    try:
+        with timed:
+            if _tracer is None:
+                yield
+            else:
+                with _tracer.span(name, **args):
+                    yield
+    finally:
+        if profiler is not None:
+            profiler.exit(name)
+
+
+def _enable_from_env() -> None:
+    value = os.environ.get(TRACE_ENV, "")
+    if value and value.lower() not in ("0", "false", "no"):
+        enable(None if value.lower() in ("1", "true", "yes") else value)
+
+
+_enable_from_env()
@@ -17,6 +17,12 @@ def show_macos_notification(title, message):
 
 
 
+def get_workflow_cachedir():
+    """返回工作流缓存目录，复用 notify 模块中的 Workflow 实例"""
+    from .workflow.notify import wf
+    return wf().cachedir
+
+
 def get_download_folder():
     system = platform.system()
     if system == 'Windows':
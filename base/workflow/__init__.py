@@ -12,49 +12,75 @@
 
 import os
 
-# Filter matching rules
-# Icons
-# Exceptions
-# Workflow objects
-from .workflow import (
-    ICON_ACCOUNT,
-    ICON_BURN,
-    ICON_CLOCK,
-    ICON_COLOR,
-    ICON_COLOUR,
-    ICON_EJECT,
-    ICON_ERROR,
-    ICON_FAVORITE,
-    ICON_FAVOURITE,
-    ICON_GROUP,
-    ICON_HELP,
-    ICON_HOME,
-    ICON_INFO,
-    ICON_NETWORK,
-    ICON_NOTE,
-    ICON_SETTINGS,
-    ICON_SWIRL,
-    ICON_SWITCH,
-    ICON_SYNC,
-    ICON_TRASH,
-    ICON_USER,
-    ICON_WARNING,
-    ICON_WEB,
-    MATCH_ALL,
-    MATCH_ALLCHARS,
-    MATCH_ATOM,
-    MATCH_CAPITALS,
-    MATCH_INITIALS,
-    MATCH_INITIALS_CONTAIN,
-    MATCH_INITIALS_STARTSWITH,
-    MATCH_STARTSWITH,
-    MATCH_SUBSTRING,
-    KeychainError,
-    PasswordNotFound,
-    Workflow,
-    manager,
+# Public names are resolved lazily (PEP 562) so that importing a light
+# submodule such as ``notify`` does not pull in ``workflow``/``workflow3``
+# and their logging, plistlib, pickle and xml dependencies.
+_LAZY_ATTRIBUTES = {
+    "Variables": "workflow3",
+    "Workflow3": "workflow3",
+}
+_LAZY_ATTRIBUTES.update(
+    (name, "workflow")
+    for name in (
+        # Icons
+        "ICON_ACCOUNT",
+        "ICON_BURN",
+        "ICON_CLOCK",
+        "ICON_COLOR",
+        "ICON_COLOUR",
+        "ICON_EJECT",
+        "ICON_ERROR",
+        "ICON_FAVORITE",
+        "ICON_FAVOURITE",
+        "ICON_GROUP",
+        "ICON_HELP",
+        "ICON_HOME",
+        "ICON_INFO",
+        "ICON_NETWORK",
+        "ICON_NOTE",
+        "ICON_SETTINGS",
+        "ICON_SWIRL",
+        "ICON_SWITCH",
+        "ICON_SYNC",
+        "ICON_TRASH",
+        "ICON_USER",
+        "ICON_WARNING",
+        "ICON_WEB",
+        # Filter matching rules
+        "MATCH_ALL",
+        "MATCH_ALLCHARS",
+        "MATCH_ATOM",
+        "MATCH_CAPITALS",
+        "MATCH_INITIALS",
+        "MATCH_INITIALS_CONTAIN",
+        "MATCH_INITIALS_STARTSWITH",
+        "MATCH_STARTSWITH",
+        "MATCH_SUBSTRING",
+        # Exceptions
+        "KeychainError",
+        "PasswordNotFound",
+        # Workflow objects
+        "Workflow",
+        "manager",
+    )
 )
-from .workflow3 import Variables, Workflow3
+
+
+def __getattr__(name):
+    """Import the submodule defining ``name`` on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    from importlib import import_module
+
+    value = getattr(import_module("." + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __title__ = "Alfred-Workflow"
 __version__ = open(os.path.join(os.path.dirname(__file__), "version")).read()
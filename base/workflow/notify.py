@@ -25,16 +25,13 @@ icon and then calls the application to post notifications.
 
 
 import os
-import plistlib
-import shutil
 import subprocess
 import sys
-import tarfile
-import tempfile
-import uuid
 from typing import List
 
-from . import workflow
+# ``workflow`` (and with it logging, plistlib, xml, ...) is only imported
+# when a Workflow object is first needed, see :func:`wf`. Modules used only
+# when installing Notify.app are imported by the functions that need them.
 
 _wf = None
 _log = None
@@ -67,7 +64,9 @@ def wf():
     """
     global _wf
     if _wf is None:
-        _wf = workflow.Workflow()
+        from .workflow import Workflow
+
+        _wf = Workflow()
     return _wf
 
 
@@ -107,6 +106,10 @@ def install_notifier():
     Changes the bundle ID of the installed app and gives it the
     workflow's icon.
     """
+    import plistlib
+    import tarfile
+    import uuid
+
     archive = os.path.join(os.path.dirname(__file__), "Notify.tgz")
     destdir = wf().datadir
     app_path = os.path.join(destdir, "Notify.app")
@@ -249,6 +252,9 @@ def png_to_icns(png_path, icns_path):
     Raises:
         RuntimeError: Raised if ``iconutil`` or ``sips`` fail.
     """
+    import shutil
+    import tempfile
+
     tempdir = tempfile.mkdtemp(prefix="aw-", dir=wf().datadir)
 
     try:
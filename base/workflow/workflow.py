@@ -21,19 +21,28 @@ up your Python script to best utilise the :class:`Workflow` object.
 
 
 import binascii
+import hashlib
+import heapq
+import io
 import json
 import logging
 import logging.handlers
+import marshal
 import os
 import pickle
 import plistlib
 import re
 import shutil
+import stat
 import string
+import struct
 import subprocess
 import sys
+import tempfile
 import time
 import unicodedata
+import zlib
+from collections.abc import Mapping
 from contextlib import contextmanager
 from copy import deepcopy
 from typing import Optional
@@ -435,6 +444,118 @@ MATCH_ALLCHARS = 64
 MATCH_ALL = 127
 
 
+def char_mask(text):
+    """Return a bitmask of the characters in ``text``.
+
+    ASCII characters map to their own bit, so for an ASCII query
+    ``char_mask(query) & ~char_mask(text) == 0`` exactly when every
+    character of the query occurs in ``text``. Other characters share
+    64 hashed bits and need an exact check when the mask test passes.
+
+    :param text: text to build the mask for
+    :type text: ``unicode``
+    :rtype: ``int``
+
+    """
+    mask = 0
+    for c in set(text):
+        o = ord(c)
+        mask |= 1 << (o if o < 128 else 128 + o % 64)
+    return mask
+
+
+def fold_to_ascii(text):
+    """Convert non-ASCII characters to closest ASCII equivalent.
+
+    See :meth:`Workflow.fold_to_ascii`.
+    """
+    if isascii(text):
+        return text
+    text = "".join([ASCII_REPLACEMENTS.get(c, c) for c in text])
+    return unicodedata.normalize("NFKD", text)
+
+
+def allchars_search(query):
+    """Return a function finding ``query``'s characters in order.
+
+    Used by :const:`MATCH_ALLCHARS`. The function takes the value to
+    search (and optionally ``value.lower()`` if the caller already has
+    it) and returns the ``(start, end)`` span the case-insensitive
+    regex ``.*?q.*?u.*?e...`` would match, or ``None``, in linear time.
+
+    The regex matches from the first position from which every
+    character can be found in order, each as early as possible, without
+    ``.`` crossing a newline. Positions inside a line can only do worse
+    than the start of that line, so only line starts are tried, and
+    each character is looked up with its own one-character
+    case-insensitive pattern to keep the regex's case folding. ASCII
+    values without newlines take a plain ``str.find`` path.
+
+    """
+    chars = query.lower()
+    finders = [re.compile(re.escape(c), re.IGNORECASE).search for c in query]
+    ascii_query = query.isascii()
+
+    def search(value, lower=None):
+        if ascii_query and value.isascii() and "\n" not in value:
+            if lower is None:
+                lower = value.lower()
+            end = 0
+            for c in chars:
+                end = lower.find(c, end) + 1
+                if not end:
+                    return None
+            return (0, end)
+
+        length = len(value)
+        start = 0
+        while True:
+            end = start
+            limit = -1
+            for find in finders:
+                if end >= limit:
+                    # ``.*?`` may skip characters up to the next newline
+                    newline = value.find("\n", end)
+                    limit = length if newline < 0 else newline + 1
+                match = find(value, end, limit)
+                if match is None:
+                    break
+                end = match.end()
+            else:
+                return (start, end)
+
+            newline = value.find("\n", start)
+            if newline < 0:
+                return None
+            start = newline + 1
+
+    return search
+
+
+def select_results(results, ascending, min_score, max_results):
+    """Order ``(sort key, (item, score, rule))`` pairs and trim them.
+
+    Gives the same list as a full sort followed by ``min_score`` and
+    ``max_results`` filtering, but only keeps the best ``max_results``
+    on a heap when a limit is set.
+
+    :returns: ``list`` of ``(item, score, rule)``
+
+    """
+    if min_score:
+        results = [t for t in results if t[0][2] > min_score]
+
+    if max_results and len(results) > max_results:
+        if ascending:
+            results = heapq.nlargest(max_results, results)
+        else:
+            results = heapq.nsmallest(max_results, results)
+    else:
+        results.sort(reverse=ascending)
+
+    return [t[1] for t in results]
+
+
 ####################################################################
 # Used by `Workflow.check_update`
 ####################################################################
@@ -443,6 +564,15 @@ MATCH_ALL = 127
 DEFAULT_UPDATE_FREQUENCY = 1
 
 
+####################################################################
+# Used by `Workflow.cached_data`
+####################################################################
+
+# Minimum age in seconds of a cache file before `cached_data(memoize=True)`
+# keeps its data in memory (covers filesystems with 1-2 second mtimes)
+CACHE_MEMO_MIN_AGE = 2
+
+
 ####################################################################
 # Keychain access errors
 ####################################################################
@@ -686,10 +816,166 @@ class PickleSerializer(BaseSerializer):
         return pickle.dump(obj, file_obj, protocol=-1)
 
 
+class MarshalSerializer(BaseSerializer):
+    """Wrapper around :mod:`marshal`.
+
+    Loads and dumps built-in types (``dict``, ``list``, ``str``,
+    numbers etc.) several times faster than ``pickle`` or JSON, but
+    cannot store other objects, and data written by one Python version
+    is not guaranteed to load in another. Best for data that can be
+    regenerated.
+
+    """
+
+    is_binary = True
+
+    @classmethod
+    def load(cls, file_obj):
+        """Load serialized object from open marshal file.
+
+        :param file_obj: file handle
+        :type file_obj: ``file`` object
+        :returns: object loaded from marshal file
+        :rtype: object
+
+        """
+        # marshal.load() reads a file object in many small reads
+        return marshal.loads(file_obj.read())
+
+    @classmethod
+    def dump(cls, obj, file_obj):
+        """Serialize object ``obj`` to open marshal file.
+
+        Raises :class:`ValueError` if ``obj`` contains unsupported types.
+
+        :param obj: Python object to serialize
+        :type obj: built-in types
+        :param file_obj: file handle
+        :type file_obj: ``file`` object
+
+        """
+        return marshal.dump(obj, file_obj)
+
+
+class CompressedPickleSerializer(BaseSerializer):
+    """Pickle compressed with :mod:`zlib`.
+
+    Stores the same objects as :class:`PickleSerializer` in much smaller
+    files, at the cost of some (de)compression time. Compression ``level``
+    1 keeps most of the size reduction of higher levels at a fraction of
+    their cost.
+
+    """
+
+    is_binary = True
+    level = 1
+
+    @classmethod
+    def load(cls, file_obj):
+        """Load serialized object from open compressed pickle file.
+
+        :param file_obj: file handle
+        :type file_obj: ``file`` object
+        :returns: object loaded from file
+        :rtype: object
+
+        """
+        return pickle.loads(zlib.decompress(file_obj.read()))
+
+    @classmethod
+    def dump(cls, obj, file_obj):
+        """Serialize object ``obj`` to open compressed pickle file.
+
+        :param obj: Python object to serialize
+        :type obj: Python object
+        :param file_obj: file handle
+        :type file_obj: ``file`` object
+
+        """
+        return file_obj.write(zlib.compress(pickle.dumps(obj, protocol=-1), cls.level))
+
+
 # Set up default manager and register built-in serializers
 manager = SerializerManager()
 manager.register("pickle", PickleSerializer)
 manager.register("json", JSONSerializer)
+manager.register("marshal", MarshalSerializer)
+manager.register("zpickle", CompressedPickleSerializer)
+
+
+####################################################################
+# Datastore files used by `Workflow.store_data`
+####################################################################
+
+#: File extension of datastores saved by :meth:`Workflow.store_data`
+DATASTORE_EXTENSION = "alfred-workflow-data"
+
+# magic, format version and length of the serializer name that follows
+DATASTORE_HEADER = struct.Struct("<4sBB")
+DATASTORE_MAGIC = b"AWDS"
+DATASTORE_VERSION = 1
+
+
+def _datastore_serializer(serializer_name):
+    serializer = manager.serializer(serializer_name)
+    if serializer is None:
+        raise ValueError(
+            "Unknown serializer `{0}`. Register a corresponding "
+            "serializer with `manager.register()` "
+            "to load this data.".format(serializer_name)
+        )
+    return serializer
+
+
+def write_datastore(path, data, serializer_name):
+    """Atomically write ``data`` and its serializer's name to ``path``.
+
+    The file starts with :const:`DATASTORE_HEADER` and the
+    serializer's name, followed by the serialized data. Text
+    serializers write UTF-8.
+
+    :param path: path of datastore file
+    :param data: object to store
+    :param serializer_name: name of a registered serializer
+
+    """
+    serializer = _datastore_serializer(serializer_name)
+    name = serializer_name.encode("utf-8")
+    with atomic_writer(path, "wb") as file_obj:
+        file_obj.write(
+            DATASTORE_HEADER.pack(DATASTORE_MAGIC, DATASTORE_VERSION, len(name)) + name
+        )
+        if serializer.is_binary:
+            serializer.dump(data, file_obj)
+        else:
+            # encoding once is much faster than many small text writes
+            text = io.StringIO()
+            serializer.dump(data, text)
+            file_obj.write(text.getvalue().encode("utf-8"))
+
+
+def read_datastore(path):
+    """Load a datastore written by :func:`write_datastore`.
+
+    Raises :class:`ValueError` if the file is not a datastore or its
+    serializer is not registered.
+
+    :param path: path of datastore file
+    :returns: ``(serializer_name, data)``
+
+    """
+    with open(path, "rb") as file_obj:
+        header = file_obj.read(DATASTORE_HEADER.size)
+        if len(header) < DATASTORE_HEADER.size:
+            raise ValueError("Not a datastore file: {0}".format(path))
+        magic, version, length = DATASTORE_HEADER.unpack(header)
+        if magic != DATASTORE_MAGIC or version != DATASTORE_VERSION:
+            raise ValueError("Not a datastore file: {0}".format(path))
+        serializer_name = file_obj.read(length).decode("utf-8")
+        serializer = _datastore_serializer(serializer_name)
+        if serializer.is_binary:
+            return serializer_name, serializer.load(file_obj)
+        return serializer_name, serializer.load(io.TextIOWrapper(file_obj, encoding="utf-8"))
 
 
 class Item(object):
@@ -882,6 +1168,328 @@ class Settings(dict):
         return ret
 
 
+class InfoPlist(Mapping):
+    """Read-only, lazily parsed view of ``info.plist``.
+
+    Parsing the full plist (which may embed the whole README) costs
+    several milliseconds, yet most processes only need ``bundleid``,
+    ``name`` or ``version``. Small top-level scalar values are therefore
+    kept in a compact :mod:`marshal` cache keyed on the plist's path,
+    mtime and size. The full plist is only parsed when the cache is stale
+    or when a key that is not in the cache (e.g. ``objects`` or
+    ``readme``) is actually requested.
+
+    The cache is only loaded if it is owned by the current user and not
+    writable by anyone else, as :mod:`marshal` data must be trusted.
+
+    :param filepath: path to ``info.plist``
+    :type filepath: ``unicode``
+    :param cachepath: path of the metadata cache. Defaults to a file
+        named after the plist's path in a per-user directory (mode 0700)
+        in the system temporary directory. If that directory is not
+        private, no cache is used.
+    :type cachepath: ``unicode``
+
+    """
+
+    #: Format version of the metadata cache
+    cache_version = 1
+
+    #: Longest string value that is kept in the cache
+    max_cached_length = 256
+
+    def __init__(self, filepath, cachepath=None):
+        """Create new :class:`InfoPlist` object."""
+        self.filepath = filepath
+        if cachepath is None:
+            dirpath = self._private_cachedir()
+            if dirpath is not None:
+                digest = hashlib.sha1(os.path.abspath(filepath).encode("utf-8"))
+                cachepath = os.path.join(
+                    dirpath, "info-{}.marshal".format(digest.hexdigest()[:16])
+                )
+        self.cachepath = cachepath
+        self._fields = None
+        self._keys = None
+        self._full = None
+
+    @staticmethod
+    def _private(st):
+        """Whether ``st`` belongs to the current user and nobody else can write."""
+        return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+    @classmethod
+    def _private_cachedir(cls):
+        """Per-user cache directory in the temporary directory, or ``None``."""
+        dirpath = os.path.join(
+            tempfile.gettempdir(), "alfred-workflow-{}".format(os.getuid())
+        )
+        try:
+            os.mkdir(dirpath, 0o700)
+        except FileExistsError:
+            pass
+        except OSError:
+            return None
+        try:
+            st = os.lstat(dirpath)
+        except OSError:
+            return None
+        # refuse a directory (or symlink) someone else created first
+        if not stat.S_ISDIR(st.st_mode) or not cls._private(st):
+            return None
+        return dirpath
+
+    def _signature(self):
+        st = os.stat(self.filepath)
+        return (self.cache_version, sys.version_info[:2], st.st_mtime_ns, st.st_size)
+
+    def _load_metadata(self):
+        """Load cached scalar fields, rebuilding the cache if it is stale."""
+        signature = self._signature()
+        if self.cachepath is not None:
+            try:
+                with open(self.cachepath, "rb") as fp:
+                    if not self._private(os.fstat(fp.fileno())):
+                        raise ValueError("untrusted cache file")
+                    cached_signature, fields, keys = marshal.load(fp)
+                if cached_signature == signature:
+                    self._fields, self._keys = fields, keys
+                    return
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+        data = self._load_full()
+        self._keys = list(data)
+        self._fields = {
+            key: value
+            for key, value in data.items()
+            if isinstance(value, (bool, int, float))
+            or (isinstance(value, str) and len(value) <= self.max_cached_length)
+        }
+        if self.cachepath is None:
+            return
+        try:
+            with atomic_writer(self.cachepath, "wb") as fp:
+                marshal.dump((signature, self._fields, self._keys), fp)
+        except OSError:
+            pass
+
+    def _load_full(self):
+        """Parse the whole plist."""
+        if self._full is None:
+            with open(self.filepath, "rb") as fp:
+                self._full = plistlib.load(fp)
+        return self._full
+
+    def __getitem__(self, key):
+        """Implement :class:`~collections.abc.Mapping` interface."""
+        if self._fields is None:
+            self._load_metadata()
+        if key in self._fields:
+            return self._fields[key]
+        if key in self._keys:
+            return self._load_full()[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        """Implement :class:`~collections.abc.Mapping` interface."""
+        if self._keys is None:
+            self._load_metadata()
+        return iter(self._keys)
+
+    def __len__(self):
+        """Implement :class:`~collections.abc.Mapping` interface."""
+        if self._keys is None:
+            self._load_metadata()
+        return len(self._keys)
+
+
+class SearchIndex(object):
+    """Precomputed search keys for :meth:`Workflow.filter`.
+
+    :meth:`Workflow.filter` folds, lower-cases and splits every item's
+    search key for every query. A :class:`SearchIndex` does that work
+    once: for each item it stores the lower-cased key, its capitals,
+    atoms and atom initials, and a character bitmask used to reject
+    items that cannot match before any other test is run. Keys are
+    stored both as-is and folded to ASCII, because folding depends on
+    the query.
+
+    Pass an index instead of a list of items to :meth:`Workflow.filter`
+    to get identical results much faster. Indexes can be pickled, so
+    they can be persisted with :meth:`Workflow.cached_data` (see
+    :meth:`Workflow.search_index`).
+
+    :param items: items to index
+    :type items: ``list`` or ``tuple``
+    :param key: function to get comparison key from ``items``.
+        Must return a ``unicode`` string. The default simply returns
+        the item.
+    :type key: ``callable``
+    :param fold: function used to fold keys to ASCII. Defaults to
+        :func:`fold_to_ascii`.
+    :type fold: ``callable``
+
+    """
+
+    def __init__(self, items, key=lambda x: x, fold=None):
+        """Create new :class:`SearchIndex` object."""
+        if fold is None:
+            fold = fold_to_ascii
+        self.items = list(items)
+        self.entries = [self._entry(key(item), fold) for item in self.items]
+        self._search_pattern_cache = {}
+
+    @staticmethod
+    def _keys(value):
+        """Search keys of one (folded or unfolded) value."""
+        lower = value.lower()
+        atoms = [s.lower() for s in split_on_delimiters(value)]
+        return (
+            value,
+            lower,
+            char_mask(lower),
+            "".join([c for c in value if c in INITIALS]).lower(),
+            # atoms never contain NUL; a joined string unpickles much
+            # faster than a set and still allows exact membership tests
+            "\0" + "\0".join(atoms) + "\0",
+            "".join([s[0] for s in atoms if s]),
+        )
+
+    @classmethod
+    def _entry(cls, value, fold):
+        value = value.strip()
+        if value == "":
+            return None
+        keys = cls._keys(value)
+        folded = fold(value)
+        return (value.lower(), keys, keys if folded == value else cls._keys(folded))
+
+    def __getstate__(self):
+        """Do not pickle compiled patterns."""
+        return {"items": self.items, "entries": self.entries}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._search_pattern_cache = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _search_for_query(self, query):
+        search = self._search_pattern_cache.get(query)
+        if search is None:
+            search = self._search_pattern_cache[query] = allchars_search(query)
+        return search
+
+    def _match(self, keys, query, atom_key, exact_chars, match_on):
+        """Same rules and scores as :meth:`Workflow._filter_item`.
+
+        The caller has already checked the character bitmask.
+        """
+        value, lower, _, capitals, atoms, initials = keys
+        length = len(value)
+
+        if exact_chars and not set(query) <= set(lower):
+            return (0, None)
+
+        if match_on & MATCH_STARTSWITH and lower.startswith(query):
+            return (100.0 - (length / len(query)), MATCH_STARTSWITH)
+
+        if match_on & MATCH_CAPITALS and capitals.startswith(query):
+            return (100.0 - (len(capitals) / len(query)), MATCH_CAPITALS)
+
+        if match_on & MATCH_ATOM and atom_key is not None and atom_key in atoms:
+            return (100.0 - (length / len(query)), MATCH_ATOM)
+
+        if match_on & MATCH_INITIALS_STARTSWITH and initials.startswith(query):
+            return (100.0 - (len(initials) / len(query)), MATCH_INITIALS_STARTSWITH)
+        elif match_on & MATCH_INITIALS_CONTAIN and query in initials:
+            return (95.0 - (len(initials) / len(query)), MATCH_INITIALS_CONTAIN)
+
+        if match_on & MATCH_SUBSTRING and query in lower:
+            return (90.0 - (length / len(query)), MATCH_SUBSTRING)
+
+        if match_on & MATCH_ALLCHARS:
+            span = self._search_for_query(query)(value, lower)
+            if span:
+                start, end = span
+                return (100.0 / ((1 + start) * (end - start + 1)), MATCH_ALLCHARS)
+
+        return (0, None)
+
+    def filter(
+        self,
+        query,
+        ascending=False,
+        include_score=False,
+        min_score=0,
+        max_results=0,
+        match_on=MATCH_ALL,
+        fold_diacritics=True,
+    ):
+        """Search the index. See :meth:`Workflow.filter` for the arguments.
+
+        :returns: the same list :meth:`Workflow.filter` returns for the
+            indexed items.
+
+        """
+        if not query:
+            return self.items
+
+        query = query.strip()
+
+        if not query:
+            return self.items
+
+        # per-word state: (lower-cased word, char mask, atom search key,
+        # needs exact character check, index of the key variant to use)
+        words = []
+        for word in query.split(" "):
+            word = word.strip().lower()
+            if word == "":
+                continue
+            ascii_word = isascii(word)
+            words.append((
+                word,
+                char_mask(word),
+                None if "\0" in word else "\0" + word + "\0",
+                not ascii_word,
+                2 if fold_diacritics and ascii_word else 1,
+            ))
+
+        match = self._match
+        results = []
+        for item, entry in zip(self.items, self.entries):
+            if entry is None:
+                continue
+            skip = False
+            score = 0
+            for word, mask, atom_key, exact_chars, variant in words:
+                keys = entry[variant]
+                # cheap rejection of items missing any of the word's characters
+                if mask & ~keys[2]:
+                    skip = True
+                    break
+                s, rule = match(keys, word, atom_key, exact_chars, match_on)
+                if not s:
+                    skip = True
+                    break
+                score += s
+
+            if skip:
+                continue
+
+            if score:
+                results.append(((100.0 / score, entry[0], score), (item, score, rule)))
+
+        results = select_results(results, ascending, min_score, max_results)
+
+        if include_score:
+            return results
+        return [t[0] for t in results]
+
+
 class Workflow(object):
     """The ``Workflow`` object is the main interface to Alfred-Workflow.
 
@@ -971,6 +1579,8 @@ class Workflow(object):
         self._last_version_run = UNSET
         # Cache for regex patterns created for filter keys
         self._search_pattern_cache = {}
+        # Data loaded by `cached_data()`, keyed on cache file path
+        self._cache_memo = {}
         #: Prefix for all magic arguments.
         #: The default value is ``workflow:`` so keyword
         #: ``config`` would match user query ``workflow:config``.
@@ -1093,7 +1703,10 @@ class Workflow(object):
 
     @property
     def info(self):
-        """:class:`dict` of ``info.plist`` contents."""
+        """Mapping of ``info.plist`` contents.
+
+        Values are loaded lazily via :class:`InfoPlist`.
+        """
         if not self._info_loaded:
             self._load_info_plist()
         return self._info
@@ -1578,9 +2191,26 @@ class Workflow(object):
 
         .. versionadded:: 1.8
 
+        Data saved in the old two-file layout (a ``.<name>.alfred-workflow``
+        file naming the serializer next to ``<name>.<serializer>``) are
+        loaded and moved to a single datastore file.
+
         :param name: name of datastore
 
         """
+        data_path = self.datafile("{0}.{1}".format(name, DATASTORE_EXTENSION))
+
+        try:
+            serializer_name, data = read_datastore(data_path)
+        except FileNotFoundError:
+            return self._migrate_stored_data(name)
+
+        self.logger.debug("stored data loaded: %s (%s)", data_path, serializer_name)
+
+        return data
+
+    def _migrate_stored_data(self, name):
+        """Load datastore ``name`` from the old layout and convert it."""
         metadata_path = self.datafile(".{0}.alfred-workflow".format(name))
 
         if not os.path.exists(metadata_path):
@@ -1590,34 +2220,49 @@ class Workflow(object):
         with open(metadata_path, "r") as file_obj:
             serializer_name = file_obj.read().strip()
 
-        serializer = manager.serializer(serializer_name)
-
-        if serializer is None:
-            raise ValueError(
-                "Unknown serializer `{0}`. Register a corresponding "
-                "serializer with `manager.register()` "
-                "to load this data.".format(serializer_name)
-            )
+        serializer = _datastore_serializer(serializer_name)
 
-        self.logger.debug("data `%s` stored as `%s`", name, serializer_name)
-
-        filename = "{0}.{1}".format(name, serializer_name)
-        data_path = self.datafile(filename)
+        data_path = self.datafile("{0}.{1}".format(name, serializer_name))
 
         if not os.path.exists(data_path):
             self.logger.debug("no data stored: %s", name)
-            if os.path.exists(metadata_path):
-                os.unlink(metadata_path)
-
+            os.unlink(metadata_path)
             return None
 
         with open(data_path, "rb") as file_obj:
             data = serializer.load(file_obj)
 
-        self.logger.debug("stored data loaded: %s", data_path)
+        self._write_datastore(name, data, serializer_name)
+        self.logger.debug("migrated stored data: %s", data_path)
 
         return data
 
+    def _legacy_data_paths(self, name):
+        """Files of datastore ``name`` in the old two-file layout."""
+        metadata_path = self.datafile(".{0}.alfred-workflow".format(name))
+        try:
+            with open(metadata_path, "r") as file_obj:
+                serializer_name = file_obj.read().strip()
+        except FileNotFoundError:
+            return []
+        return [metadata_path, self.datafile("{0}.{1}".format(name, serializer_name))]
+
+    def _write_datastore(self, name, data, serializer_name):
+        """Write datastore ``name`` and remove any old-layout files."""
+        data_path = self.datafile("{0}.{1}".format(name, DATASTORE_EXTENSION))
+
+        # Ensure write is not interrupted by SIGTERM
+        @uninterruptible
+        def _store():
+            write_datastore(data_path, data, serializer_name)
+            for path in self._legacy_data_paths(name):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+        _store()
+
+        self.logger.debug("saved data: %s", data_path)
+
     def store_data(self, name, data, serializer=None):
         """Save data to data directory.
 
@@ -1625,6 +2270,10 @@ class Workflow(object):
 
         If ``data`` is ``None``, the datastore will be deleted.
 
+        The data are saved to a single ``<name>.alfred-workflow-data``
+        file whose header names the serializer (see
+        :func:`write_datastore`).
+
         Note that the datastore does NOT support mutliple threads.
 
         :param name: name of datastore
@@ -1647,84 +2296,128 @@ class Workflow(object):
 
         serializer_name = serializer or self.data_serializer
 
-        # In order for `stored_data()` to be able to load data stored with
-        # an arbitrary serializer, yet still have meaningful file extensions,
-        # the format (i.e. extension) is saved to an accompanying file
-        metadata_path = self.datafile(".{0}.alfred-workflow".format(name))
-        filename = "{0}.{1}".format(name, serializer_name)
-        data_path = self.datafile(filename)
-
-        if data_path == self.settings_path:
-            raise ValueError(
-                "Cannot save data to"
-                + "`{0}` with format `{1}`. ".format(name, serializer_name)
-                + "This would overwrite Alfred-Workflow's settings file."
-            )
-
-        serializer = manager.serializer(serializer_name)
-
-        if serializer is None:
+        if manager.serializer(serializer_name) is None:
             raise ValueError(
                 "Invalid serializer `{0}`. Register your serializer with "
                 "`manager.register()` first.".format(serializer_name)
             )
 
         if data is None:  # Delete cached data
-            delete_paths((metadata_path, data_path))
+            data_path = self.datafile("{0}.{1}".format(name, DATASTORE_EXTENSION))
+            delete_paths([data_path] + self._legacy_data_paths(name))
             return
 
         if isinstance(data, str):
             data = bytearray(data)
 
-        # Ensure write is not interrupted by SIGTERM
-        @uninterruptible
-        def _store():
-            # Save file extension
-            with atomic_writer(metadata_path, "w") as file_obj:
-                file_obj.write(serializer_name)
-
-            with serializer.atomic_writer(data_path, "w") as file_obj:
-                serializer.dump(data, file_obj)
-
-        _store()
-
-        self.logger.debug("saved data: %s", data_path)
+        self._write_datastore(name, data, serializer_name)
 
-    def cached_data(self, name, data_func=None, max_age=60):
+    def cached_data(self, name, data_func=None, max_age=60, memoize=False):
         """Return cached data if younger than ``max_age`` seconds.
 
         Retrieve data from cache or re-generate and re-cache data if
         stale/non-existant. If ``max_age`` is 0, return cached data no
         matter how old.
 
+        With ``memoize=True``, data loaded from a cache file are kept in
+        memory and returned again (as the same object) until the file
+        changes, so only use it for data that are never modified in
+        place.
+
+        Regeneration is protected by a :class:`LockFile` on the cache
+        file: if several processes find the cache stale at the same
+        time, only one calls ``data_func`` while the others wait and
+        then load the fresh cache.
+
         :param name: name of datastore
         :param data_func: function to (re-)generate data.
         :type data_func: ``callable``
         :param max_age: maximum age of cached data in seconds
         :type max_age: ``int``
+        :param memoize: keep loaded data in memory for later calls
+        :type memoize: ``bool``
         :returns: cached data, return value of ``data_func`` or ``None``
             if ``data_func`` is not set
 
         """
-        serializer = manager.serializer(self.cache_serializer)
-
         cache_path = self.cachefile("%s.%s" % (name, self.cache_serializer))
-        age = self.cached_data_age(name)
-
-        if (age < max_age or max_age == 0) and os.path.exists(cache_path):
 
-            with open(cache_path, "rb") as file_obj:
-                self.logger.debug("loading cached data: %s", cache_path)
-                return serializer.load(file_obj)
+        data = self._load_cached_data(cache_path, max_age, memoize)
+        if data is not UNSET:
+            return data
 
         if not data_func:
             return None
 
-        data = data_func()
-        self.cache_data(name, data)
+        with LockFile(cache_path):
+            # another process may have regenerated the data while we waited
+            data = self._load_cached_data(cache_path, max_age, memoize)
+            if data is not UNSET:
+                return data
+
+            data = data_func()
+            self.cache_data(name, data)
+
+        return data
+
+    def _load_cached_data(self, cache_path, max_age, memoize=False):
+        """Data in ``cache_path`` if fresh enough, else :const:`UNSET`."""
+        try:
+            st = os.stat(cache_path)
+        except FileNotFoundError:
+            return UNSET
+
+        now = time.time()
+        if max_age and now - st.st_mtime >= max_age:
+            return UNSET
+
+        key = (self.cache_serializer, st.st_ino, st.st_mtime_ns, st.st_size)
+        if memoize:
+            memo = self._cache_memo.get(cache_path)
+            if memo is not None and memo[0] == key:
+                return memo[1]
 
+        serializer = manager.serializer(self.cache_serializer)
+        with open(cache_path, "rb") as file_obj:
+            self.logger.debug("loading cached data: %s", cache_path)
+            data = serializer.load(file_obj)
+
+        # On filesystems with coarse mtimes, a rewrite within the same
+        # tick can reuse inode, mtime and size, so only trust the key
+        # once the file is older than that.
+        if memoize and now - st.st_mtime > CACHE_MEMO_MIN_AGE:
+            self._cache_memo[cache_path] = (key, data)
         return data
 
+    def search_index(self, name, data_func=None, key=lambda x: x, max_age=60):
+        """Return a cached :class:`SearchIndex` of ``data_func()``'s items.
+
+        The index is built with ``key`` and stored via
+        :meth:`cached_data`, so the items and their precomputed search
+        keys are only rebuilt when the cache is older than ``max_age``.
+        The loaded index is memoized, as filtering never modifies it.
+        Requires a cache serializer that can store arbitrary objects
+        (the default, ``pickle``).
+
+        :param name: name of datastore
+        :param data_func: function returning the items to index
+        :type data_func: ``callable``
+        :param key: function to get comparison key from the items
+        :type key: ``callable``
+        :param max_age: maximum age of cached index in seconds
+        :type max_age: ``int``
+        :returns: :class:`SearchIndex` or ``None`` if there is no cached
+            index and ``data_func`` is not set
+
+        """
+        build = None
+        if data_func:
+
+            def build():
+                return SearchIndex(data_func(), key, self.fold_to_ascii)
+
+        return self.cached_data(name, build, max_age, memoize=True)
+
     def cache_data(self, name, data):
         """Save ``data`` to cache under ``name``.
 
@@ -1739,6 +2432,7 @@ class Workflow(object):
         serializer = manager.serializer(self.cache_serializer)
 
         cache_path = self.cachefile("%s.%s" % (name, self.cache_serializer))
+        self._cache_memo.pop(cache_path, None)
 
         if data is None:
             if os.path.exists(cache_path):
@@ -1779,11 +2473,11 @@ class Workflow(object):
         """
         cache_path = self.cachefile("%s.%s" % (name, self.cache_serializer))
 
-        if not os.path.exists(cache_path):
+        try:
+            return time.time() - os.stat(cache_path).st_mtime
+        except FileNotFoundError:
             return 0
 
-        return time.time() - os.stat(cache_path).st_mtime
-
     def filter(
         self,
         query,
@@ -1806,8 +2500,10 @@ class Workflow(object):
 
         :param query: query to test items against
         :type query: ``unicode``
-        :param items: iterable of items to test
-        :type items: ``list`` or ``tuple``
+        :param items: iterable of items to test, or a :class:`SearchIndex`
+            of the items (``key`` is then ignored), which gives the same
+            results without recomputing each item's search keys
+        :type items: ``list``, ``tuple`` or :class:`SearchIndex`
         :param key: function to get comparison key from ``items``.
             Must return a ``unicode`` string. The default simply returns
             the item.
@@ -1894,6 +2590,21 @@ class Workflow(object):
         altered.
 
         """
+        if isinstance(items, SearchIndex):
+            if query and query.strip():
+                fold_diacritics = self.settings.get(
+                    "__workflow_diacritic_folding", fold_diacritics
+                )
+            return items.filter(
+                query,
+                ascending=ascending,
+                include_score=include_score,
+                min_score=min_score,
+                max_results=max_results,
+                match_on=match_on,
+                fold_diacritics=fold_diacritics,
+            )
+
         if not query:
             return items
 
@@ -1938,14 +2649,7 @@ class Workflow(object):
                 )
 
         # sort on keys, then discard the keys
-        results.sort(reverse=ascending)
-        results = [t[1] for t in results]
-
-        if min_score:
-            results = [r for r in results if r[1] > min_score]
-
-        if max_results and len(results) > max_results:
-            results = results[:max_results]
+        results = select_results(results, ascending, min_score, max_results)
 
         # return list of ``(item, score, rule)``
         if include_score:
@@ -2034,12 +2738,10 @@ class Workflow(object):
         # finally, assign a score based on how close together the
         # characters in `query` are in item.
         if match_on & MATCH_ALLCHARS:
-            search = self._search_for_query(query)
-            match = search(value)
-            if match:
-                score = 100.0 / (
-                    (1 + match.start()) * (match.end() - match.start() + 1)
-                )
+            span = self._search_for_query(query)(value)
+            if span:
+                start, end = span
+                score = 100.0 / ((1 + start) * (end - start + 1))
 
                 return (score, MATCH_ALLCHARS)
 
@@ -2050,13 +2752,7 @@ class Workflow(object):
         if query in self._search_pattern_cache:
             return self._search_pattern_cache[query]
 
-        # Build pattern: include all characters
-        pattern = []
-        for c in query:
-            # pattern.append('[^{0}]*{0}'.format(re.escape(c)))
-            pattern.append(".*?{0}".format(re.escape(c)))
-        pattern = "".join(pattern)
-        search = re.compile(pattern, re.IGNORECASE).search
+        search = allchars_search(query)
 
         self._search_pattern_cache[query] = search
         return search
@@ -2777,10 +3473,7 @@ class Workflow(object):
         :rtype: ``unicode``
 
         """
-        if isascii(text):
-            return text
-        text = "".join([ASCII_REPLACEMENTS.get(c, c) for c in text])
-        return unicodedata.normalize("NFKD", text)
+        return fold_to_ascii(text)
 
     def dumbify_punctuation(self, text):
         """Convert non-ASCII punctuation to closest ASCII equivalent.
@@ -2826,9 +3519,17 @@ class Workflow(object):
 
     def _load_info_plist(self):
         """Load workflow info from ``info.plist``."""
-        # info.plist should be in the directory above this one
-        with open(self.workflowfile("info.plist"), "rb") as file_obj:
-            self._info = plistlib.load(file_obj)
+        # info.plist should be in the directory above this one.
+        # Keep the metadata cache in the workflow's cache directory when
+        # Alfred tells us where it is (the default one needs the bundle
+        # ID, i.e. info.plist itself)
+        cachepath = None
+        if self.alfred_env.get("workflow_cache"):
+            cachepath = os.path.join(
+                self._create(self.alfred_env["workflow_cache"]),
+                "alfred-workflow-info.marshal",
+            )
+        self._info = InfoPlist(self.workflowfile("info.plist"), cachepath)
         self._info_loaded = True
 
     def _create(self, dirpath):
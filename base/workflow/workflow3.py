@@ -663,7 +663,7 @@ class Workflow3(Workflow):
 
         return super(Workflow3, self).cache_data(name, data)
 
-    def cached_data(self, name, data_func=None, max_age=60, session=False):
+    def cached_data(self, name, data_func=None, max_age=60, session=False, memoize=False):
         """Cache API with session-scoped expiry.
 
         .. versionadded:: 1.25
@@ -675,9 +675,11 @@ class Workflow3(Workflow):
             max_age (int): Maximum allowable age of cache in seconds.
             session (bool, optional): Whether to scope the cache
                 to the current session.
+            memoize (bool, optional): Keep loaded data in memory for
+                later calls.
 
-        ``name``, ``data_func`` and ``max_age`` are the same as for the
-        :meth:`~workflow.Workflow.cached_data` method on
+        ``name``, ``data_func``, ``max_age`` and ``memoize`` are the same
+        as for the :meth:`~workflow.Workflow.cached_data` method on
         :class:`~workflow.Workflow`.
 
         If ``session`` is ``True``, then ``name`` is prefixed
@@ -687,7 +689,7 @@ class Workflow3(Workflow):
         if session:
             name = self._mk_session_name(name)
 
-        return super(Workflow3, self).cached_data(name, data_func, max_age)
+        return super(Workflow3, self).cached_data(name, data_func, max_age, memoize)
 
     def clear_session_cache(self, current=False):
         """Remove session data from the cache.
@@ -0,0 +1,157 @@
+"""
+MATCH_ALLCHARS 最坏情况基准测试
+比较 .*?a.*?b... 正则与线性扫描（allchars_search 返回的查找函数）在长条目、10 个以上字符的查询下的耗时：
+- 长文本中在末尾才完成匹配的查询（正则不回溯，主要是逐字符的开销）
+- 所有字符都出现但顺序不对的“差一点匹配”，ASCII 和中文各一组（正则回溯随长度指数增长，只测到较短的长度）
+并在随机字符串（含非 ASCII、换行）上校验两者的 (start, end) 完全一致；
+最后比较设置 max_results 时堆选取前 k 个与完整排序的耗时，并校验结果一致
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_allchars.py
+    python benchmarks/bench_allchars.py --lengths 1000,100000 --miss-lengths 20,40,80 --repeat 5
+"""
+
+import os
+import random
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re  # noqa: E402
+
+from base.workflow.workflow import allchars_search, select_results  # noqa: E402
+
+MATCH_QUERY = "screenshotbeautifyz"  # 19 个字符，最后一个字符只出现在条目末尾
+MISS_QUERY = "abcdefghijk"  # 11 个字符，最后一个字符只出现在最前面
+MISS_QUERY_CJK = "屏幕美化撕裂边缘渐变背截"  # 同上，中文
+ALPHABET = "abcABC kKſé\nİı.截屏"
+
+
+def timed(func, repeat: int) -> float:
+    """重复调用 func，返回最快一次的毫秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def regex_search(query: str):
+    """原来的实现：逐字符拼接 .*? 的正则"""
+    pattern = "".join(".*?{0}".format(re.escape(c)) for c in query)
+    return re.compile(pattern, re.IGNORECASE).search
+
+
+def regex_span(value: str, query: str):
+    match = regex_search(query)(value)
+    return match.span() if match else None
+
+
+def check_spans(count: int) -> int:
+    """随机字符串上比较线性扫描和正则，返回不一致的数量"""
+    rng = random.Random(0)
+    mismatches = 0
+    for _ in range(count):
+        value = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+        query = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 4))).lower()
+        if allchars_search(query)(value) != regex_span(value, query):
+            mismatches += 1
+            print(f"MISMATCH value={value!r} query={query!r}")
+    return mismatches
+
+
+def check_selection(count: int) -> int:
+    """随机结果上比较堆选取和完整排序，返回不一致的数量"""
+    rng = random.Random(1)
+    mismatches = 0
+    for _ in range(count):
+        results = []
+        for i in range(rng.randint(0, 60)):
+            score = float(rng.randint(1, 8))
+            value = rng.choice("abcd")
+            results.append(((100.0 / score, value, score), (f"{value}{i}", score, 1)))
+        ascending = rng.random() < 0.5
+        min_score = rng.choice((0, 0, 3.0))
+        max_results = rng.choice((0, 1, 5, 20, 100))
+
+        expected = sorted(results, reverse=ascending)
+        expected = [t[1] for t in expected]
+        if min_score:
+            expected = [r for r in expected if r[1] > min_score]
+        if max_results:
+            expected = expected[:max_results]
+
+        if select_results(list(results), ascending, min_score, max_results) != expected:
+            mismatches += 1
+            print(f"MISMATCH ascending={ascending} min_score={min_score} max_results={max_results}")
+    return mismatches
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--lengths", default="1000,10000,100000")
+    parser.add_argument("--miss-lengths", default="20,40,60,80")
+    parser.add_argument("--results", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = check_spans(20000) + check_selection(2000)
+
+    rng = random.Random(2)
+    words = "screenshot beautify torn edge gradient padding shadow report draft".split()
+    search, scan = regex_search(MATCH_QUERY), allchars_search(MATCH_QUERY)
+    print(f"可匹配的长条目，查询 {MATCH_QUERY!r}:")
+    for length in (int(v) for v in args.lengths.split(",")):
+        value = ""
+        while len(value) < length:
+            value += rng.choice(words) + " "
+        value = value[: length - 1] + "Z"
+        if scan(value) != regex_span(value, MATCH_QUERY):
+            mismatches += 1
+            print(f"MISMATCH length={length}")
+        old = timed(lambda: search(value), args.repeat)
+        new = timed(lambda: scan(value), args.repeat)
+        lower = value.lower()
+        indexed = timed(lambda: scan(value, lower), args.repeat)
+        print(
+            f"  {length:>7} 字符: 正则 {old:9.3f}ms  扫描 {new:7.3f}ms  {old / new:6.1f}x"
+            f"  （SearchIndex 已有小写 {indexed:7.3f}ms  {old / indexed:6.1f}x）"
+        )
+
+    for query in (MISS_QUERY, MISS_QUERY_CJK):
+        search, scan = regex_search(query), allchars_search(query)
+        unit = query[:-1]
+        print(f"差一点匹配的条目，查询 {query!r}:")
+        for length in (int(v) for v in args.miss_lengths.split(",")):
+            value = query[-1] + unit * (length // len(unit))
+            if scan(value) is not None:
+                mismatches += 1
+                print(f"MISMATCH query={query!r} length={length}")
+            old = timed(lambda: search(value), 1)
+            new = timed(lambda: scan(value), args.repeat)
+            print(f"  {len(value):>7} 字符: 正则 {old:9.3f}ms  扫描 {new:7.3f}ms  {old / new:7.1f}x")
+        value = query[-1] + unit * 10000
+        new = timed(lambda: scan(value), args.repeat)
+        print(f"  {len(value):>7} 字符: 扫描 {new:7.3f}ms（正则无法在合理时间内完成）")
+
+    results = []
+    for i in range(args.results):
+        score = rng.uniform(1, 100)
+        results.append(((100.0 / score, f"item {i}", score), (i, score, 1)))
+    print(f"{args.results} 条结果中选取前 k 个:")
+    full = timed(lambda: sorted(results)[:20], args.repeat)
+    for k in (1, 20, 200):
+        heap = timed(lambda: select_results(list(results), False, 0, k), args.repeat)
+        print(f"  k={k:<4}: 完整排序 {full:7.1f}ms  堆 {heap:6.1f}ms  {full / heap:5.1f}x")
+
+    if mismatches:
+        print(f"FAILED: {mismatches} 处结果不一致")
+        sys.exit(1)
+    print("OK: 结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+资源缓存基准测试
+在全新进程中测量预计算（plan）的冷启动耗时：缓存为空 vs 缓存已填充
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_asset_cache.py --size 2880x1800 --repeat 5
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子进程中执行：构造处理器并为指定尺寸生成 plan，输出耗时（毫秒）
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from processors.beautify_processor import BeautifyProcessor
+from processors.torn_edge_processor import TornEdgeProcessor
+size = tuple({size!r})
+result = {{}}
+for name, cls in (("beautify", BeautifyProcessor), ("torn_edge", TornEdgeProcessor)):
+    processor = cls()
+    start = time.perf_counter()
+    processor.plan(size, "RGBA")
+    result[name] = (time.perf_counter() - start) * 1000
+print(json.dumps(result))
+"""
+
+
+def run_child(size: tuple, cache_dir: str) -> dict:
+    env = dict(os.environ, alfred_workflow_cache=cache_dir)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=ROOT, size=list(size))],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = ArgumentParser(description="资源缓存基准测试")
+    parser.add_argument("--size", default="2880x1800")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    empty = {"beautify": [], "torn_edge": []}
+    populated = {"beautify": [], "torn_edge": []}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for name, ms in run_child(size, cache_dir).items():
+                empty[name].append(ms)
+            for name, ms in run_child(size, cache_dir).items():
+                populated[name].append(ms)
+
+    print(f"cold plan() latency for {size[0]}x{size[1]}, best of {args.repeat}")
+    print(f"{'processor':<12}{'empty cache':>14}{'populated':>12}")
+    for name in empty:
+        print(f"{name:<12}{min(empty[name]):>12.1f}ms{min(populated[name]):>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+批量内核基准测试
+比较逐帧 PIL 处理与不同块大小下 apply_batch 的吞吐（帧/秒）
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_batch.py --frames 200 --size 480x320 --chunks 1,4,16,64
+"""
+
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_plan import PROCESSORS
+
+
+def frames_per_second(processor, frames: np.ndarray, chunk_size: int) -> float:
+    """chunk_size 为 0 时逐帧走 PIL 的 apply，否则按块调用 apply_batch"""
+    plan = processor.get_plan((frames.shape[2], frames.shape[1]), "RGBA")
+    start = time.perf_counter()
+    if chunk_size == 0:
+        for frame in frames:
+            processor.apply(plan, Image.fromarray(frame, "RGBA"))
+    else:
+        for i in range(0, len(frames), chunk_size):
+            # apply_batch 可能原地修改输入，每块都复制一份
+            processor.apply_batch(plan, frames[i:i + chunk_size].copy())
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = ArgumentParser(description="批量内核基准测试")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", default="480x320")
+    parser.add_argument("--chunks", default="1,4,16,64")
+    parser.add_argument("--processors", default=",".join(PROCESSORS))
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    chunk_sizes = [int(v) for v in args.chunks.split(",")]
+    # GIF 解码出的帧alpha只有0和255
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 256, (args.frames, height, width, 4), dtype=np.uint8)
+    frames[..., 3] = np.where(frames[..., 3] < 32, 0, 255)
+
+    header = f"{'processor':<12}{'PIL':>10}" + "".join(f"{'chunk ' + str(c):>12}" for c in chunk_sizes)
+    print(f"{args.frames} frames, {width}x{height}, frames/sec")
+    print(header)
+    for name in args.processors.split(","):
+        processor = PROCESSORS[name]()
+        row = f"{name:<12}{frames_per_second(processor, frames, 0):>10.1f}"
+        for chunk_size in chunk_sizes:
+            row += f"{frames_per_second(processor, frames, chunk_size):>12.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
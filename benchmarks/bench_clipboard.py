@@ -0,0 +1,65 @@
+"""
+剪贴板往返基准测试
+使用内存剪贴板后端测量 读取剪贴板 -> 处理 -> 写回剪贴板 的完整延迟，可在无界面的 Linux 上运行
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_clipboard.py --size 2880x1800 --repeat 5
+"""
+
+import io
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.clipboard import CLIPBOARD_ENCODINGS, MemoryClipboardBackend
+from bench_plan import PROCESSORS
+
+
+def make_screenshot_png(size: tuple) -> bytes:
+    """生成一张类似截图的PNG：大块纯色加少量噪声"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    arr = np.full((height, width, 4), 245, dtype=np.uint8)
+    arr[: height // 10] = (40, 44, 52, 255)
+    arr[height // 3 : height // 2, width // 8 : width // 2, :3] = rng.integers(0, 256, 3)
+    arr[..., 3] = 255
+    buffer = io.BytesIO()
+    Image.fromarray(arr, "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def main():
+    parser = ArgumentParser(description="剪贴板往返基准测试")
+    parser.add_argument("--size", default="2880x1800")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--processors", default=",".join(PROCESSORS))
+    parser.add_argument("--encodings", default=",".join(CLIPBOARD_ENCODINGS))
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    data = make_screenshot_png(size)
+
+    print(f"clipboard -> clipboard, {size[0]}x{size[1]}, best of {args.repeat}")
+    print(f"{'processor':<12}{'encoding':<12}{'latency':>10}{'bytes out':>12}")
+    for name in args.processors.split(","):
+        processor = PROCESSORS[name]()
+        for encoding in args.encodings.split(","):
+            os.environ["clipboard_encoding"] = encoding
+            best = float("inf")
+            for _ in range(args.repeat):
+                processor.clipboard = MemoryClipboardBackend(data)
+                start = time.perf_counter()
+                processor.run()
+                best = min(best, time.perf_counter() - start)
+            size_out = len(processor.clipboard.data)
+            print(f"{name:<12}{encoding:<12}{best * 1000:>8.1f}ms{size_out:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Workflow.store_data / stored_data 基准测试
+对小数据（几个键的字典）和大数据（5 万条类似历史记录的字典）分别测量各序列化器的写入、读取耗时和文件大小，
+并与旧的双文件布局（.<名称>.alfred-workflow 记录序列化器 + <名称>.<序列化器> 数据文件）对比；
+同时校验往返结果一致，以及旧布局的数据能被 stored_data 读出并迁移为单个文件
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_datastore.py
+    python benchmarks/bench_datastore.py --records 200000 --repeat 5
+"""
+
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 缓存和数据目录放到临时目录，不影响真实的工作流数据
+_tmp = tempfile.mkdtemp(prefix="bench-datastore-")
+os.environ["alfred_workflow_cache"] = os.path.join(_tmp, "cache")
+os.environ["alfred_workflow_data"] = os.path.join(_tmp, "data")
+
+from base.workflow.util import atomic_writer  # noqa: E402
+from base.workflow.workflow import DATASTORE_EXTENSION, Workflow, manager  # noqa: E402
+
+SERIALIZERS = ("json", "pickle", "marshal", "zpickle")
+
+
+def make_payloads(records: int) -> dict:
+    small = {"preset": "beautify", "radius": 15, "padding": 10, "colors": [[102, 42, 197], [238, 61, 165]]}
+    large = [
+        {
+            "path": f"/Users/me/Desktop/Screenshot {i:06d}.png",
+            "time": 1700000000.0 + i * 37.5,
+            "size": [1440 + i % 512, 900 + i % 256],
+            "bytes": 200000 + i * 13,
+            "action": "beautify" if i % 3 else "torn_edge",
+            "ok": i % 17 != 0,
+        }
+        for i in range(records)
+    ]
+    return {"small": small, "large": large}
+
+
+def legacy_store(wf: Workflow, name: str, data, serializer_name: str):
+    """旧版 store_data：元数据文件和数据文件各原子写入一次"""
+    serializer = manager.serializer(serializer_name)
+    with atomic_writer(wf.datafile(f".{name}.alfred-workflow"), "w") as file_obj:
+        file_obj.write(serializer_name)
+    with serializer.atomic_writer(wf.datafile(f"{name}.{serializer_name}"), "w") as file_obj:
+        serializer.dump(data, file_obj)
+
+
+def legacy_load(wf: Workflow, name: str):
+    """旧版 stored_data：检查并读取元数据文件，再检查并读取数据文件"""
+    metadata_path = wf.datafile(f".{name}.alfred-workflow")
+    if not os.path.exists(metadata_path):
+        return None
+    with open(metadata_path, "r") as file_obj:
+        serializer_name = file_obj.read().strip()
+    data_path = wf.datafile(f"{name}.{serializer_name}")
+    if not os.path.exists(data_path):
+        return None
+    with open(data_path, "rb") as file_obj:
+        return manager.serializer(serializer_name).load(file_obj)
+
+
+def timed(func, repeat: int) -> float:
+    """重复调用 func，返回最快一次的毫秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    wf = Workflow()
+    failures = 0
+    for label, data in make_payloads(args.records).items():
+        print(f"{label}:")
+        for serializer_name in SERIALIZERS:
+            name = f"bench-{label}-{serializer_name}"
+
+            old_write = timed(lambda: legacy_store(wf, name, data, serializer_name), args.repeat)
+            old_read = timed(lambda: legacy_load(wf, name), args.repeat)
+
+            # 旧布局的数据应被读出并迁移为单个文件
+            if wf.stored_data(name) != data or os.path.exists(wf.datafile(f".{name}.alfred-workflow")):
+                failures += 1
+                print(f"  FAILED: {serializer_name} 旧布局迁移")
+
+            new_write = timed(lambda: wf.store_data(name, data, serializer_name), args.repeat)
+            new_read = timed(lambda: wf.stored_data(name), args.repeat)
+            if wf.stored_data(name) != data:
+                failures += 1
+                print(f"  FAILED: {serializer_name} 往返结果不一致")
+
+            size = os.path.getsize(wf.datafile(f"{name}.{DATASTORE_EXTENSION}"))
+            print(
+                f"  {serializer_name:>8}: 写入 {old_write:8.2f} -> {new_write:8.2f}ms"
+                f"  读取 {old_read:8.2f} -> {new_read:8.2f}ms  {size / 1024:9.1f}KiB"
+            )
+            wf.store_data(name, None)
+
+    if failures:
+        print(f"FAILED: {failures} 项检查未通过")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
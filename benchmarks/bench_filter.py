@@ -0,0 +1,114 @@
+"""
+Workflow.filter 搜索索引基准测试
+生成 1k~100k 条类似预设名、历史记录的条目，比较逐条计算的 Workflow.filter 与预先建立的 SearchIndex 的每次查询耗时，
+并校验两者对每个查询、每种匹配规则返回的 (条目, 分数, 规则) 完全一致；同时测量建立索引和经 cached_data 读回的耗时
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_filter.py
+    python benchmarks/bench_filter.py --sizes 1000,10000 --repeat 5
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 缓存和数据目录放到临时目录，不影响真实的工作流数据
+_tmp = tempfile.mkdtemp(prefix="bench-filter-")
+os.environ["alfred_workflow_cache"] = os.path.join(_tmp, "cache")
+os.environ["alfred_workflow_data"] = os.path.join(_tmp, "data")
+
+from base.workflow.workflow import (  # noqa: E402
+    MATCH_ALL,
+    MATCH_ALLCHARS,
+    MATCH_CAPITALS,
+    MATCH_INITIALS,
+    MATCH_SUBSTRING,
+    SearchIndex,
+    Workflow,
+)
+
+WORDS = (
+    "screenshot beautify torn edge white background gradient padding radius shadow "
+    "OmniFocus GoogleChrome Safari Finder Xcode Terminal Preview Photoshop Figma Sketch "
+    "café crème brûlée Zürich São Paulo Ærøskøbing naïve résumé "
+    "report draft final v2 2024 invoice meeting notes design review mockup"
+).split()
+
+QUERIES = ("s", "scr", "gc", "torn edge", "cafe", "café", "zur", "of", "drft", "xyz", "v2 notes", "mock rev")
+
+RULES = {
+    "all": MATCH_ALL,
+    "no-allchars": MATCH_ALL ^ MATCH_ALLCHARS,
+    "capitals": MATCH_CAPITALS,
+    "initials|substring": MATCH_INITIALS | MATCH_SUBSTRING,
+}
+
+
+def make_items(count: int) -> list:
+    rng = random.Random(count)
+    items = []
+    for i in range(count):
+        words = rng.sample(WORDS, rng.randint(1, 4))
+        sep = rng.choice([" ", "-", "_", ".", " "])
+        items.append(sep.join(words) + (f" {i}" if rng.random() < 0.3 else ""))
+    return items
+
+
+def timed(func, repeat: int) -> float:
+    """重复调用 func，返回最快一次的毫秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    wf = Workflow()
+    mismatches = 0
+    for size in (int(v) for v in args.sizes.split(",")):
+        items = make_items(size)
+
+        start = time.perf_counter()
+        index = SearchIndex(items)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        name = f"bench-index-{size}"
+        wf.search_index(name, lambda: items, max_age=0)
+        start = time.perf_counter()
+        loaded = wf.search_index(name, max_age=0)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        for rule_name, match_on in RULES.items():
+            for query in QUERIES:
+                expected = wf.filter(query, items, include_score=True, match_on=match_on)
+                for candidate in (index, loaded):
+                    if wf.filter(query, candidate, include_score=True, match_on=match_on) != expected:
+                        mismatches += 1
+                        print(f"MISMATCH size={size} rule={rule_name} query={query!r}")
+
+        print(f"{size} 条: 建立索引 {build_ms:.0f}ms，cached_data 读回 {load_ms:.0f}ms")
+        for query in QUERIES[:6]:
+            plain = timed(lambda: wf.filter(query, items), args.repeat)
+            indexed = timed(lambda: wf.filter(query, index), args.repeat)
+            print(f"  {query!r:>12}: filter {plain:8.1f}ms  index {indexed:7.1f}ms  {plain / indexed:5.1f}x")
+
+    if mismatches:
+        print(f"FAILED: {mismatches} 处结果不一致")
+        sys.exit(1)
+    print("OK: 结果一致")
+
+
+if __name__ == "__main__":
+    main()
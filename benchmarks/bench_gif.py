@@ -0,0 +1,108 @@
+"""
+GIF 处理基准测试
+比较处理器能力声明开启/关闭时 process_gif_file 的耗时
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_gif.py --frames 30 --size 480x320
+"""
+
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.beautify_processor import BeautifyProcessor
+from processors.torn_edge_processor import TornEdgeProcessor
+from processors.whitebg_processor import WhiteBGProcessor
+
+PROCESSORS = {
+    "beautify": BeautifyProcessor,
+    "torn_edge": TornEdgeProcessor,
+    "whitebg": WhiteBGProcessor,
+}
+
+
+def make_gif(path: str, frames: int, size: tuple) -> None:
+    """生成带透明区域的合成动画GIF"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(frames):
+        arr = np.zeros((height, width, 4), dtype=np.uint8)
+        arr[..., 0] = (np.arange(width) * 255 // max(width - 1, 1))[None, :]
+        arr[..., 1] = (i * 255 // max(frames - 1, 1))
+        arr[..., 2] = rng.integers(0, 64, size=(height, width), dtype=np.uint8)
+        arr[..., 3] = 255
+        arr[height * 3 // 8 : height * 5 // 8, width * 3 // 8 : width * 5 // 8, 3] = 0
+        images.append(Image.fromarray(arr, "RGBA"))
+    # 所有帧共用一个全局调色板（索引255为透明色），与录屏工具导出的GIF一致
+    palette = images[0].convert("RGB").quantize(colors=255, dither=Image.Dither.NONE)
+    palette_data = (palette.getpalette() or [])[: 255 * 3]
+    palette_data += [0] * (256 * 3 - len(palette_data))
+    frames = []
+    for image in images:
+        frame = image.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        frame.putpalette(palette_data)
+        frame.paste(255, mask=Image.eval(image.getchannel("A"), lambda a: 255 if a < 128 else 0))
+        frames.append(frame)
+    frames[0].save(
+        path, save_all=True, append_images=frames[1:], duration=50, loop=0,
+        transparency=255, optimize=False,
+    )
+
+
+def without_flags(cls):
+    """构造一个清除全部能力声明的子类，作为对照组"""
+    return type(
+        cls.__name__ + "NoFlags",
+        (cls,),
+        {
+            "output_opaque": False,
+            "preserves_geometry": False,
+            "alpha_only": False,
+            "frame_invariant": False,
+        },
+    )
+
+
+def time_gif(processor, input_path: str, output_path: str, repeat: int) -> float:
+    """返回多次运行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor.process_gif_file(input_path, output_path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = ArgumentParser(description="GIF 处理基准测试")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--size", default="480x320")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--processors", default=",".join(PROCESSORS))
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input.gif")
+        output_path = os.path.join(tmp, "output.gif")
+        make_gif(input_path, args.frames, size)
+
+        print(f"{'processor':<12}{'flags off':>12}{'flags on':>12}{'speedup':>10}")
+        for name in args.processors.split(","):
+            cls = PROCESSORS[name]
+            off = time_gif(without_flags(cls)(), input_path, output_path, args.repeat)
+            on = time_gif(cls(), input_path, output_path, args.repeat)
+            print(f"{name:<12}{off * 1000:>10.1f}ms{on * 1000:>10.1f}ms{off / on:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+导入耗时检查
+在新进程中用 python -X importtime 导入 notify 所在的路径，只统计本仓库模块（base.*）自身的耗时，
+不计 subprocess、typing 等标准库：标准库的导入耗时随机器和负载波动很大，绝对预算容易误报；
+同一轮里再单独导入一次 notify 依赖的标准库作为参照，只打印不参与判断。
+导入时加载了 base.workflow.workflow（及其 logging/plistlib/xml 依赖）时以非零状态退出，这是主要的检查；
+本仓库模块自身的耗时（多次运行的中位数）超过预算时同样失败
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 10 --runs 9
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入 notify 时不应被加载的模块
+FORBIDDEN = ("base.workflow.workflow", "base.workflow.workflow3", "logging", "plistlib")
+
+CHECK = (
+    "import sys\n"
+    "from base.workflow.notify import notify\n"
+    "print(','.join(name for name in {forbidden!r} if name in sys.modules))\n"
+)
+
+# notify 依赖的标准库，作为同一轮的参照
+BASELINE = "import os, subprocess, sys, typing"
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def importtime(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+
+def parse(stderr: str) -> list:
+    """返回 [(模块名, 自身耗时毫秒, 累计耗时毫秒, 缩进)]"""
+    rows = []
+    for m in map(LINE.match, stderr.splitlines()):
+        if m:
+            rows.append((m.group(4), int(m.group(1)) / 1000, int(m.group(2)) / 1000, len(m.group(3))))
+    return rows
+
+
+def measure() -> tuple:
+    """返回 (本仓库模块自身耗时之和毫秒, 参照导入的累计耗时毫秒, 被加载的禁止模块)"""
+    result = importtime(CHECK.format(forbidden=FORBIDDEN))
+    own = sum(self_ms for name, self_ms, _, _ in parse(result.stderr) if name == "base" or name.startswith("base."))
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    # 参照只统计最外层的导入，避免重复计算
+    baseline = sum(cumulative for _, _, cumulative, indent in parse(importtime(BASELINE).stderr) if indent == 1)
+    return own, baseline, loaded
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    own_timings, baseline_timings, loaded = [], [], []
+    for _ in range(args.runs):
+        own, baseline, loaded = measure()
+        own_timings.append(own)
+        baseline_timings.append(baseline)
+    median = statistics.median(own_timings)
+    print(
+        f"base.*（导入 notify）: 中位数 {median:.1f}ms（{min(own_timings):.1f}~{max(own_timings):.1f}ms，"
+        f"预算 {args.budget_ms:.0f}ms）"
+    )
+    print(f"参照 {BASELINE!r}: 中位数 {statistics.median(baseline_timings):.1f}ms")
+
+    failed = False
+    if loaded:
+        print(f"FAILED: 导入 notify 时加载了 {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print("FAILED: 本仓库模块的导入耗时超过预算")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+批处理任务基准测试
+比较每张图片启动一次 main.py 与一个 main.py jobs 进程处理全部任务（NDJSON）的吞吐（jobs/sec）
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_jobs.py --count 20 --size 1440x900 --action beautify --workers 1,2
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+
+def make_inputs(directory: str, count: int, size: tuple) -> list:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        arr = np.full((size[1], size[0], 4), 245, dtype=np.uint8)
+        arr[40:size[1] - 40, 40:size[0] - 40, :3] = rng.integers(0, 256, 3)
+        arr[..., 3] = 255
+        path = os.path.join(directory, f"input_{i}.png")
+        Image.fromarray(arr, "RGBA").save(path)
+        paths.append(path)
+    return paths
+
+
+def per_process(action: str, paths: list) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        subprocess.run(
+            [sys.executable, MAIN, action, "file"],
+            cwd=ROOT,
+            env=dict(os.environ, files=path),
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    return time.perf_counter() - start
+
+
+def single_process(action: str, paths: list, workers: int) -> float:
+    jobs = "".join(
+        json.dumps({"action": action, "input": path, "output": path + f".jobs{workers}.png"}) + "\n"
+        for path in paths
+    )
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, MAIN, "jobs", "--workers", str(workers)],
+        cwd=ROOT,
+        input=jobs,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    elapsed = time.perf_counter() - start
+    results = [json.loads(line) for line in output.splitlines()]
+    assert len(results) == len(paths) and all(r["ok"] for r in results), output
+    return elapsed
+
+
+def main():
+    parser = ArgumentParser(description="批处理任务基准测试")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--size", default="1440x900")
+    parser.add_argument("--action", default="beautify")
+    parser.add_argument("--workers", default="1,2")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_inputs(directory, args.count, size)
+        print(f"{args.count} x {args.action} {size[0]}x{size[1]}")
+        elapsed = per_process(args.action, paths)
+        print(f"{'one process per image':<26}{args.count / elapsed:>8.1f} jobs/sec")
+        for workers in (int(v) for v in args.workers.split(",")):
+            elapsed = single_process(args.action, paths, workers)
+            print(f"{f'main.py jobs --workers {workers}':<26}{args.count / elapsed:>8.1f} jobs/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+分阶段内存基准测试
+开启内存分析（BEAUTIFIER_MEMPROFILE）以 file 模式处理一个动画GIF和一张长截图，
+读取报告中每个阶段的 tracemalloc 峰值和 RSS 变化，并断言：
+- 计划和编码阶段都出现在报告中（调色板GIF复用索引时没有单独的解码和效果阶段）
+- 每个阶段的峰值不超过成本模型（ImageProcessor.estimate_cost）预测的峰值内存
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --processors beautify,torn_edge --frames 60 --tall 1440x12000
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from base.cost import estimate
+from base.memprofile import LATEST_NAME, MEMPROFILE_ENV
+from bench_gif import make_gif
+from bench_plan import PROCESSORS
+
+# 每次运行都应出现的阶段
+REQUIRED_STAGES = ("plan", "encode")
+
+
+def make_tall_screenshot(path: str, size: tuple) -> None:
+    """生成类似长网页截图的PNG：浅色背景上的多行文字块"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    arr = np.full((height, width, 3), 248, dtype=np.uint8)
+    for top in range(20, height - 30, 36):
+        arr[top:top + 14, 40:width - 40] = rng.integers(0, 120, (1, width - 80, 3))
+    Image.fromarray(arr, "RGB").save(path)
+
+
+def profile(action: str, path: str, report_dir: str) -> dict:
+    """在子进程中处理 path 并返回内存分析报告"""
+    env = dict(os.environ, files=path)
+    env[MEMPROFILE_ENV] = report_dir
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), action, "file"],
+        env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    with open(os.path.join(report_dir, LATEST_NAME), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stage_peak(stage: dict) -> int:
+    """阶段的峰值内存：Python 分配与 RSS 增长中的较大者"""
+    return max(stage["tracemalloc_peak"], stage["rss_delta_max"] or 0, stage["maxrss_growth"])
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--processors", default=",".join(PROCESSORS))
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--gif-size", default="480x360")
+    parser.add_argument("--tall", default="1440x9000")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        gif_path = os.path.join(tmp, "anim.gif")
+        tall_path = os.path.join(tmp, "tall.png")
+        make_gif(gif_path, args.frames, tuple(int(v) for v in args.gif_size.split("x")))
+        make_tall_screenshot(tall_path, tuple(int(v) for v in args.tall.split("x")))
+
+        for name in args.processors.split(","):
+            for path in (gif_path, tall_path):
+                report_dir = os.path.join(tmp, f"report_{name}_{os.path.basename(path)}")
+                report = profile(name, path, report_dir)
+                budget = estimate(PROCESSORS[name], path).peak_bytes
+                case = f"{name} {os.path.basename(path)}"
+                print(f"{case}: 预计峰值 {budget / 1024 / 1024:.1f}MB, "
+                      f"进程峰值RSS {report['process_maxrss'] / 1024 / 1024:.0f}MB")
+                for stage_name, stage in report["stages"].items():
+                    peak = stage_peak(stage)
+                    print(f"  {stage_name:<24} x{stage['count']:<3} "
+                          f"tracemalloc {stage['tracemalloc_peak'] / 1024 / 1024:7.1f}MB  "
+                          f"rss {(stage['rss_delta_max'] or 0) / 1024 / 1024:7.1f}MB  "
+                          f"maxrss+ {stage['maxrss_growth'] / 1024 / 1024:7.1f}MB")
+                    if stage_name != "main" and peak > budget:
+                        failures.append(f"{case}: {stage_name} {peak} > {budget}")
+                for stage_name in REQUIRED_STAGES:
+                    if stage_name not in report["stages"]:
+                        failures.append(f"{case}: 报告缺少阶段 {stage_name}")
+
+    if failures:
+        print("\n".join(["FAILED:"] + failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+文件批处理流水线基准测试
+比较逐个文件串行处理与 解码/计算/编码 三阶段流水线的总耗时，并校验两者输出一致
+
+--dir 指向网络挂载（NFS/SMB）上的目录即可测量真实的慢速存储；
+--latency 为每次打开文件额外增加固定延迟，模拟网络挂载的往返时间
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_pipeline.py --count 12 --size 2560x1600
+    python benchmarks/bench_pipeline.py --count 12 --latency 30
+    python benchmarks/bench_pipeline.py --dir /Volumes/share/tmp
+"""
+
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.pipeline import process_files, process_files_serial
+from bench_plan import PROCESSORS
+
+
+def make_inputs(directory: str, count: int, size: tuple) -> list:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        arr = np.full((size[1], size[0], 4), 250, dtype=np.uint8)
+        for top in range(0, size[1] - 30, 40):
+            arr[top + 8:top + 24, 30:size[0] - 30, :3] = rng.integers(0, 160, (1, size[0] - 60, 3))
+        arr[..., 3] = 255
+        path = os.path.join(directory, f"input_{i}.png")
+        Image.fromarray(arr, "RGBA").save(path)
+        paths.append(path)
+    return paths
+
+
+def slow_open(directory: str, latency: float):
+    """在基准测试进程内为 directory 下的文件访问增加固定延迟（sleep 与真实 I/O 一样会释放 GIL）"""
+    original = builtins.open
+
+    def open_with_latency(file, *args, **kwargs):
+        if isinstance(file, str) and file.startswith(directory):
+            time.sleep(latency)
+        return original(file, *args, **kwargs)
+
+    return original, open_with_latency
+
+
+def run(func, processor, paths) -> tuple:
+    start = time.perf_counter()
+    results = func(processor, paths)
+    elapsed = time.perf_counter() - start
+    failed = [r for _, r in results if isinstance(r, BaseException)]
+    assert not failed, failed
+    outputs = {}
+    for _, output in results:
+        with open(output, "rb") as f:
+            outputs[output] = np.asarray(Image.open(f).convert("RGBA"))
+    return elapsed, outputs
+
+
+def main():
+    parser = ArgumentParser(description="文件批处理流水线基准测试")
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--size", default="2560x1600")
+    parser.add_argument("--processors", default="beautify,torn_edge,whitebg")
+    parser.add_argument("--dir", help="输入输出目录，默认使用临时目录")
+    parser.add_argument("--latency", type=float, default=0, help="每次打开文件增加的延迟（毫秒）")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    directory = tempfile.mkdtemp(dir=args.dir)
+    try:
+        paths = make_inputs(directory, args.count, size)
+        if args.latency:
+            original, patched = slow_open(directory, args.latency / 1000)
+            builtins.open = patched
+        print(f"{args.count} files {size[0]}x{size[1]} in {directory}, extra latency {args.latency:g}ms")
+        print(f"{'processor':<12}{'serial':>10}{'pipeline':>10}{'speedup':>9}")
+        for name in args.processors.split(","):
+            processor = PROCESSORS[name]()
+            processor.get_plan(size, "RGBA")
+            serial, expected = run(process_files_serial, processor, paths)
+            pipelined, actual = run(process_files, processor, paths)
+            assert all(np.array_equal(expected[k], actual[k]) for k in expected), name
+            print(f"{name:<12}{serial:>9.2f}s{pipelined:>9.2f}s{serial / pipelined:>8.2f}x")
+    finally:
+        if args.latency:
+            builtins.open = original
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
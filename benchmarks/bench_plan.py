@@ -0,0 +1,76 @@
+"""
+预计算（plan）基准测试
+比较逐帧重新预计算与整段动画复用同一 plan 时的单帧耗时
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_plan.py --frames 200 --size 480x320
+"""
+
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.beautify_processor import BeautifyProcessor
+from processors.pad_text_processor import PadTextProcessor
+from processors.torn_edge_processor import TornEdgeProcessor
+from processors.whitebg_processor import WhiteBGProcessor
+
+PROCESSORS = {
+    "beautify": BeautifyProcessor,
+    "torn_edge": TornEdgeProcessor,
+    "whitebg": WhiteBGProcessor,
+    "pad_text": PadTextProcessor,
+}
+
+
+def make_frames(frames: int, size: tuple) -> list:
+    """生成同尺寸的RGBA帧序列"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, (height, width, 4), dtype=np.uint8), "RGBA")
+        for _ in range(frames)
+    ]
+
+
+def per_frame_ms(processor, frames: list, reuse_plan: bool) -> float:
+    """返回处理单帧的平均耗时（毫秒）"""
+    size = frames[0].size
+    start = time.perf_counter()
+    if reuse_plan:
+        plan = processor.plan(size, "RGBA")
+        for frame in frames:
+            processor.apply(plan, frame)
+    else:
+        for frame in frames:
+            processor.apply(processor.plan(size, "RGBA"), frame)
+    return (time.perf_counter() - start) * 1000 / len(frames)
+
+
+def main():
+    parser = ArgumentParser(description="预计算（plan）基准测试")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", default="480x320")
+    parser.add_argument("--processors", default=",".join(PROCESSORS))
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    frames = make_frames(args.frames, size)
+
+    print(f"{args.frames} frames, {size[0]}x{size[1]}")
+    print(f"{'processor':<12}{'per-frame plan':>16}{'shared plan':>14}{'speedup':>10}")
+    for name in args.processors.split(","):
+        processor = PROCESSORS[name]()
+        without = per_frame_ms(processor, frames, reuse_plan=False)
+        with_plan = per_frame_ms(processor, frames, reuse_plan=True)
+        print(f"{name:<12}{without:>14.2f}ms{with_plan:>12.2f}ms{without / with_plan:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+多线程 PNG 编码基准测试
+比较 Pillow 与 png_writer 在不同线程数下的编码吞吐（MB/s，按未压缩像素字节计），并校验无损往返
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_png.py --size 2880x12000 --threads 1,2,4,8
+"""
+
+import io
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.png_writer import encode_png
+
+
+def make_scroll_capture(size: tuple) -> Image.Image:
+    """生成类似长截图的图像：浅色背景、文字行样式的噪声条和若干图片区域"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    arr = np.full((height, width, 4), 250, dtype=np.uint8)
+    for top in range(0, height, 48):
+        arr[top + 10 : top + 30, 40 : width - 40, :3] = rng.integers(0, 120, (1, width - 80, 3))
+    for top in range(0, height, 2000):
+        block = arr[top + 600 : top + 1000, width // 4 : width // 2]
+        block[...] = rng.integers(0, 256, block.shape)
+    arr[..., 3] = 255
+    return Image.fromarray(arr, "RGBA")
+
+
+def measure(encode, image: Image.Image, repeat: int):
+    best = float("inf")
+    data = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = encode(image)
+        best = min(best, time.perf_counter() - start)
+    return best, data
+
+
+def pillow_encode(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def main():
+    parser = ArgumentParser(description="多线程 PNG 编码基准测试")
+    parser.add_argument("--size", default="2880x12000")
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    image = make_scroll_capture(size)
+    megabytes = size[0] * size[1] * 4 / 1e6
+    expected = np.asarray(image)
+
+    print(f"{size[0]}x{size[1]} RGBA ({megabytes:.0f} MB raw), {os.cpu_count()} cores")
+    print(f"{'encoder':<14}{'time':>10}{'MB/s':>10}{'bytes':>12}")
+    elapsed, data = measure(pillow_encode, image, args.repeat)
+    print(f"{'pillow':<14}{elapsed * 1000:>8.0f}ms{megabytes / elapsed:>10.1f}{len(data):>12}")
+    for threads in (int(v) for v in args.threads.split(",")):
+        elapsed, data = measure(lambda im: encode_png(im, threads=threads), image, args.repeat)
+        decoded = Image.open(io.BytesIO(data))
+        assert np.array_equal(np.asarray(decoded), expected), "round trip is not lossless"
+        name = f"parallel x{threads}"
+        print(f"{name:<14}{elapsed * 1000:>8.0f}ms{megabytes / elapsed:>10.1f}{len(data):>12}")
+
+
+if __name__ == "__main__":
+    main()
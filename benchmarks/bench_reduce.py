@@ -0,0 +1,144 @@
+"""
+PNG 输出优化基准测试
+对几类典型截图比较优化前后（RGBA 直接保存 vs reduce_image 后保存）的文件大小和保存耗时，并校验无损往返；
+另外校验有损量化后带透明区域的大图（不少于 4MP）经多线程 PNG 编码与 Pillow 编码解出的像素一致
+
+用法（在仓库根目录运行）：
+    python benchmarks/bench_reduce.py --size 2880x1800 --repeat 3
+"""
+
+import io
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base.png_optimizer import reduce_image
+from base.png_writer import encode_png
+
+
+def make_terminal(size: tuple, rng) -> np.ndarray:
+    """深色背景上的彩色文字行"""
+    width, height = size
+    arr = np.zeros((height, width, 4), dtype=np.uint8)
+    arr[...] = (30, 30, 30, 255)
+    colors = np.array([(220, 220, 220), (80, 200, 120), (230, 180, 80), (100, 160, 240)], dtype=np.uint8)
+    for top in range(8, height - 24, 28):
+        glyphs = rng.random((16, width - 40)) < 0.35
+        arr[top:top + 16, 20:width - 20, :3][glyphs] = colors[rng.integers(0, len(colors))]
+    return arr
+
+
+def make_diagram(size: tuple, rng) -> np.ndarray:
+    """白底、纯色方框和连线，四周透明（类似带圆角的导出图）"""
+    width, height = size
+    arr = np.full((height, width, 4), 255, dtype=np.uint8)
+    for _ in range(40):
+        x, y = rng.integers(0, width - 300), rng.integers(0, height - 150)
+        arr[y:y + 120, x:x + 260, :3] = rng.integers(0, 8, 3) * 32
+        arr[y + 60, x:min(width, x + 600), :3] = 0
+    arr[:40, :, 3] = 0
+    arr[40:44, :, 3] = 128
+    return arr
+
+
+def make_ui(size: tuple, rng) -> np.ndarray:
+    """浅灰界面：纯灰度、不透明，但有抗锯齿带来的大量灰阶"""
+    width, height = size
+    gray = np.full((height, width), 240, dtype=np.uint8)
+    gray[::48] = 200
+    gray[:, ::120] = rng.integers(0, 256, (1, 1))
+    gray += rng.integers(0, 3, gray.shape, dtype=np.uint8)
+    return np.dstack([gray, gray, gray, np.full_like(gray, 255)])
+
+
+def make_photo(size: tuple, rng) -> np.ndarray:
+    """平滑渐变加噪声，颜色远超256种"""
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width]
+    arr = np.empty((height, width, 4), dtype=np.uint8)
+    arr[..., 0] = (x * 255 // width)
+    arr[..., 1] = (y * 255 // height)
+    arr[..., 2] = rng.integers(0, 256, (height, width))
+    arr[..., 3] = 255
+    return arr
+
+
+SAMPLES = {
+    "terminal": make_terminal,
+    "diagram": make_diagram,
+    "ui-gray": make_ui,
+    "photo": make_photo,
+}
+
+
+def save(image: Image.Image, repeat: int):
+    best = float("inf")
+    data = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        data = buffer.getvalue()
+        best = min(best, time.perf_counter() - start)
+    return data, best
+
+
+def check_lossy_transparent(size: tuple, rng) -> None:
+    """有损量化得到 RGBA 调色板时，多线程编码也要保留透明度"""
+    width, height = size
+    if width * height < 4_000_000:
+        width, height = 2880, 1800
+    arr = make_photo((width, height), rng)
+    arr[: height // 4, :, 3] = 0
+    arr[height // 4: height // 4 + 40, :, 3] = 128
+    reduced = reduce_image(Image.fromarray(arr, "RGBA"), "lossy")
+    buffer = io.BytesIO()
+    reduced.save(buffer, "PNG")
+    expected = np.asarray(Image.open(buffer).convert("RGBA"))
+    decoded = np.asarray(Image.open(io.BytesIO(encode_png(reduced))).convert("RGBA"))
+    assert np.array_equal(decoded, expected), "lossy: 多线程编码与 Pillow 编码不一致"
+    assert (decoded[: height // 4, :, 3] == 0).all(), "lossy: 透明区域变为不透明"
+    print(f"lossy + 透明 {width}x{height}: 多线程编码往返一致")
+
+
+def main():
+    parser = ArgumentParser(description="PNG 输出优化基准测试")
+    parser.add_argument("--size", default="2880x1800")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x"))
+    rng = np.random.default_rng(0)
+    print(f"{'sample':<10}{'mode':<10}{'before':>12}{'after':>12}{'ratio':>8}{'before':>10}{'after':>10}")
+    for name, factory in SAMPLES.items():
+        arr = factory(size, rng)
+        image = Image.fromarray(arr, "RGBA")
+        before, before_time = save(image, args.repeat)
+        for mode in ("lossless", "lossy"):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                reduced = reduce_image(image, mode)
+                buffer = io.BytesIO()
+                reduced.save(buffer, "PNG")
+                best = min(best, time.perf_counter() - start)
+            after = buffer.getvalue()
+            if mode == "lossless":
+                decoded = np.asarray(Image.open(io.BytesIO(after)).convert("RGBA"))
+                assert np.array_equal(decoded, arr), f"{name}: 无损往返不一致"
+            print(
+                f"{name:<10}{reduced.mode:<10}{len(before) / 1024:>10.0f}KB{len(after) / 1024:>10.0f}KB"
+                f"{len(before) / len(after):>7.1f}x{before_time * 1000:>8.0f}ms{best * 1000:>8.0f}ms"
+            )
+
+    check_lossy_transparent(size, rng)
+
+
+if __name__ == "__main__":
+    main()
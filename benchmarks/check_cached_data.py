@@ -0,0 +1,102 @@
+"""
+Workflow.cached_data 并发与内存缓存检查
+启动 N 个进程在同一时刻对同一个已过期的缓存调用 cached_data，data_func 每次运行都向计数文件追加一行并休眠一段时间，
+检查 data_func 只运行了一次且所有进程拿到相同的数据；再测量同一进程内重复读取未变化的缓存文件的耗时（memoize=True），
+并检查默认读取每次返回新的对象
+
+用法（在仓库根目录运行）：
+    python benchmarks/check_cached_data.py
+    python benchmarks/check_cached_data.py --processes 16 --work-ms 500
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 缓存和数据目录放到临时目录，不影响真实的工作流数据
+_tmp = tempfile.mkdtemp(prefix="check-cached-data-")
+os.environ["alfred_workflow_cache"] = os.path.join(_tmp, "cache")
+os.environ["alfred_workflow_data"] = os.path.join(_tmp, "data")
+
+from base.workflow.workflow import Workflow  # noqa: E402
+
+COUNTER = os.path.join(_tmp, "calls")
+
+
+def worker(start_at: float, work_ms: float, results):
+    wf = Workflow()
+
+    def data_func():
+        with open(COUNTER, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(work_ms / 1000)
+        return {"pid": os.getpid(), "items": list(range(1000))}
+
+    time.sleep(max(0.0, start_at - time.time()))
+    results.put(wf.cached_data("stampede", data_func, max_age=60)["pid"])
+
+
+def timed(func, repeat: int) -> float:
+    """重复调用 func，返回最快一次的毫秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--work-ms", type=float, default=300)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1.0
+    processes = [
+        multiprocessing.Process(target=worker, args=(start_at, args.work_ms, results))
+        for _ in range(args.processes)
+    ]
+    for p in processes:
+        p.start()
+    pids = [results.get(timeout=60) for _ in processes]
+    for p in processes:
+        p.join()
+
+    with open(COUNTER) as f:
+        calls = len(f.read().split())
+    print(f"{args.processes} 个进程: data_func 运行 {calls} 次，返回的数据来自 {len(set(pids))} 个进程")
+
+    failed = calls != 1 or len(set(pids)) != 1
+
+    # 同一进程内重复读取未变化的缓存
+    wf = Workflow()
+    wf.cache_data("memo", [{"path": f"/tmp/{i}.png", "size": [i, i]} for i in range(20000)])
+    # 刚写入的文件不会被缓存在内存中（见 CACHE_MEMO_MIN_AGE），把修改时间调早
+    path = wf.cachefile(f"memo.{wf.cache_serializer}")
+    os.utime(path, (time.time() - 10, time.time() - 10))
+    first = timed(lambda: wf.cached_data("memo", max_age=0), 5)
+    memo = timed(lambda: wf.cached_data("memo", max_age=0, memoize=True), args.repeat)
+    print(f"重复读取 2 万条的缓存: 反序列化 {first:.2f}ms，memoize=True {memo:.3f}ms")
+
+    # 默认不缓存对象，调用方修改返回值不影响下一次读取
+    wf.cached_data("memo", max_age=0).clear()
+    if not wf.cached_data("memo", max_age=0):
+        print("FAILED: 默认读取返回了被修改过的对象")
+        failed = True
+
+    if failed:
+        print("FAILED")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+HTTP 服务压力测试
+以固定并发持续向 main.py serve 发送请求，统计吞吐、状态码分布和延迟分位数，最后输出服务端 /health
+
+用法（在仓库根目录运行）：
+    python benchmarks/load_test.py --spawn --workers 2 --concurrency 16 --duration 10
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --action beautify
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from argparse import ArgumentParser
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from base.server import percentile
+
+
+def make_payload(size: tuple) -> bytes:
+    rng = np.random.default_rng(0)
+    arr = np.full((size[1], size[0], 4), 245, dtype=np.uint8)
+    arr[20:size[1] - 20, 20:size[0] - 20, :3] = rng.integers(0, 256, 3)
+    arr[..., 3] = 255
+    buffer = io.BytesIO()
+    Image.fromarray(arr, "RGBA").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + "/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"服务未在 {timeout} 秒内就绪: {url}")
+
+
+def main():
+    parser = ArgumentParser(description="HTTP 服务压力测试")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--action", default="beautify")
+    parser.add_argument("--size", default="1280x800")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--spawn", action="store_true", help="在子进程中启动 main.py serve")
+    parser.add_argument("--workers", type=int, default=2, help="--spawn 时服务端的线程数")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "main.py"), "serve", "--port", port,
+             "--workers", str(args.workers)],
+            cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_ready(args.url)
+        payload = make_payload(tuple(int(v) for v in args.size.lower().split("x")))
+        endpoint = f"{args.url}/{args.action}"
+
+        lock = threading.Lock()
+        statuses = Counter()
+        latencies = []
+        deadline = time.time() + args.duration
+
+        def client():
+            while time.time() < deadline:
+                request = urllib.request.Request(endpoint, data=payload, method="POST")
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=60) as response:
+                        response.read()
+                        status = response.status
+                except urllib.error.HTTPError as e:
+                    e.read()
+                    status = e.code
+                    if status == 503:
+                        # 按服务端的提示稍后重试
+                        time.sleep(0.05)
+                except OSError:
+                    status = "error"
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    statuses[status] += 1
+                    if status == 200:
+                        latencies.append(elapsed)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        print(f"{args.concurrency} clients, {elapsed:.1f}s, payload {len(payload) / 1024:.0f}KB")
+        print(f"throughput: {statuses[200] / elapsed:.1f} req/s ok")
+        print("status:", dict(statuses))
+        print("client latency ms: p50 {:.1f}  p90 {:.1f}  p99 {:.1f}".format(
+            percentile(latencies, 0.5), percentile(latencies, 0.9), percentile(latencies, 0.99)))
+        health = json.loads(urllib.request.urlopen(args.url + "/health").read())
+        print("server /health:", json.dumps(health, ensure_ascii=False))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
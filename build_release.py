@@ -47,7 +47,7 @@ def inject_readme():
 # 5. 打包为 alfredworkflow 文件
 def make_zip(version):
     name = f'Alfred-Image-Beautifier-{version}.alfredworkflow'
-    exclude = {'.git', '__pycache__', '.DS_Store'}
+    exclude = {'.git', '__pycache__', '.DS_Store', 'benchmarks'}
     with zipfile.ZipFile(name, 'w', zipfile.ZIP_DEFLATED) as z:
         for root, dirs, files in os.walk('.'):
             # 排除隐藏目录
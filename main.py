@@ -3,6 +3,7 @@
 使用重构后的模块化代码
 """
 import os, sys
+from contextlib import nullcontext
 
 from processors.beautify_processor import BeautifyProcessor
 from processors.torn_edge_processor import TornEdgeProcessor
@@ -10,32 +11,93 @@ from processors.whitebg_processor import WhiteBGProcessor
 from processors.pad_text_processor import PadTextProcessor
 from argparse import ArgumentParser
 
+from base import metrics, profiling
+from base.tracing import span
+
+# 处理类型 -> 处理器类
+PROCESSORS = {
+    "beautify": BeautifyProcessor,
+    "torn_edge": TornEdgeProcessor,
+    "whitebg": WhiteBGProcessor,
+    "pad_text": PadTextProcessor,
+}
+
 
 if __name__ == "__main__":
-    
+
     parser = ArgumentParser(description="美化截图处理器")
-    parser.add_argument("action", help="处理类型", choices=["beautify", "torn_edge", "whitebg", "pad_text"])
-    parser.add_argument("source", help="来源", choices=["clipboard", "file"])
+    parser.add_argument("action", help="处理类型；jobs 表示从标准输入读取 NDJSON 批处理任务，serve 表示启动本地 HTTP 服务，"
+                                       "stats 表示汇总历次运行的指标",
+                        choices=list(PROCESSORS) + ["jobs", "serve", "stats"])
+    parser.add_argument("source", help="来源（jobs、serve、stats 不需要）", nargs="?", choices=["clipboard", "file", "stream"])
+    parser.add_argument("--format", help="stream 模式的输出格式，默认 GIF 输入输出 GIF，其余输出 PNG",
+                        choices=["png", "gif", "jpeg", "webp", "tiff"])
+    parser.add_argument("--quality", type=int, help="stream 模式下 JPEG/WebP 的编码质量")
+    parser.add_argument("--workers", type=int, help="jobs/serve 模式下并行处理的线程数")
+    parser.add_argument("--host", help="serve 模式监听的地址，默认见 config.server")
+    parser.add_argument("--port", type=int, help="serve 模式监听的端口，默认见 config.server")
+    parser.add_argument("--verbose", action="store_true", help="serve 模式下输出每个请求的日志")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="file 模式下跳过输出已是最新的文件（按输出目录中的清单判断）")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="file/jobs 模式下不处理，只输出每个输入预计的峰值内存和CPU时间")
+    parser.add_argument("--profile", type=float, nargs="?", const=0.0, metavar="MIN_MS",
+                        help="在 cProfile 下运行，耗时不低于 MIN_MS 毫秒时把 .prof 和汇总写到缓存目录的 profiles/ 中；"
+                             "也可用环境变量 BEAUTIFIER_PROFILE 开启")
     args = parser.parse_args()
 
     print("Action:", args.action, file=sys.stderr)
     print("Source:", args.source, file=sys.stderr)
 
+    if args.action == "jobs":
+        # 每行一个 JSON 任务，每完成一个任务输出一行 JSON 结果，格式见 base/jobs.py
+        from base.jobs import run_jobs
+
+        failed = run_jobs(PROCESSORS, sys.stdin, sys.stdout, args.workers, args.dry_run)
+        sys.exit(1 if failed else 0)
+
+    if args.action == "serve":
+        # 例如：curl --data-binary @a.png http://127.0.0.1:8765/beautify > b.png
+        from base.server import serve
+
+        serve(PROCESSORS, args.host, args.port, args.workers, args.verbose)
+        sys.exit(0)
+
+    if args.action == "stats":
+        # 各动作的延迟分位数、像素吞吐、阶段耗时和延迟直方图，数据来自每次运行追加的指标日志
+        metrics.print_stats()
+        sys.exit(0)
+
+    if args.source is None:
+        parser.error("需要指定来源: clipboard、file 或 stream")
 
-    if args.action == "beautify":
-        processor = BeautifyProcessor()
-    elif args.action == "torn_edge":
-        processor = TornEdgeProcessor()
-    elif args.action == "whitebg":
-        processor = WhiteBGProcessor()
-    elif args.action == "pad_text":
-        processor = PadTextProcessor()
+    # 每次运行结束时追加一条运行指标；开启 BEAUTIFIER_TRACE 时记录整个处理过程，进程退出时导出 trace
+    run_metrics = None if args.dry_run else metrics.start(args.action, args.source)
+    profile_min_ms = args.profile if args.profile is not None else profiling.threshold_from_env()
+    profile_run = (
+        nullcontext() if profile_min_ms is None
+        else profiling.ProfileRun(f"{args.action}-{args.source}", profile_min_ms)
+    )
+    with run_metrics or nullcontext(), profile_run, span("main", action=args.action, source=args.source):
+        processor = PROCESSORS[args.action]()
 
-    if args.source == "file":
-        file_paths = os.environ["files"]
-        print("File paths:", file_paths, file=sys.stderr)
-        for file_path in file_paths.split("\t"):
-            processor.process_image_file(file_path)
-    elif args.source == "clipboard":
-        processor.run()
+        if args.source == "file":
+            file_paths = os.environ["files"]
+            print("File paths:", file_paths, file=sys.stderr)
+            from base.pipeline import run_files
 
+            failed = run_files(processor, file_paths.split("\t"), args.dry_run, args.incremental)
+            sys.exit(1 if failed else 0)
+        elif args.source == "clipboard":
+            sys.exit(0 if processor.run() else 1)
+        elif args.source == "stream":
+            # 从标准输入读取编码后的图像字节，结果写到标准输出，例如：
+            # cat a.png | python main.py beautify stream > b.png
+            save_options = {}
+            if args.quality is not None:
+                save_options["quality"] = args.quality
+            data = sys.stdin.buffer.read()
+            if not data:
+                parser.error("标准输入中没有图像数据")
+            sys.stdout.buffer.write(processor.process_bytes(data, args.format, **save_options))
+            sys.stdout.buffer.flush()
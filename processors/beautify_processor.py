@@ -4,61 +4,106 @@
 """
 
 import sys
+from dataclasses import dataclass
+from typing import Tuple
 
+import numpy as np
 from PIL import Image
 
+from base.asset_cache import asset_cache
 from base.config import config
 from base.image_processor import ImageProcessor, ImageUtils
+from base.tracing import span
+
+
+@dataclass
+class BeautifyPlan:
+    """同一尺寸下可复用的预计算结果"""
+
+    corner_mask: Image.Image  # 圆角遮罩
+    background: Image.Image  # 渐变背景（RGBA）
+    position: Tuple[int, int]  # 原图在背景中的居中位置
 
 
 class BeautifyProcessor(ImageProcessor):
     """美化截图处理器"""
 
+    frame_invariant = True
+
     def __init__(self):
         super().__init__(config.beautify_workflow_name)
         self.beautify_config = config.beautify
 
-    def process_image(self, image: Image.Image) -> Image.Image:
-        """处理图像：添加圆角和渐变背景"""
+    def plan(self, size: Tuple[int, int], mode: str = "RGBA") -> BeautifyPlan:
+        """预计算圆角遮罩、渐变背景和居中位置"""
         # 计算圆角半径
         radius = ImageUtils.calculate_radius(
-            image, max_radius=self.beautify_config.max_radius
+            size, max_radius=self.beautify_config.max_radius
         )
-
-        # 添加圆角
-        rounded_image = ImageUtils.add_rounded_corners(image, radius)
+        with span("beautify.corner_mask", radius=radius):
+            corner_mask = Image.fromarray(
+                asset_cache.get_or_create(
+                    "corner_mask",
+                    {"size": size, "radius": radius},
+                    lambda: np.asarray(ImageUtils.create_corner_mask(size, radius)),
+                ),
+                "L",
+            )
 
         # 计算内边距和背景尺寸
         padding = ImageUtils.calculate_padding(
-            rounded_image, max_padding=self.beautify_config.max_padding
+            size, max_padding=self.beautify_config.max_padding
         )
         print("Padding:", padding, file=sys.stderr)
-        background_size = (
-            rounded_image.width + 2 * padding,
-            rounded_image.height + 2 * padding,
-        )
-
-        # 创建渐变背景（RGBA，支持透明）
-        gradient_background = ImageUtils.create_gradient_background(
-            background_size,
-            self.beautify_config.start_color,
-            self.beautify_config.end_color,
-        ).convert("RGBA")
+        background_size = (size[0] + 2 * padding, size[1] + 2 * padding)
+
+        # 创建渐变背景（RGBA，支持透明），常见分辨率的结果直接从磁盘缓存映射
+        start_color = self.beautify_config.start_color
+        end_color = self.beautify_config.end_color
+        with span("beautify.gradient", size=list(background_size)):
+            gradient_background = Image.fromarray(
+                asset_cache.get_or_create(
+                    "gradient",
+                    {"size": background_size, "start": start_color, "end": end_color},
+                    lambda: np.asarray(
+                        ImageUtils.create_gradient_background(
+                            background_size, start_color, end_color
+                        ).convert("RGBA")
+                    ),
+                ),
+                "RGBA",
+            )
 
         # 计算居中位置
         position = (
-            (background_size[0] - rounded_image.width) // 2,
-            (background_size[1] - rounded_image.height) // 2,
+            (background_size[0] - size[0]) // 2,
+            (background_size[1] - size[1]) // 2,
         )
+        return BeautifyPlan(corner_mask, gradient_background, position)
+
+    def apply(self, plan: BeautifyPlan, image: Image.Image) -> Image.Image:
+        """使用预计算结果添加圆角和渐变背景"""
+        # 添加圆角
+        with span("beautify.round_corners"):
+            rounded_image = ImageUtils.apply_corner_mask(image, plan.corner_mask)
 
-        # 合并图像，使用alpha通道作为mask
-        if rounded_image.mode != "RGBA":
-            rounded_image = rounded_image.convert("RGBA")
-        alpha = rounded_image.split()[-1]
-        gradient_background.paste(rounded_image, position, mask=alpha)
+        # 合并图像，使用alpha通道作为mask；背景需复制一份，预计算结果保持不变
+        with span("beautify.composite"):
+            gradient_background = plan.background.copy()
+            alpha = rounded_image.split()[-1]
+            gradient_background.paste(rounded_image, plan.position, mask=alpha)
 
         return gradient_background
 
+    def apply_batch(self, plan: BeautifyPlan, frames: np.ndarray) -> np.ndarray:
+        """批量添加圆角和渐变背景，结果与逐帧 apply 完全一致"""
+        rounded = ImageUtils.apply_corner_mask_batch(frames, np.asarray(plan.corner_mask))
+        return ImageUtils.composite_batch(np.asarray(plan.background), rounded, plan.position)
+
+    def process_image(self, image: Image.Image) -> Image.Image:
+        """处理图像：添加圆角和渐变背景"""
+        return self.apply(self.get_plan(image.size, image.mode), image)
+
     def rename_file(self, input_path: str) -> str:
         import os
         base, ext = os.path.splitext(input_path)
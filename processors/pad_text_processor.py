@@ -3,11 +3,15 @@
 import io
 import os
 import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageSequence
 
 from base.config import config, PadTextConfig
 from base.image_processor import ImageProcessor, ImageUtils
+from base.tracing import span
 
 def get_text_size(text, font, max_width):
     """
@@ -45,13 +49,39 @@ def get_text_size(text, font, max_width):
     return lines, total_height
 
 
+@dataclass
+class PadTextPlan:
+    """同一尺寸下可复用的预计算结果"""
+
+    canvas: Image.Image  # 已绘制好文字的完整画布，原图区域待粘贴
+
+
 class PadTextProcessor(ImageProcessor):
+    frame_invariant = True
+
     def __init__(self):
         super().__init__("Pad Text Processor")
         self.pad_text_config: PadTextConfig = config.pad_text
+        # 要添加的文字，未设置时读取环境变量 text（批处理任务可逐个任务指定）
+        self.text: Optional[str] = None
 
-    def process_image(self, img: Image.Image) -> Image.Image:
-        text = os.environ.get("text", "默认文本：你好世界").strip()
+    def get_text(self) -> str:
+        if self.text is not None:
+            return self.text.strip()
+        return os.environ.get("text", "默认文本：你好世界").strip()
+
+    def config_fingerprint(self) -> dict:
+        fingerprint = super().config_fingerprint()
+        fingerprint["text"] = self.get_text()
+        return fingerprint
+
+    def plan_key(self, size: Tuple[int, int], mode: str = "RGBA") -> Tuple:
+        # 画布上绘制了文字，不同文字不能共用同一份预计算结果
+        return (tuple(size), mode, self.get_text())
+
+    def plan(self, size: Tuple[int, int], mode: str = "RGBA") -> PadTextPlan:
+        """预计算字体、分行排版，并把文字绘制到底部填充区域"""
+        text = self.get_text()
 
         # 对于 macOS，Hiragino 是个不错的选择。对于 Windows/Linux，可能需要 'msyh.ttc' 或其他字体。
         font_path = self.pad_text_config.font_path
@@ -59,7 +89,7 @@ class PadTextProcessor(ImageProcessor):
         pad_color = self.pad_text_config.pad_color
         max_width_ratio = self.pad_text_config.max_width_ratio
 
-        width, height = img.size
+        width, height = size
         
         
         max_width = int(width * max_width_ratio)
@@ -70,16 +100,16 @@ class PadTextProcessor(ImageProcessor):
         if font_path and os.path.exists(font_path):
             font = ImageFont.truetype(font_path, font_size)
         else:
-            print(f"警告：字体 '{font_path}' 不存在，使用默认字体。中文可能无法显示。")
+            print(f"警告：字体 '{font_path}' 不存在，使用默认字体。中文可能无法显示。", file=sys.stderr)
             font = ImageFont.load_default()
 
         # 使用修正后的函数计算文本尺寸和分行
-        lines, text_height = get_text_size(text, font, width - 20)
+        with span("pad_text.layout", chars=len(text)):
+            lines, text_height = get_text_size(text, font, width - 20)
         
         pad_height = text_height + 20
-        new_img = Image.new("RGBA", (width, height + pad_height), pad_color + (255,))
-        new_img.paste(img, (0, 0))
-        draw = ImageDraw.Draw(new_img)
+        canvas = Image.new("RGBA", (width, height + pad_height), pad_color + (255,))
+        draw = ImageDraw.Draw(canvas)
         
         y = height + 10
         for line in lines:
@@ -90,7 +120,23 @@ class PadTextProcessor(ImageProcessor):
             draw.text(((width - w) // 2, y), line, font=font, fill=(0, 0, 0))
             y += line_height # 使用字体的实际行高来递增 y
             
-        return new_img.convert(img.mode)
+        return PadTextPlan(canvas)
+
+    def apply(self, plan: PadTextPlan, img: Image.Image) -> Image.Image:
+        """将原图粘贴到预先绘制好文字的画布顶部"""
+        with span("pad_text.paste"):
+            new_img = plan.canvas.copy()
+            new_img.paste(img, (0, 0))
+            return new_img.convert(img.mode)
+
+    def apply_batch(self, plan: PadTextPlan, frames: np.ndarray) -> np.ndarray:
+        """批量将帧栈粘贴到画布顶部"""
+        return ImageUtils.composite_batch(
+            np.asarray(plan.canvas), frames, (0, 0), use_alpha=False
+        )
+
+    def process_image(self, img: Image.Image) -> Image.Image:
+        return self.apply(self.get_plan(img.size, img.mode), img)
 
     def rename_file(self, input_path: str) -> str:
         base, ext = os.path.splitext(input_path)
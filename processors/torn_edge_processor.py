@@ -4,20 +4,127 @@
 """
 
 import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
 
+import numpy as np
 from PIL import Image
 
+from base.asset_cache import asset_cache
 from base.config import config
 from base.image_processor import ImageProcessor
+from base.tracing import span
 from base.utils import show_macos_notification
 
 
+@dataclass
+class TornEdgePlan:
+    """同一尺寸下可复用的预计算结果"""
+
+    edge_alpha: Image.Image  # 撕裂边缘区域内的新alpha值
+    coverage: Image.Image  # 撕裂边缘覆盖区域，255表示该像素的alpha由 edge_alpha 决定
+
+
 class TornEdgeProcessor(ImageProcessor):
     """撕裂边缘处理器"""
 
+    preserves_geometry = True
+    alpha_only = True
+    frame_invariant = True
+    # 调色板GIF复用原索引，无需保留RGBA帧和量化
+    gif_cost = (6.0, 95.0)
+
     def __init__(self):
         super().__init__(config.torn_edge_workflow_name)
         self.torn_config = config.torn_edge
+        self._source_torn_image: Optional[Image.Image] = None
+
+    @staticmethod
+    def build_edge_layers(
+        size: Tuple[int, int],
+        source_torn_img: Image.Image,
+        edge: str = "all",
+        thickness: int = 50,
+    ) -> TornEdgePlan:
+        """
+        从带有撕裂边缘特效的源图片中提取边缘形状，生成目标尺寸下的alpha覆盖层。
+
+        各方位的遮罩按 上、下、左、右 的顺序依次覆盖，与逐帧粘贴的结果完全一致。
+
+        Args:
+            size: 目标图片尺寸
+            source_torn_img: 带有撕裂边缘特效的源图片对象
+            edge: 应用撕裂边缘的方位，可以是 'top', 'bottom', 'left', 'right' 或 'all'
+            thickness: 提取的撕裂边缘的厚度
+
+        Returns:
+            预计算的覆盖层
+        """
+        source_torn_img = source_torn_img.convert("RGBA")
+
+        target_width, target_height = size
+        source_width, source_height = source_torn_img.size
+
+        edge_alpha = Image.new("L", size, 0)
+        coverage = Image.new("L", size, 0)
+
+        def apply_mask_from_source(source_region, target_box):
+            """从源区域应用遮罩到目标区域"""
+            if source_region:
+                mask = source_region.split()[3]
+                resized_mask = mask.resize(
+                    (target_box[2] - target_box[0], target_box[3] - target_box[1])
+                )
+                edge_alpha.paste(resized_mask, target_box)
+                coverage.paste(255, target_box)
+
+        # 应用顶部边缘
+        if edge in ("top", "all"):
+            if thickness <= source_height:
+                top_region = source_torn_img.crop((0, 0, source_width, thickness))
+                apply_mask_from_source(top_region, (0, 0, target_width, thickness))
+
+        # 应用底部边缘
+        if edge in ("bottom", "all"):
+            if thickness <= source_height:
+                bottom_region = source_torn_img.crop(
+                    (0, source_height - thickness, source_width, source_height)
+                )
+                apply_mask_from_source(
+                    bottom_region,
+                    (0, target_height - thickness, target_width, target_height),
+                )
+
+        # 应用左侧边缘
+        if edge in ("left", "all"):
+            if thickness <= source_width:
+                left_region = source_torn_img.crop((0, 0, thickness, source_height))
+                apply_mask_from_source(
+                    left_region, (0, 0, thickness, target_height)
+                )
+
+        # 应用右侧边缘
+        if edge in ("right", "all"):
+            if thickness <= source_width:
+                right_region = source_torn_img.crop(
+                    (source_width - thickness, 0, source_width, source_height)
+                )
+                apply_mask_from_source(
+                    right_region,
+                    (target_width - thickness, 0, target_width, target_height),
+                )
+
+        return TornEdgePlan(edge_alpha, coverage)
+
+    @staticmethod
+    def apply_edge_layers(target_img: Image.Image, plan: TornEdgePlan) -> Image.Image:
+        """将预计算的覆盖层应用到目标图片的alpha通道"""
+        # convert 总会返回新图像，不会修改调用方的帧
+        target_img = target_img.convert("RGBA")
+        new_alpha = target_img.getchannel("A")
+        new_alpha.paste(plan.edge_alpha, (0, 0), plan.coverage)
+        target_img.putalpha(new_alpha)
+        return target_img
 
     def extract_and_apply_torn_edge(
         self,
@@ -39,95 +146,83 @@ class TornEdgeProcessor(ImageProcessor):
             处理后的图片对象
         """
         try:
-            # 确保两个图像都是RGBA模式
-            target_img = target_img.convert("RGBA")
-            source_torn_img = source_torn_img.convert("RGBA")
-
-            target_width, target_height = target_img.size
-            source_width, source_height = source_torn_img.size
-
-            target_alpha = target_img.split()[3]
-            new_alpha = target_alpha.copy()
-
-            def apply_mask_from_source(source_region, target_box):
-                """从源区域应用遮罩到目标区域"""
-                if source_region:
-                    mask = source_region.split()[3]
-                    resized_mask = mask.resize(
-                        (target_box[2] - target_box[0], target_box[3] - target_box[1])
-                    )
-                    temp_alpha = new_alpha.crop(target_box)
-                    composite_mask = Image.composite(
-                        Image.new("L", temp_alpha.size, 255),
-                        Image.new("L", temp_alpha.size, 0),
-                        resized_mask,
-                    )
-                    new_alpha.paste(composite_mask, target_box)
-
-            # 应用顶部边缘
-            if edge in ("top", "all"):
-                if thickness <= source_height:
-                    top_region = source_torn_img.crop((0, 0, source_width, thickness))
-                    apply_mask_from_source(top_region, (0, 0, target_width, thickness))
-
-            # 应用底部边缘
-            if edge in ("bottom", "all"):
-                if thickness <= source_height:
-                    bottom_region = source_torn_img.crop(
-                        (0, source_height - thickness, source_width, source_height)
-                    )
-                    apply_mask_from_source(
-                        bottom_region,
-                        (0, target_height - thickness, target_width, target_height),
-                    )
-
-            # 应用左侧边缘
-            if edge in ("left", "all"):
-                if thickness <= source_width:
-                    left_region = source_torn_img.crop((0, 0, thickness, source_height))
-                    apply_mask_from_source(
-                        left_region, (0, 0, thickness, target_height)
-                    )
-
-            # 应用右侧边缘
-            if edge in ("right", "all"):
-                if thickness <= source_width:
-                    right_region = source_torn_img.crop(
-                        (source_width - thickness, 0, source_width, source_height)
-                    )
-                    apply_mask_from_source(
-                        right_region,
-                        (target_width - thickness, 0, target_width, target_height),
-                    )
-
-            target_img.putalpha(new_alpha)
-            return target_img
+            plan = self.build_edge_layers(
+                target_img.size, source_torn_img, edge=edge, thickness=thickness
+            )
+            return self.apply_edge_layers(target_img, plan)
 
         except Exception as e:
             print(f"处理图像时发生错误: {e}")
             return None
 
-    def process_image(self, image: Image.Image) -> Image.Image:
-        """处理图像：添加撕裂边缘效果"""
-        # 检查源图像文件是否存在
-        if not os.path.exists(self.torn_config.source_image_path):
-            raise FileNotFoundError(f"找不到{self.torn_config.source_image_path}文件")
-
-        # 加载基础撕裂边缘图片
-        source_torn_image = Image.open(self.torn_config.source_image_path)
-
-        # 应用撕裂边缘效果
-        result_image = self.extract_and_apply_torn_edge(
-            image,
-            source_torn_image,
-            edge=self.torn_config.edge,
-            thickness=self.torn_config.thickness,
+    def config_fingerprint(self) -> dict:
+        # 撕裂边缘素材文件被替换后，已有输出也随之过期
+        fingerprint = super().config_fingerprint()
+        try:
+            st = os.stat(self.torn_config.source_image_path)
+            fingerprint["source"] = [st.st_size, st.st_mtime_ns]
+        except OSError:
+            fingerprint["source"] = None
+        return fingerprint
+
+    def load_source_image(self) -> Image.Image:
+        """加载基础撕裂边缘图片，同一处理器实例只读取一次"""
+        if self._source_torn_image is None:
+            # 检查源图像文件是否存在
+            if not os.path.exists(self.torn_config.source_image_path):
+                raise FileNotFoundError(f"找不到{self.torn_config.source_image_path}文件")
+            self._source_torn_image = Image.open(self.torn_config.source_image_path).convert("RGBA")
+        return self._source_torn_image
+
+    def plan(self, size: Tuple[int, int], mode: str = "RGBA") -> TornEdgePlan:
+        """预计算目标尺寸下缩放好的撕裂边缘遮罩，结果按配置和尺寸缓存到磁盘"""
+        source_path = self.torn_config.source_image_path
+        if not os.path.exists(source_path):
+            raise FileNotFoundError(f"找不到{source_path}文件")
+        st = os.stat(source_path)
+
+        def build() -> np.ndarray:
+            with span("torn_edge.load_source"):
+                source = self.load_source_image()
+            with span("torn_edge.build_layers", edge=self.torn_config.edge):
+                layers = self.build_edge_layers(
+                    size,
+                    source,
+                    edge=self.torn_config.edge,
+                    thickness=self.torn_config.thickness,
+                )
+            return np.stack([np.asarray(layers.edge_alpha), np.asarray(layers.coverage)])
+
+        layers = asset_cache.get_or_create(
+            "torn_edge",
+            {
+                "size": size,
+                "edge": self.torn_config.edge,
+                "thickness": self.torn_config.thickness,
+                "source": [os.path.abspath(source_path), st.st_size, st.st_mtime_ns],
+            },
+            build,
         )
+        return TornEdgePlan(Image.fromarray(layers[0], "L"), Image.fromarray(layers[1], "L"))
+
+    def apply(self, plan: TornEdgePlan, image: Image.Image) -> Image.Image:
+        """使用预计算结果添加撕裂边缘效果"""
+        with span("torn_edge.apply_alpha"):
+            return self.apply_edge_layers(image, plan)
 
-        if result_image is None:
-            raise RuntimeError("处理图像失败")
+    def apply_batch(self, plan: TornEdgePlan, frames: np.ndarray) -> np.ndarray:
+        """批量添加撕裂边缘效果，直接原地改写帧栈的alpha通道"""
+        coverage = np.asarray(plan.coverage) > 0
+        np.copyto(frames[..., 3], np.asarray(plan.edge_alpha), where=coverage)
+        return frames
 
-        return result_image
+    def apply_alpha(self, plan: TornEdgePlan, alpha: np.ndarray) -> np.ndarray:
+        """只对alpha通道添加撕裂边缘效果，用于复用调色板的GIF路径"""
+        return np.where(np.asarray(plan.coverage) > 0, np.asarray(plan.edge_alpha), alpha)
+
+    def process_image(self, image: Image.Image) -> Image.Image:
+        """处理图像：添加撕裂边缘效果"""
+        return self.apply(self.get_plan(image.size, image.mode), image)
 
     def rename_file(self, input_path: str) -> str:
         import os
@@ -3,24 +3,45 @@
 将图像的透明区域替换为白色背景
 """
 
+from typing import Tuple
+
+import numpy as np
 from PIL import Image
 from base.config import config
-from base.image_processor import ImageProcessor
+from base.image_processor import ImageProcessor, ImageUtils
+from base.tracing import span
 
 class WhiteBGProcessor(ImageProcessor):
     """将透明区域替换为白色背景的处理器"""
+
+    output_opaque = True
+    preserves_geometry = True
+    frame_invariant = True
+
     def __init__(self):
         super().__init__("WhiteBG Processor")
 
+    def plan(self, size: Tuple[int, int], mode: str = "RGBA") -> Image.Image:
+        """预先创建白色背景"""
+        return Image.new("RGBA", size, (255, 255, 255, 255))
+
+    def apply(self, plan: Image.Image, image: Image.Image) -> Image.Image:
+        with span("whitebg.flatten"):
+            # 确保为RGBA
+            image = image.convert("RGBA")
+            # 复制白色背景，预计算结果保持不变
+            white_bg = plan.copy()
+            # 粘贴原图，使用自身alpha作为mask
+            white_bg.paste(image, (0, 0), mask=image)
+            # 转为RGB，去除alpha
+            return white_bg.convert("RGBA")
+
+    def apply_batch(self, plan: Image.Image, frames: np.ndarray) -> np.ndarray:
+        """批量铺白色背景，直接原地改写帧栈"""
+        return ImageUtils.flatten_batch(frames, (255, 255, 255), inplace=self.preserves_geometry)
+
     def process_image(self, image: Image.Image) -> Image.Image:
-        # 确保为RGBA
-        image = image.convert("RGBA")
-        # 创建白色背景
-        white_bg = Image.new("RGBA", image.size, (255, 255, 255, 255))
-        # 粘贴原图，使用自身alpha作为mask
-        white_bg.paste(image, (0, 0), mask=image)
-        # 转为RGB，去除alpha
-        return white_bg.convert("RGBA")
+        return self.apply(self.get_plan(image.size, image.mode), image)
 
     def rename_file(self, input_path: str) -> str:
         import os